@@ -0,0 +1,82 @@
+# SolDega/exportacion.py
+"""
+Exportación de filas a CSV o XLSX como StreamingHttpResponse.
+
+Las filas llegan desde un generador (normalmente un queryset proyectado con
+.iterator()), así que nunca se cargan todas en memoria:
+  - CSV se envía línea a línea, el primer byte sale con la primera fila.
+  - XLSX usa el modo write_only de openpyxl, que escribe las filas en un
+    archivo temporal; el .xlsx es un zip que solo se puede cerrar al final,
+    por eso se envía por bloques una vez terminado.
+"""
+import csv
+import tempfile
+from datetime import datetime
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+TAMANO_BLOQUE = 64 * 1024
+
+
+class _Eco:
+    """Objeto tipo archivo que devuelve lo escrito, para usar csv.writer sin buffer."""
+    def write(self, valor):
+        return valor
+
+
+def _valor_celda(valor):
+    # openpyxl no acepta fechas con zona horaria
+    if isinstance(valor, datetime) and timezone.is_aware(valor):
+        return timezone.localtime(valor).replace(tzinfo=None)
+    return valor
+
+
+def _valor_texto(valor):
+    valor = _valor_celda(valor)
+    if isinstance(valor, datetime):
+        return valor.strftime('%Y-%m-%d %H:%M:%S')
+    return valor
+
+
+def filas_csv(encabezado, filas):
+    # El BOM permite que Excel abra el archivo con los acentos correctos
+    yield '\ufeff'
+    escritor = csv.writer(_Eco(), delimiter=';')
+    yield escritor.writerow(encabezado)
+    for fila in filas:
+        yield escritor.writerow([_valor_texto(valor) for valor in fila])
+
+
+def filas_xlsx(encabezado, filas, titulo='Datos'):
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(title=titulo)
+    hoja.append(encabezado)
+    for fila in filas:
+        hoja.append([_valor_celda(valor) for valor in fila])
+    with tempfile.TemporaryFile() as archivo:
+        libro.save(archivo)
+        archivo.seek(0)
+        while True:
+            bloque = archivo.read(TAMANO_BLOQUE)
+            if not bloque:
+                break
+            yield bloque
+
+
+def respuesta_exportacion(nombre, formato, encabezado, filas, titulo='Datos'):
+    """`nombre` sin extensión; `formato` debe ser una clave de FORMATOS."""
+    if formato == 'xlsx':
+        contenido = filas_xlsx(encabezado, filas, titulo)
+    else:
+        contenido = filas_csv(encabezado, filas)
+    response = StreamingHttpResponse(contenido, content_type=FORMATOS[formato])
+    response['Content-Disposition'] = f'attachment; filename="{nombre}.{formato}"'
+    return response
@@ -0,0 +1,151 @@
+# SolDega/pagination.py
+"""
+Paginación por cursor para las tablas que crecen con el historial.
+
+A diferencia de PageNumberPagination no hace COUNT(*) ni OFFSET: cada página
+continúa desde la posición (fecha, id) de la anterior, por lo que la página
+500 cuesta lo mismo que la primera. El cursor guarda los valores de todos los
+campos del orden (CursorPagination de DRF guarda solo el primero y desempata
+con un offset, y con fechas repetidas `previous` devolvía la misma página);
+si el orden pedido no termina en un campo único se agrega el id.
+El total es opcional:
+  - ?count=exacto    COUNT(*) sobre el queryset filtrado
+  - ?count=estimado  estimación del planificador de PostgreSQL (exacto en otros motores)
+"""
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.response import Response
+
+
+def estimar_total(queryset):
+    """Filas estimadas por el planificador; cae a COUNT(*) fuera de PostgreSQL."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _invertir(campo):
+    return campo[1:] if campo.startswith('-') else f'-{campo}'
+
+
+def _despues_de(orden, valores):
+    """
+    Filas que van después de `valores` en `orden` (comparación lexicográfica).
+    El OR solo no sirve como rango de índice en PostgreSQL: se le agrega la
+    cota redundante sobre el primer campo (fecha <= x AND (fecha < x OR ...)),
+    con la que el índice (fecha, id) acota el recorrido.
+    """
+    condicion = Q()
+    iguales = {}
+    for campo, valor in zip(orden, valores):
+        nombre = campo.lstrip('-')
+        comparacion = 'lt' if campo.startswith('-') else 'gt'
+        condicion |= Q(**iguales, **{f'{nombre}__{comparacion}': valor})
+        iguales[nombre] = valor
+    primero = orden[0].lstrip('-')
+    cota = 'lte' if orden[0].startswith('-') else 'gte'
+    return Q(**{f'{primero}__{cota}': valores[0]}) & condicion
+
+
+class FechaCursorPagination(CursorPagination):
+    ordering = ('-fecha', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        modo = request.query_params.get(self.count_query_param)
+        if modo == 'exacto':
+            self.count = queryset.count()
+        elif modo == 'estimado':
+            self.count = estimar_total(queryset)
+        else:
+            self.count = None
+
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self._orden_unico(self.get_ordering(request, queryset, view), queryset.model)
+        self.cursor = self.decode_cursor(request)
+        reverso = bool(self.cursor and self.cursor.reverse)
+        posicion = self._leer_posicion(queryset.model)
+
+        orden = [_invertir(campo) for campo in self.ordering] if reverso else list(self.ordering)
+        queryset = queryset.order_by(*orden)
+        if posicion is not None:
+            queryset = queryset.filter(_despues_de(orden, posicion))
+        resultados = list(queryset[:self.page_size + 1])
+        hay_mas = len(resultados) > self.page_size
+        self.page = resultados[:self.page_size]
+        if reverso:
+            self.page.reverse()
+            self.has_next, self.has_previous = posicion is not None, hay_mas
+        else:
+            self.has_next, self.has_previous = hay_mas, posicion is not None
+        return self.page
+
+    def _orden_unico(self, ordering, modelo):
+        pk = modelo._meta.pk.name
+        ordering = [campo[:-2] + pk if campo.lstrip('-') == 'pk' else campo for campo in ordering]
+        if pk not in [campo.lstrip('-') for campo in ordering]:
+            ordering.append(('-' if ordering[-1].startswith('-') else '') + pk)
+        return tuple(ordering)
+
+    def _leer_posicion(self, modelo):
+        if not self.cursor or not self.cursor.position:
+            return None
+        try:
+            valores = json.loads(self.cursor.position)
+            campos = [modelo._meta.get_field(campo.lstrip('-')) for campo in self.ordering]
+            if not isinstance(valores, list) or len(valores) != len(campos):
+                raise ValueError
+            return [campo.to_python(valor) for campo, valor in zip(campos, valores)]
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _enlace(self, reverso, instancia):
+        if instancia is None:
+            # Página vacía: se continúa desde la misma posición
+            posicion = self.cursor.position
+        else:
+            posicion = json.dumps([
+                instancia._meta.get_field(campo.lstrip('-')).value_to_string(instancia) for campo in self.ordering
+            ])
+        return self.encode_cursor(Cursor(offset=0, reverse=reverso, position=posicion))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self._enlace(False, self.page[-1] if self.page else None)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self._enlace(True, self.page[0] if self.page else None)
+
+    def get_paginated_response(self, data):
+        respuesta = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+        if self.count is not None:
+            respuesta['count'] = self.count
+        respuesta['results'] = data
+        return Response(respuesta)
+
+
+class FechaCreacionCursorPagination(FechaCursorPagination):
+    ordering = ('-fecha_creacion', '-id')
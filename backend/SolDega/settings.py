@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'ordenes',
     'maquinaria',
     'alertas',
+    'reportes',
     'django_q',
     'django_filters',
 ]
@@ -120,6 +121,39 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, "static")]  # ✅ Esto es lo que faltaba
 
+# Archivos generados (reportes en segundo plano)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = env.str("MEDIA_ROOT", default=os.path.join(BASE_DIR, 'media'))
+
+# Segundos durante los que un reporte se reutiliza para los mismos parámetros (uno ya
+# generado, solo si su contenido no puede cambiar; ver reportes.documentos.cerrado)
+REPORTES_VIGENCIA = env.int("REPORTES_VIGENCIA", default=3600)
+
+# Segundos que el cluster deja renderizar un reporte antes de matar al worker; el trabajo
+# pasa a 'error'. Debe ser menor que Q_CLUSTER['retry'], o la tarea se entrega dos veces
+REPORTES_TIMEOUT = env.int("REPORTES_TIMEOUT", default=60)
+
+# Tamaño máximo (bytes) de la caché en memoria de PDFs de órdenes de compra, por proceso
+OC_PDF_CACHE_MAX_BYTES = env.int("OC_PDF_CACHE_MAX_BYTES", default=32 * 1024 * 1024)
+
+# Monto (cantidad x precio de compra) desde el que una salida genera una alerta 'salida_alta'
+ALERTA_SALIDA_ALTA_MONTO = env.int("ALERTA_SALIDA_ALTA_MONTO", default=500000)
+
+# Segundos que se conserva en caché la valorización del inventario (se invalida con cada cambio de stock)
+VALORIZACION_CACHE_SEGUNDOS = env.int("VALORIZACION_CACHE_SEGUNDOS", default=60)
+
+# Procesos que renderizan los PDF, por cada proceso web (0: en el mismo proceso web)
+PDF_PROCESOS = env.int("PDF_PROCESOS", default=2)
+
+# PDF pendientes (en cola o renderizándose) por proceso web; al superarlo se responde 503
+PDF_COLA_MAXIMA = env.int("PDF_COLA_MAXIMA", default=16)
+
+# Segundos que una petición espera un PDF (cola más render) antes de responder 503
+PDF_TIMEOUT = env.int("PDF_TIMEOUT", default=60)
+
+# Máximo de documentos por exportación en lote
+PDF_LOTE_MAXIMO = env.int("PDF_LOTE_MAXIMO", default=500)
+
 
 # Seguridad extra en producción
 if not DEBUG:
@@ -147,6 +181,8 @@ Q_CLUSTER = {
     'recycle': 500,
     'timeout': 60,
     'retry': 120,
+    # Reintentos de una tarea que terminó con error (0: sin límite)
+    'max_attempts': 3,
     'queue_limit': 50,
     'bulk': 10,
     'orm': 'default',
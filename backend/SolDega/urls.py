@@ -16,6 +16,7 @@ urlpatterns = [
     path('api/ordenes/', include('ordenes.urls')),
     path('api/', include('ordenes.urls')),
     path('api/alertas/', include('alertas.urls')),
+    path('api/reportes/', include('reportes.urls')),
     path('', TemplateView.as_view(template_name='index.html')),
 
 
@@ -0,0 +1,69 @@
+# alertas/eventos.py
+"""
+Evaluación de alertas en el momento en que cambia el stock.
+
+Los servicios de movimientos llaman a estas funciones dentro de su
+transacción; la evaluación se ejecuta después del commit y solo sobre los
+productos y salidas de esa transacción, con los valores que ya están en
+memoria, así no hay que esperar al barrido diario ni recorrer el catálogo.
+"""
+import logging
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Alerta
+from .motor import evaluar
+
+logger = logging.getLogger(__name__)
+
+
+def _al_confirmar(funcion, *args):
+    """Ejecuta `funcion` tras el commit; un error no afecta al movimiento ya guardado."""
+    def ejecutar():
+        try:
+            funcion(*args)
+        except Exception:
+            logger.exception(f"Error evaluando alertas en {funcion.__name__}")
+    transaction.on_commit(ejecutar)
+
+
+def monto_salida_alta():
+    return Decimal(settings.ALERTA_SALIDA_ALTA_MONTO)
+
+
+def _evaluar_salidas(salidas):
+    umbral = monto_salida_alta()
+    altas = []
+    productos = {}
+    for salida in salidas:
+        producto = salida.producto
+        productos[producto.pk] = producto
+        monto = salida.cantidad * producto.precio_compra
+        if monto >= umbral:
+            altas.append(Alerta(
+                tipo='salida_alta',
+                mensaje=f"Salida de {salida.cantidad} x {producto.codigo} ({producto.nombre}) por ${monto:,.0f}.",
+                origen_id=salida.pk,
+            ))
+    if altas:
+        Alerta.objects.bulk_create(altas)
+
+    # El stock de los productos ya quedó descontado en memoria por registrar_salidas
+    bajo_minimo = [pk for pk, producto in productos.items() if producto.stock_actual < producto.stock_minimo]
+    if bajo_minimo:
+        evaluar('stock_bajo', bajo_minimo)
+
+
+def _evaluar_entradas(producto_ids):
+    evaluar('stock_bajo', producto_ids)
+
+
+def salidas_registradas(salidas):
+    """`salidas` deben traer `producto` cargado con el stock ya descontado."""
+    _al_confirmar(_evaluar_salidas, list(salidas))
+
+
+def entradas_registradas(entradas):
+    _al_confirmar(_evaluar_entradas, sorted({entrada.producto_id for entrada in entradas}))
@@ -0,0 +1,25 @@
+# alertas/management/commands/sincronizar_tareas.py
+"""
+Registra o corrige las tareas programadas de django_q según
+alertas.programacion.TAREAS. Es idempotente; `migrate` ya lo hace al final.
+
+Uso:
+    python manage.py sincronizar_tareas
+"""
+from django.core.management.base import BaseCommand
+
+from alertas.programacion import sincronizar
+
+
+class Command(BaseCommand):
+    help = "Crea o actualiza por nombre las tareas programadas de django_q"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help="Alias de la base de datos")
+
+    def handle(self, *args, **options):
+        resultado = sincronizar(using=options['database'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Tareas sincronizadas: {resultado['creadas']} creadas, "
+            f"{resultado['actualizadas']} actualizadas, {resultado['eliminadas']} duplicadas eliminadas"
+        ))
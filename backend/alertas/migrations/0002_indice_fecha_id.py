@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 08:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alertas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alerta',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='alerta_fecha_id_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 08:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alertas', '0002_indice_fecha_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alerta',
+            index=models.Index(fields=['tipo', 'origen_id', 'estado'], name='alerta_tipo_origen_idx'),
+        ),
+    ]
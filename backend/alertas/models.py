@@ -30,5 +30,13 @@ class Alerta(models.Model):
     # Quién resolvió la alerta (opcional)
     resuelta_por = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
 
+    class Meta:
+        indexes = [
+            # Paginación por cursor (fecha_creacion, id)
+            models.Index(fields=['fecha_creacion', 'id'], name='alerta_fecha_id_idx'),
+            # Búsqueda de alertas pendientes por origen en alertas.motor
+            models.Index(fields=['tipo', 'origen_id', 'estado'], name='alerta_tipo_origen_idx'),
+        ]
+
     def __str__(self):
         return f"Alerta [{self.tipo}] - {self.estado} - {self.mensaje[:30]}"
@@ -0,0 +1,104 @@
+# alertas/motor.py
+"""
+Motor de reglas de alertas.
+
+Cada regla define los objetos que cumplen la condición de alerta. Las alertas
+nuevas se obtienen con una sola consulta por regla, que excluye (anti-join)
+los objetos que ya tienen una alerta pendiente del mismo tipo, y se insertan
+con bulk_create. El costo no depende de cuántas alertas ya existan.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from .models import Alerta
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 1000
+
+DIAS_ORDEN_INACTIVA = 10
+DIAS_SOLICITUD_INACTIVA = 5
+
+
+class Regla:
+    """
+    `candidatos()` devuelve el queryset de objetos en condición de alerta,
+    `campos` son las columnas que necesita `mensaje(fila)` para redactarla.
+    """
+    def __init__(self, tipo, candidatos, campos, mensaje):
+        self.tipo = tipo
+        self.candidatos = candidatos
+        self.campos = campos
+        self.mensaje = mensaje
+
+
+def _ordenes_inactivas():
+    from ordenes.models import OrdenesCompras
+    limite = timezone.now() - timedelta(days=DIAS_ORDEN_INACTIVA)
+    return OrdenesCompras.objects.filter(estado__in=['pendiente', 'items pendientes'], fecha__lte=limite)
+
+
+def _solicitudes_inactivas():
+    from ordenes.models import Solicitud
+    limite = timezone.now() - timedelta(days=DIAS_SOLICITUD_INACTIVA)
+    return Solicitud.objects.filter(estado='pendiente', fecha_creacion__lte=limite)
+
+
+def _productos_stock_bajo():
+    from bodega.models import Producto
+    return Producto.objects.filter(stock_actual__lt=F('stock_minimo'))
+
+
+REGLAS = {
+    'orden_no_actualizada': Regla(
+        'orden_no_actualizada', _ordenes_inactivas, ['numero_orden'],
+        lambda fila: f"La OC {fila['numero_orden']} no ha cambiado a 'completa' en {DIAS_ORDEN_INACTIVA} días.",
+    ),
+    'solicitud_no_actualizada': Regla(
+        'solicitud_no_actualizada', _solicitudes_inactivas, ['numero_solicitud'],
+        lambda fila: f"La solicitud {fila['numero_solicitud']} no ha cambiado de estado en {DIAS_SOLICITUD_INACTIVA} días.",
+    ),
+    'stock_bajo': Regla(
+        'stock_bajo', _productos_stock_bajo, ['nombre', 'codigo'],
+        lambda fila: f"El producto {fila['nombre']} (código {fila['codigo']}) tiene stock bajo.",
+    ),
+}
+
+
+def evaluar_regla(regla, ids=None):
+    """
+    Crea las alertas pendientes que faltan para `regla`. Si se indican `ids`
+    solo se evalúan esos objetos. Devuelve la cantidad de alertas creadas.
+    """
+    inicio = time.monotonic()
+    candidatos = regla.candidatos()
+    if ids is not None:
+        candidatos = candidatos.filter(pk__in=ids)
+    alerta_pendiente = Alerta.objects.filter(tipo=regla.tipo, origen_id=OuterRef('pk'), estado='pendiente')
+    nuevos = candidatos.filter(~Exists(alerta_pendiente)).order_by('pk').values('pk', *regla.campos)
+
+    total = 0
+    lote = []
+    for fila in nuevos.iterator(chunk_size=TAMANO_LOTE):
+        lote.append(Alerta(tipo=regla.tipo, mensaje=regla.mensaje(fila), origen_id=fila['pk']))
+        if len(lote) == TAMANO_LOTE:
+            total += len(Alerta.objects.bulk_create(lote))
+            lote = []
+    if lote:
+        total += len(Alerta.objects.bulk_create(lote))
+
+    logger.info(f"alertas {regla.tipo}: {total} nuevas en {time.monotonic() - inicio:.2f}s")
+    return total
+
+
+def evaluar(tipo, ids=None):
+    return evaluar_regla(REGLAS[tipo], ids)
+
+
+def evaluar_todas():
+    """Evalúa todas las reglas y devuelve {tipo: alertas creadas}."""
+    return {tipo: evaluar_regla(regla) for tipo, regla in REGLAS.items()}
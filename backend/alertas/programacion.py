@@ -0,0 +1,74 @@
+# alertas/programacion.py
+"""
+Tareas programadas de django_q del proyecto.
+
+`sincronizar` deja la tabla django_q_schedule igual a TAREAS, buscando cada
+tarea por nombre: crea las que faltan, corrige función y frecuencia de las
+existentes sin tocar su próxima ejecución y elimina los duplicados que
+dejaba la versión anterior (un schedule nuevo en cada arranque). Se ejecuta
+al final de `migrate` (señal post_migrate) y con el comando
+sincronizar_tareas; cargar la aplicación ya no consulta la base de datos.
+"""
+import logging
+from collections import namedtuple
+
+from django.db import connections, transaction
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+Tarea = namedtuple('Tarea', 'nombre func frecuencia')
+
+# Frecuencias de django_q: 'H' cada hora, 'D' diaria
+TAREAS = (
+    Tarea('revisar_ordenes_inactivas', 'alertas.tasks.revisar_ordenes_inactivas', 'D'),
+    Tarea('revisar_solicitudes_inactivas', 'alertas.tasks.revisar_solicitudes_inactivas', 'D'),
+    Tarea('revisar_stock_bajo', 'alertas.tasks.revisar_stock_bajo', 'D'),
+    Tarea('expirar_ordenes', 'ordenes.tasks.expirar_ordenes', 'H'),
+    Tarea('calcular_sugerencias_compra', 'bodega.tasks.calcular_sugerencias_compra', 'D'),
+)
+
+
+def sincronizar(using='default'):
+    """Aplica TAREAS sobre django_q_schedule. Devuelve {'creadas', 'actualizadas', 'eliminadas'}."""
+    from django_q.models import Schedule
+
+    resultado = {'creadas': 0, 'actualizadas': 0, 'eliminadas': 0}
+    schedules = Schedule.objects.using(using)
+    with transaction.atomic(using=using):
+        for tarea in TAREAS:
+            existentes = list(
+                schedules.select_for_update()
+                .filter(Q(name=tarea.nombre) | Q(name__isnull=True, func=tarea.func) | Q(name='', func=tarea.func))
+                .order_by('id')
+            )
+            if not existentes:
+                schedules.create(
+                    name=tarea.nombre, func=tarea.func, schedule_type=tarea.frecuencia, repeats=-1,
+                )
+                resultado['creadas'] += 1
+                continue
+
+            # Se conserva el que ya tiene el nombre o, si no, el más antiguo
+            conservado = next((s for s in existentes if s.name == tarea.nombre), existentes[0])
+            sobrantes = [s.pk for s in existentes if s.pk != conservado.pk]
+            if sobrantes:
+                resultado['eliminadas'] += schedules.filter(pk__in=sobrantes).delete()[0]
+            if (conservado.name, conservado.func, conservado.schedule_type) != (tarea.nombre, tarea.func, tarea.frecuencia):
+                conservado.name = tarea.nombre
+                conservado.func = tarea.func
+                conservado.schedule_type = tarea.frecuencia
+                conservado.save(using=using, update_fields=['name', 'func', 'schedule_type'])
+                resultado['actualizadas'] += 1
+
+    logger.info(f"sincronizar tareas: {resultado}")
+    return resultado
+
+
+def sincronizar_despues_de_migrar(sender, using='default', **kwargs):
+    """Receptor de post_migrate; omite la sincronización si django_q aún no está migrado."""
+    from django_q.models import Schedule
+
+    if Schedule._meta.db_table not in connections[using].introspection.table_names():
+        return
+    sincronizar(using=using)
@@ -1,3 +1,132 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+import io
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from bodega.models import Producto
+from movimientos.services import registrar_entradas, registrar_salidas
+from ordenes.models import OrdenesCompras, Proveedor
+from usuarios.models import Usuario
+from .models import Alerta
+from .motor import evaluar
+from .programacion import TAREAS, sincronizar
+
+
+class MotorAlertasTests(TestCase):
+    def crear_productos(self, cantidad, inicio=0):
+        for i in range(inicio, inicio + cantidad):
+            Producto.objects.create(
+                codigo=f'P{i}', nombre=f'Producto {i}', categoria='-', precio_compra=1,
+                ubicacion='-', stock_actual=1, stock_minimo=5
+            )
+
+    def test_stock_bajo_sin_duplicados(self):
+        self.crear_productos(3)
+        Producto.objects.create(codigo='OK', nombre='Con stock', categoria='-', precio_compra=1,
+                                ubicacion='-', stock_actual=10, stock_minimo=5)
+        self.assertEqual(evaluar('stock_bajo'), 3)
+        self.assertEqual(evaluar('stock_bajo'), 0)
+        Alerta.objects.filter(origen_id=Producto.objects.get(codigo='P0').pk).update(estado='resuelta')
+        self.assertEqual(evaluar('stock_bajo'), 1)
+
+    def test_consultas_no_dependen_de_la_cantidad(self):
+        self.crear_productos(2)
+        with CaptureQueriesContext(connection) as pocas:
+            evaluar('stock_bajo')
+        self.crear_productos(50, inicio=2)
+        with CaptureQueriesContext(connection) as muchas:
+            self.assertEqual(evaluar('stock_bajo'), 50)
+        self.assertEqual(len(muchas.captured_queries), len(pocas.captured_queries))
+
+    def test_ordenes_inactivas(self):
+        proveedor = Proveedor.objects.create(
+            nombre_proveedor='Proveedor', rut='1-9', domicilio='-', ubicacion='-',
+            email='p@example.com', telefono='-'
+        )
+        for numero in ('1', '2'):
+            OrdenesCompras.objects.create(
+                numero_orden=numero, empresa='Maquinarias Imperia SPA', proveedor=proveedor,
+                cargo='-', forma_pago='-', plazo_entrega='-'
+            )
+        OrdenesCompras.objects.filter(numero_orden='1').update(fecha=timezone.now() - timedelta(days=11))
+        self.assertEqual(evaluar('orden_no_actualizada'), 1)
+        self.assertIn('OC 1', Alerta.objects.get(tipo='orden_no_actualizada').mensaje)
+
+
+@override_settings(ALERTA_SALIDA_ALTA_MONTO=100000)
+class AlertasEnMovimientosTests(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create(username='bodega')
+        self.producto = Producto.objects.create(
+            codigo='P1', nombre='Bomba', categoria='-', precio_compra=20000,
+            ubicacion='-', stock_actual=10, stock_minimo=5
+        )
+        self.otro = Producto.objects.create(
+            codigo='P2', nombre='Perno', categoria='-', precio_compra=100,
+            ubicacion='-', stock_actual=1, stock_minimo=5
+        )
+
+    def despachar(self, cantidad):
+        with self.captureOnCommitCallbacks(execute=True):
+            return registrar_salidas(self.usuario, '', [{'producto': self.producto.pk, 'cantidad': cantidad, 'cargo': 'bodega'}])
+
+    def test_salida_bajo_minimo_genera_alerta_solo_del_producto(self):
+        self.despachar(2)
+        self.assertFalse(Alerta.objects.exists())
+        self.despachar(4)
+        alertas = Alerta.objects.filter(tipo='stock_bajo')
+        self.assertEqual([a.origen_id for a in alertas], [self.producto.pk])
+        self.despachar(1)
+        self.assertEqual(Alerta.objects.filter(tipo='stock_bajo').count(), 1)
+
+    def test_salida_de_alto_valor(self):
+        salidas = self.despachar(5)
+        alerta = Alerta.objects.get(tipo='salida_alta')
+        self.assertEqual(alerta.origen_id, salidas[0].pk)
+        self.assertIn('P1', alerta.mensaje)
+
+    def test_entrada_evalua_solo_productos_tocados(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            registrar_entradas(self.usuario, 'compra', '', [{
+                'producto': self.producto, 'cantidad': 1, 'costo_unitario': 20000, 'orden_compra': None,
+            }])
+        self.assertFalse(Alerta.objects.filter(origen_id=self.otro.pk).exists())
+
+    def test_despacho_rechazado_no_genera_alertas(self):
+        with self.assertRaises(ValidationError):
+            self.despachar(50)
+        self.assertFalse(Alerta.objects.exists())
+
+
+class ProgramacionTareasTests(TestCase):
+    def test_sincronizar_es_idempotente_y_limpia_duplicados(self):
+        from django_q.models import Schedule
+
+        # migrate ya las registró al crear la base de pruebas
+        self.assertEqual(Schedule.objects.count(), len(TAREAS))
+        Schedule.objects.all().delete()
+        # Lo que dejaban dos arranques con la versión anterior
+        for _ in range(2):
+            Schedule.objects.create(func='alertas.tasks.revisar_stock_bajo', schedule_type='D')
+        Schedule.objects.create(name='expirar_ordenes', func='ordenes.tasks.expirar_ordenes', schedule_type='D')
+
+        resultado = sincronizar()
+        self.assertEqual(resultado, {'creadas': len(TAREAS) - 2, 'actualizadas': 2, 'eliminadas': 1})
+        self.assertEqual(
+            set(Schedule.objects.values_list('name', 'func', 'schedule_type')),
+            {(t.nombre, t.func, t.frecuencia) for t in TAREAS},
+        )
+        call_command('sincronizar_tareas', stdout=io.StringIO())
+        self.assertEqual(sincronizar(), {'creadas': 0, 'actualizadas': 0, 'eliminadas': 0})
+
+    def test_ready_no_consulta_la_base(self):
+        with CaptureQueriesContext(connection) as consultas:
+            apps.get_app_config('alertas').ready()
+        self.assertEqual(len(consultas), 0)
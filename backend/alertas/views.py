@@ -3,24 +3,25 @@ from datetime import datetime
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from SolDega.pagination import FechaCreacionCursorPagination
 from .models import Alerta
 from .serializers import AlertaSerializer
 
 class AlertaViewSet(viewsets.ModelViewSet):
     queryset = Alerta.objects.all().order_by('-fecha_creacion')
     serializer_class = AlertaSerializer
+    pagination_class = FechaCreacionCursorPagination
 
-    def list(self, request, *args, **kwargs):
+    def get_queryset(self):
         # Permite filtrar alertas por fecha mediante query params
-        queryset = self.get_queryset()
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
+        queryset = super().get_queryset()
+        start_date = self.request.query_params.get('start_date')
+        end_date = self.request.query_params.get('end_date')
         if start_date:
             queryset = queryset.filter(fecha_creacion__gte=start_date)
         if end_date:
             queryset = queryset.filter(fecha_creacion__lte=end_date)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return queryset
 
     # Acción para resolver (aprobar o rechazar) una alerta
     @action(detail=True, methods=['patch'])
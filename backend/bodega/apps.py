@@ -1,6 +1,10 @@
+# bodega/apps.py
 from django.apps import AppConfig
 
 
 class BodegaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bodega'
+
+    def ready(self):
+        import bodega.signals
@@ -0,0 +1,106 @@
+# bodega/busqueda.py
+"""
+Búsqueda de productos por código, nombre y descripción.
+
+En PostgreSQL usa los índices creados en la migración 0005: trigramas sobre
+UPPER(codigo) y UPPER(nombre), que aceleran los ILIKE '%texto%', y un
+tsvector en español sobre nombre + descripción. Los resultados se ordenan
+por relevancia, con prioridad para los códigos que coinciden o empiezan con
+el texto buscado, y no se devuelven más de LIMITE_RESULTADOS filas (la
+exportación pide limite=None y recibe todas las coincidencias).
+
+En otros motores (SQLite en los tests) se filtra con LIKE y la relevancia se
+calcula en Python con la misma escala, para que el orden sea equivalente.
+"""
+from difflib import SequenceMatcher
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import BooleanField, Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+LIMITE_RESULTADOS = 50
+
+# Debe coincidir con la expresión del índice bodega_producto_busqueda_fts
+VECTOR_SQL = "to_tsvector('spanish', coalesce(nombre, '') || ' ' || coalesce(descripcion, ''))"
+
+# Bonificaciones por coincidencia de código; la similitud y el ts_rank quedan entre 0 y 1
+PUNTAJE_CODIGO_EXACTO = 3.0
+PUNTAJE_CODIGO_PREFIJO = 2.0
+
+
+def buscar_productos(queryset, texto, limite=LIMITE_RESULTADOS):
+    """Filtra `queryset` por `texto` y lo devuelve ordenado por relevancia (`limite=None`: sin límite)."""
+    texto = ' '.join(texto.split())
+    if not texto:
+        return queryset
+    if connections[queryset.db].vendor == 'postgresql':
+        return _buscar_postgresql(queryset, texto, limite)
+    return _buscar_python(queryset, texto, limite)
+
+
+def _bonificacion_codigo(texto):
+    return Case(
+        When(codigo__iexact=texto, then=Value(PUNTAJE_CODIGO_EXACTO)),
+        When(codigo__istartswith=texto, then=Value(PUNTAJE_CODIGO_PREFIJO)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _buscar_postgresql(queryset, texto, limite):
+    coincide_texto = RawSQL(f"{VECTOR_SQL} @@ plainto_tsquery('spanish', %s)", [texto], output_field=BooleanField())
+    rango_texto = RawSQL(f"ts_rank({VECTOR_SQL}, plainto_tsquery('spanish', %s))", [texto], output_field=FloatField())
+    return (
+        queryset
+        .alias(coincide_texto=coincide_texto)
+        .filter(Q(codigo__icontains=texto) | Q(nombre__icontains=texto) | Q(coincide_texto=True))
+        .annotate(rango=_bonificacion_codigo(texto) + TrigramSimilarity('nombre', texto) + rango_texto)
+        .order_by('-rango', 'codigo')[:limite]
+    )
+
+
+def _puntaje(texto, codigo, nombre, descripcion):
+    texto = texto.lower()
+    codigo = (codigo or '').lower()
+    if codigo == texto:
+        puntaje = PUNTAJE_CODIGO_EXACTO
+    elif codigo.startswith(texto):
+        puntaje = PUNTAJE_CODIGO_PREFIJO
+    else:
+        puntaje = 0.0
+    puntaje += SequenceMatcher(None, texto, (nombre or '').lower()).ratio()
+    contenido = f"{nombre or ''} {descripcion or ''}".lower()
+    palabras = texto.split()
+    puntaje += sum(palabra in contenido for palabra in palabras) / len(palabras)
+    return puntaje
+
+
+def _buscar_python(queryset, texto, limite):
+    condicion = Q(codigo__icontains=texto) | Q(nombre__icontains=texto)
+    todas = Q()
+    for palabra in texto.split():
+        todas &= Q(nombre__icontains=palabra) | Q(descripcion__icontains=palabra)
+    candidatos = queryset.filter(condicion | todas).values_list('pk', 'codigo', 'nombre', 'descripcion')
+    puntajes = sorted(
+        ((-_puntaje(texto, codigo, nombre, descripcion), codigo, pk) for pk, codigo, nombre, descripcion in candidatos)
+    )[:limite]
+    ids = [pk for _, _, pk in puntajes]
+    if not ids:
+        return queryset.none()
+    return queryset.filter(pk__in=ids).order_by(
+        Case(*[When(pk=pk, then=Value(posicion)) for posicion, pk in enumerate(ids)])
+    )
+
+
+class BusquedaProductoFilter(BaseFilterBackend):
+    """
+    Reemplaza a SearchFilter en ProductoViewSet; usa el mismo parámetro
+    `?search=`. Debe ir después de OrderingFilter porque fija su propio orden.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        texto = request.query_params.get(self.search_param, '')
+        return buscar_productos(queryset, texto, getattr(view, 'limite_busqueda', LIMITE_RESULTADOS))
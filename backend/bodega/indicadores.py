@@ -0,0 +1,51 @@
+# bodega/indicadores.py
+"""
+Valorización del inventario e indicadores de stock calculados en SQL.
+
+El resultado se guarda en la caché de Django con la versión del catálogo en
+la clave: toda escritura de stock (save, entradas, salidas, importación)
+toma una versión nueva, así que la caché se invalida sola y el TTL solo
+limita cuánto tiempo se conserva una entrada que ya no se consulta.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+
+from .models import Producto, VersionCatalogo
+
+AGRUPACION = ('categoria', 'ubicacion', 'consignacion')
+
+
+def _calcular():
+    valor = ExpressionWrapper(F('stock_actual') * F('precio_compra'), output_field=DecimalField(max_digits=20, decimal_places=2))
+    grupos = list(
+        Producto.objects.values(*AGRUPACION)
+        .annotate(
+            productos=Count('id'),
+            unidades=Sum('stock_actual'),
+            valor=Sum(valor),
+            bajo_minimo=Count('id', filter=Q(stock_actual__lt=F('stock_minimo'))),
+            sin_stock=Count('id', filter=Q(stock_actual=0)),
+        )
+        .order_by(*AGRUPACION)
+    )
+    totales = {'productos': 0, 'unidades': 0, 'valor': Decimal('0'), 'bajo_minimo': 0, 'sin_stock': 0}
+    for grupo in grupos:
+        grupo['valor'] = grupo['valor'] or Decimal('0')
+        grupo['unidades'] = grupo['unidades'] or 0
+        for campo in totales:
+            totales[campo] += grupo[campo]
+    return {'totales': totales, 'grupos': grupos}
+
+
+def valorizacion_inventario():
+    """Devuelve {'version', 'totales', 'grupos'}; usa la caché si la versión no cambió."""
+    version = VersionCatalogo.actual()
+    clave = f"bodega:valorizacion:{version}"
+    datos = cache.get(clave)
+    if datos is None:
+        datos = _calcular()
+        cache.set(clave, datos, settings.VALORIZACION_CACHE_SEGUNDOS)
+    return {'version': version, **datos}
@@ -0,0 +1,189 @@
+# bodega/management/commands/importar_productos.py
+"""
+Importa o actualiza productos desde una planilla de inventario (.xlsx).
+
+La planilla se lee en modo read_only de openpyxl, fila por fila, y se procesa
+en lotes: cada lote se valida, se inserta o actualiza por `codigo` con un solo
+bulk_create(update_conflicts=True) y se descarta, así la memoria no depende
+del tamaño del archivo. Las filas con errores se escriben en un CSV.
+
+El stock de la planilla solo se usa al crear un producto. En los existentes
+no se modifica: stock_actual tiene que cuadrar con las entradas y salidas
+registradas (kardex, consumo mensual, alertas), y la importación no registra
+movimientos. Las filas cuyo stock difiere se cuentan en el resumen para
+ajustarlas con una entrada o salida.
+
+Columnas (sin encabezado, igual que el script anterior):
+    D código, E nombre, F stock, H ubicación
+
+Uso:
+    python manage.py importar_productos "INVENTARIO A B.xlsx" --dry-run
+"""
+import csv
+import time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from openpyxl import load_workbook
+
+from bodega.models import Producto, VersionCatalogo
+
+COLUMNA_CODIGO = 3     # D
+COLUMNA_NOMBRE = 4     # E
+COLUMNA_STOCK = 5      # F
+COLUMNA_UBICACION = 7  # H
+
+# Valores para los productos nuevos; en los existentes no se modifican
+VALORES_NUEVOS = {
+    'descripcion': 'n/a',
+    'categoria': 'pieza-equipo',
+    'tipo': 'inv',
+    'precio_compra': Decimal('1000'),
+    'stock_minimo': 3,
+    'consignacion': False,
+}
+
+# Campos que la planilla actualiza en los productos existentes (el stock no: ver arriba)
+CAMPOS_ACTUALIZADOS = ['nombre', 'ubicacion', 'version']
+
+
+def _celda(fila, indice):
+    valor = fila[indice] if indice < len(fila) else None
+    return '' if valor is None else str(valor).strip()
+
+
+def _stock(valor):
+    try:
+        numero = Decimal(valor)
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError(f"stock '{valor}' no es numérico")
+    if numero != numero.to_integral_value() or numero < 0:
+        raise ValueError(f"stock '{valor}' debe ser un entero positivo")
+    return int(numero)
+
+
+def validar_fila(fila):
+    """Devuelve los datos del producto o lanza ValueError con el motivo del rechazo."""
+    codigo = _celda(fila, COLUMNA_CODIGO)
+    nombre = _celda(fila, COLUMNA_NOMBRE)
+    ubicacion = _celda(fila, COLUMNA_UBICACION)
+    if not codigo:
+        raise ValueError("código vacío")
+    if len(codigo) > Producto._meta.get_field('codigo').max_length:
+        raise ValueError("código demasiado largo")
+    if not nombre:
+        raise ValueError("nombre vacío")
+    if len(nombre) > Producto._meta.get_field('nombre').max_length:
+        raise ValueError("nombre demasiado largo")
+    if not ubicacion:
+        raise ValueError("ubicación vacía")
+    if len(ubicacion) > Producto._meta.get_field('ubicacion').max_length:
+        raise ValueError("ubicación demasiado larga")
+    return {
+        'codigo': codigo,
+        'nombre': nombre,
+        'stock_actual': _stock(fila[COLUMNA_STOCK] if COLUMNA_STOCK < len(fila) else None),
+        'ubicacion': ubicacion,
+    }
+
+
+class Command(BaseCommand):
+    help = "Importa o actualiza productos desde una planilla .xlsx, por lotes y con reporte de filas rechazadas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help="Ruta de la planilla .xlsx")
+        parser.add_argument('--hoja', help="Nombre de la hoja (por defecto la activa)")
+        parser.add_argument('--fila-inicial', type=int, default=1, help="Primera fila con datos (1 = sin encabezado)")
+        parser.add_argument('--lote', type=int, default=1000, help="Filas por lote")
+        parser.add_argument('--rechazados', help="CSV de filas rechazadas (por defecto <archivo>.rechazados.csv)")
+        parser.add_argument('--dry-run', action='store_true', help="Valida y cuenta sin escribir en la base de datos")
+
+    def handle(self, *args, **options):
+        archivo = Path(options['archivo'])
+        if not archivo.exists():
+            raise CommandError(f"No existe el archivo {archivo}")
+        if options['lote'] < 1:
+            raise CommandError("--lote debe ser mayor que 0")
+        ruta_rechazados = Path(options['rechazados'] or f"{archivo}.rechazados.csv")
+        self.dry_run = options['dry_run']
+
+        libro = load_workbook(archivo, read_only=True, data_only=True)
+        try:
+            if options['hoja']:
+                if options['hoja'] not in libro.sheetnames:
+                    raise CommandError(f"La hoja '{options['hoja']}' no existe")
+                hoja = libro[options['hoja']]
+            else:
+                hoja = libro.active
+
+            inicio = time.monotonic()
+            self.totales = {'nuevos': 0, 'actualizados': 0, 'rechazados': 0, 'stock_distinto': 0}
+            vistos = set()
+            with open(ruta_rechazados, 'w', newline='', encoding='utf-8') as salida:
+                self.rechazados = csv.writer(salida)
+                self.rechazados.writerow(['fila', 'codigo', 'nombre', 'stock', 'ubicacion', 'error'])
+                lote = []
+                filas = hoja.iter_rows(min_row=options['fila_inicial'], values_only=True)
+                for numero, fila in enumerate(filas, start=options['fila_inicial']):
+                    if not any(valor is not None for valor in fila):
+                        continue
+                    try:
+                        datos = validar_fila(fila)
+                    except ValueError as e:
+                        self._rechazar(numero, fila, str(e))
+                        continue
+                    if datos['codigo'] in vistos:
+                        self._rechazar(numero, fila, "código repetido en la planilla")
+                        continue
+                    vistos.add(datos['codigo'])
+                    lote.append(datos)
+                    if len(lote) == options['lote']:
+                        self._guardar_lote(lote)
+                        lote = []
+                if lote:
+                    self._guardar_lote(lote)
+        finally:
+            libro.close()
+
+        modo = " (dry-run, sin cambios)" if self.dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{self.totales['nuevos']} nuevos, {self.totales['actualizados']} actualizados, "
+            f"{self.totales['rechazados']} rechazados en {time.monotonic() - inicio:.1f}s{modo}"
+        ))
+        if self.totales['rechazados']:
+            self.stdout.write(f"Filas rechazadas en {ruta_rechazados}")
+        if self.totales['stock_distinto']:
+            self.stdout.write(self.style.WARNING(
+                f"{self.totales['stock_distinto']} productos existentes con stock distinto al de la planilla; "
+                f"no se modificó, ajústelo con una entrada o salida"
+            ))
+
+    def _rechazar(self, numero, fila, error):
+        self.totales['rechazados'] += 1
+        self.rechazados.writerow([
+            numero, _celda(fila, COLUMNA_CODIGO), _celda(fila, COLUMNA_NOMBRE),
+            _celda(fila, COLUMNA_STOCK), _celda(fila, COLUMNA_UBICACION), error,
+        ])
+
+    def _guardar_lote(self, lote):
+        existentes = dict(
+            Producto.objects.filter(codigo__in=[datos['codigo'] for datos in lote]).values_list('codigo', 'stock_actual')
+        )
+        self.totales['actualizados'] += len(existentes)
+        self.totales['stock_distinto'] += sum(
+            1 for datos in lote if datos['codigo'] in existentes and existentes[datos['codigo']] != datos['stock_actual']
+        )
+        self.totales['nuevos'] += len(lote) - len(existentes)
+        if self.dry_run:
+            return
+        with transaction.atomic():
+            # bulk_create no pasa por Producto.save(); la versión se asigna por lote
+            version = VersionCatalogo.siguiente()
+            Producto.objects.bulk_create(
+                [Producto(version=version, **VALORES_NUEVOS, **datos) for datos in lote],
+                update_conflicts=True,
+                unique_fields=['codigo'],
+                update_fields=CAMPOS_ACTUALIZADOS,
+            )
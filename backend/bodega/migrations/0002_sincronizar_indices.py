@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 08:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bodega', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='producto',
+            name='categoria',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='producto',
+            name='codigo',
+            field=models.CharField(db_index=True, max_length=40, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='producto',
+            name='nombre',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='producto',
+            name='ubicacion',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2 on 2026-10-18 08:47
+
+from django.db import migrations
+
+
+def iniciar_version(apps, schema_editor):
+    # Los productos existentes quedan en la versión 1, así `desde=0` los incluye
+    VersionCatalogo = apps.get_model('bodega', 'VersionCatalogo')
+    Producto = apps.get_model('bodega', 'Producto')
+    VersionCatalogo.objects.update_or_create(pk=1, defaults={'valor': 1})
+    Producto.objects.update(version=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bodega', '0003_version_catalogo'),
+    ]
+
+    operations = [
+        migrations.RunPython(iniciar_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+INDICES = [
+    "CREATE INDEX IF NOT EXISTS bodega_producto_codigo_trgm ON bodega_producto USING gin (UPPER(codigo::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS bodega_producto_nombre_trgm ON bodega_producto USING gin (UPPER(nombre::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS bodega_producto_busqueda_fts ON bodega_producto USING gin "
+    "(to_tsvector('spanish', coalesce(nombre, '') || ' ' || coalesce(descripcion, '')))",
+]
+
+
+def crear_indices(apps, schema_editor):
+    # Los índices de trigramas y tsvector solo existen en PostgreSQL
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for sql in INDICES:
+        schema_editor.execute(sql)
+
+
+def eliminar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nombre in ('bodega_producto_codigo_trgm', 'bodega_producto_nombre_trgm', 'bodega_producto_busqueda_fts'):
+        schema_editor.execute(f"DROP INDEX IF EXISTS {nombre}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bodega', '0004_iniciar_version_catalogo'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
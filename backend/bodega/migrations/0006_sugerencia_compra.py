@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-18 08:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bodega', '0005_indices_busqueda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SugerenciaCompra',
+            fields=[
+                ('producto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sugerencia_compra', serialize=False, to='bodega.producto')),
+                ('demanda_diaria', models.FloatField()),
+                ('desviacion_diaria', models.FloatField()),
+                ('lead_time_dias', models.FloatField()),
+                ('stock_seguridad', models.PositiveIntegerField()),
+                ('punto_reorden', models.PositiveIntegerField(db_index=True)),
+                ('nivel_objetivo', models.PositiveIntegerField()),
+                ('fecha_calculo', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.db.models import Max
+
+SECUENCIA = 'bodega_version_catalogo'
+
+
+def crear_secuencia(apps, schema_editor):
+    # Solo PostgreSQL (ver VersionCatalogo); continúa después de la última versión asignada
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    VersionCatalogo = apps.get_model('bodega', 'VersionCatalogo')
+    Producto = apps.get_model('bodega', 'Producto')
+    ProductoEliminado = apps.get_model('bodega', 'ProductoEliminado')
+    ultima = max(
+        VersionCatalogo.objects.filter(pk=1).values_list('valor', flat=True).first() or 0,
+        Producto.objects.aggregate(v=Max('version'))['v'] or 0,
+        ProductoEliminado.objects.aggregate(v=Max('version'))['v'] or 0,
+    )
+    schema_editor.execute(f"CREATE SEQUENCE {SECUENCIA} START WITH {ultima + 1} MINVALUE 1")
+
+
+def borrar_secuencia(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f"DROP SEQUENCE IF EXISTS {SECUENCIA}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bodega', '0006_sugerencia_compra'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_secuencia, borrar_secuencia),
+    ]
@@ -1,4 +1,80 @@
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import F
+
+
+class VersionCatalogo(models.Model):
+    """
+    Versiones del catálogo de productos. Cada transacción que escribe
+    productos toma una versión nueva con `siguiente()` (dentro de la
+    transacción) y la guarda en las filas que cambia; los clientes
+    sincronizan pidiendo los cambios posteriores a la última `actual()`.
+
+    En PostgreSQL la versión sale de la secuencia SECUENCIA: nextval no
+    bloquea ninguna fila, así las escrituras de productos distintos corren en
+    paralelo. Como las transacciones pueden confirmarse en otro orden que el
+    de sus versiones, cada una tiene tomado un advisory lock (EN_CURSO,
+    versión) hasta su commit o rollback, y `actual()` devuelve la versión más
+    alta por debajo de la cual no queda ninguna en curso: todo cambio con esa
+    versión o una menor ya está confirmado (o no existirá), y un cliente que
+    sincroniza hasta ella nunca se salta uno. La asignación y la lectura se
+    excluyen con el lock ASIGNACION (compartido al asignar, exclusivo al
+    leer, tomado solo durante esas dos consultas) para que `actual()` no vea
+    una versión ya sacada de la secuencia cuyo lock aún no se toma.
+
+    En otros motores (SQLite en las pruebas) se usa el contador de la fila
+    pk=1, que queda bloqueada hasta el commit. Para no caer en un deadlock
+    con él, `siguiente()` va antes de bloquear o escribir filas de Producto
+    (o de insertar filas que las referencian).
+    """
+    SECUENCIA = 'bodega_version_catalogo'
+    # Claves de advisory lock (int4) propias del catálogo
+    ASIGNACION = 7_020_001
+    EN_CURSO = 7_020_002
+
+    valor = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def siguiente(cls):
+        if connection.vendor != 'postgresql':
+            return cls._siguiente_contador()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock_shared(%s)", [cls.ASIGNACION])
+            try:
+                cursor.execute("SELECT nextval(%s)", [cls.SECUENCIA])
+                version = cursor.fetchone()[0]
+                cursor.execute("SELECT pg_advisory_xact_lock_shared(%s, %s::integer)", [cls.EN_CURSO, version])
+            finally:
+                cursor.execute("SELECT pg_advisory_unlock_shared(%s)", [cls.ASIGNACION])
+        return version
+
+    @classmethod
+    def _siguiente_contador(cls):
+        with transaction.atomic():
+            if not cls.objects.filter(pk=1).update(valor=F('valor') + 1):
+                _, creado = cls.objects.get_or_create(pk=1, defaults={'valor': 1})
+                if not creado:
+                    cls.objects.filter(pk=1).update(valor=F('valor') + 1)
+            return cls.objects.values_list('valor', flat=True).get(pk=1)
+
+    @classmethod
+    def actual(cls):
+        if connection.vendor != 'postgresql':
+            return cls.objects.filter(pk=1).values_list('valor', flat=True).first() or 0
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", [cls.ASIGNACION])
+            try:
+                cursor.execute(f"""
+                    SELECT COALESCE(
+                        (SELECT MIN(objid::bigint) - 1 FROM pg_locks
+                         WHERE locktype = 'advisory' AND classid = %s AND objsubid = 2 AND granted
+                           AND database = (SELECT oid FROM pg_database WHERE datname = current_database())),
+                        (SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM {cls.SECUENCIA})
+                    )
+                """, [cls.EN_CURSO])
+                return cursor.fetchone()[0]
+            finally:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [cls.ASIGNACION])
+
 
 class Producto(models.Model):
     codigo = models.CharField(max_length=40, unique=True, db_index=True)
@@ -12,11 +88,51 @@ class Producto(models.Model):
     consignacion = models.BooleanField(default=False)
     nombre_consignacion = models.CharField(max_length=100, blank=True, null=True)
     ubicacion = models.CharField(max_length=100, db_index=True)
+    # Versión del catálogo en la que cambió el producto por última vez
+    version = models.PositiveBigIntegerField(default=0, db_index=True)
 
 
     @property
     def valor_total(self):
         return self.stock_actual * self.precio_compra
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            self.version = VersionCatalogo.siguiente()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'version'}
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.codigo} - {self.nombre}"
+
+
+class ProductoEliminado(models.Model):
+    """Marca de borrado para que los clientes sincronizados quiten el producto."""
+    producto_id = models.BigIntegerField()
+    codigo = models.CharField(max_length=40)
+    version = models.PositiveBigIntegerField(db_index=True)
+    fecha = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.codigo} eliminado (v{self.version})"
+
+
+class SugerenciaCompra(models.Model):
+    """
+    Punto de reorden y nivel objetivo calculados por bodega.pronostico a
+    partir del historial de salidas. Se recalcula completa en cada ejecución.
+    """
+    producto = models.OneToOneField(Producto, on_delete=models.CASCADE, primary_key=True, related_name='sugerencia_compra')
+    demanda_diaria = models.FloatField()
+    desviacion_diaria = models.FloatField()
+    lead_time_dias = models.FloatField()
+    stock_seguridad = models.PositiveIntegerField()
+    punto_reorden = models.PositiveIntegerField(db_index=True)
+    # Stock al que se quiere llegar al comprar; la cantidad sugerida es nivel_objetivo - stock_actual
+    nivel_objetivo = models.PositiveIntegerField()
+    fecha_calculo = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.producto_id}: reorden {self.punto_reorden}, objetivo {self.nivel_objetivo}"
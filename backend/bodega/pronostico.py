@@ -0,0 +1,115 @@
+# bodega/pronostico.py
+"""
+Pronóstico de demanda y punto de reorden por producto.
+
+Para todo el catálogo a la vez:
+  1. Una consulta agrupa las salidas por producto y día y devuelve, por
+     producto, la suma y la suma de cuadrados de la demanda diaria; con eso
+     se obtienen la media y la desviación estándar contando los días sin
+     salidas como demanda cero.
+  2. Una consulta promedia, por producto, los días entre la emisión de la
+     OC y su recepción (entradas con orden de compra). Sin historial se usa
+     el promedio general o LEAD_TIME_DEFECTO_DIAS.
+  3. stock de seguridad = Z * desviación * sqrt(lead time)
+     punto de reorden  = demanda * lead time + stock de seguridad
+     nivel objetivo    = punto de reorden + demanda * DIAS_REVISION
+"""
+import logging
+import math
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Avg, DurationField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import SugerenciaCompra
+
+logger = logging.getLogger(__name__)
+
+DIAS_HISTORIA = 180
+DIAS_HISTORIA_LEAD_TIME = 365
+LEAD_TIME_DEFECTO_DIAS = 14
+# Nivel de servicio del 95%
+Z_NIVEL_SERVICIO = 1.65
+# Cada cuántos días se revisan las compras; define cuánto cubre una compra
+DIAS_REVISION = 30
+TAMANO_LOTE = 2000
+
+
+def demanda_diaria(desde, dias):
+    """{producto_id: (media, desviación)} de la demanda diaria desde `desde`, en una consulta."""
+    from movimientos.models import Salida
+
+    por_dia = (
+        Salida.objects.filter(fecha__gte=desde)
+        .annotate(dia=TruncDate('fecha'))
+        .values('producto_id', 'dia')
+        .annotate(cantidad_dia=Sum('cantidad'))
+        .order_by()
+    )
+    sql, params = por_dia.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT producto_id, SUM(cantidad_dia), SUM(cantidad_dia * cantidad_dia) "
+            f"FROM ({sql}) por_dia GROUP BY producto_id",
+            params,
+        )
+        filas = cursor.fetchall()
+
+    resultado = {}
+    for producto_id, total, cuadrados in filas:
+        media = float(total) / dias
+        varianza = max(float(cuadrados) / dias - media * media, 0.0) * dias / max(dias - 1, 1)
+        resultado[producto_id] = (media, math.sqrt(varianza))
+    return resultado
+
+
+def lead_times(desde):
+    """({producto_id: días promedio entre OC y recepción}, promedio general o None)."""
+    from movimientos.models import Entrada
+
+    demora = ExpressionWrapper(F('fecha') - F('orden_compra__fecha'), output_field=DurationField())
+    recepciones = Entrada.objects.filter(orden_compra__isnull=False, fecha__gte=desde)
+    por_producto = {
+        fila['producto_id']: fila['demora'].total_seconds() / 86400
+        for fila in recepciones.values('producto_id').annotate(demora=Avg(demora)).order_by()
+        if fila['demora'] is not None
+    }
+    general = recepciones.aggregate(demora=Avg(demora))['demora']
+    return por_producto, (general.total_seconds() / 86400 if general is not None else None)
+
+
+def calcular_sugerencias(dias=DIAS_HISTORIA):
+    """Recalcula SugerenciaCompra para todos los productos con salidas. Devuelve cuántas filas escribió."""
+    inicio = time.monotonic()
+    ahora = timezone.now()
+    demandas = demanda_diaria(ahora - timedelta(days=dias), dias)
+    por_producto, general = lead_times(ahora - timedelta(days=DIAS_HISTORIA_LEAD_TIME))
+    lead_defecto = general if general is not None else LEAD_TIME_DEFECTO_DIAS
+
+    sugerencias = []
+    for producto_id, (media, desviacion) in demandas.items():
+        lead = max(por_producto.get(producto_id, lead_defecto), 0.0)
+        seguridad = Z_NIVEL_SERVICIO * desviacion * math.sqrt(lead)
+        punto_reorden = math.ceil(media * lead + seguridad)
+        sugerencias.append(SugerenciaCompra(
+            producto_id=producto_id,
+            demanda_diaria=media,
+            desviacion_diaria=desviacion,
+            lead_time_dias=lead,
+            stock_seguridad=math.ceil(seguridad),
+            punto_reorden=punto_reorden,
+            nivel_objetivo=punto_reorden + math.ceil(media * DIAS_REVISION),
+            fecha_calculo=ahora,
+        ))
+
+    with transaction.atomic():
+        SugerenciaCompra.objects.all().delete()
+        SugerenciaCompra.objects.bulk_create(sugerencias, batch_size=TAMANO_LOTE)
+
+    logger.info(
+        f"calcular_sugerencias: {len(sugerencias)} productos con demanda en {time.monotonic() - inicio:.2f}s"
+    )
+    return len(sugerencias)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Producto
+from .models import Producto, SugerenciaCompra
 
 class ProductoSerializer(serializers.ModelSerializer):
     valor_total = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
@@ -19,5 +19,31 @@ class ProductoSerializer(serializers.ModelSerializer):
             'consignacion',
             'nombre_consignacion',
             'ubicacion',
-            'valor_total'
+            'valor_total',
+            'version',
+        ]
+        read_only_fields = ['version']
+
+
+class SugerenciaCompraSerializer(serializers.ModelSerializer):
+    codigo = serializers.CharField(source='producto.codigo', read_only=True)
+    nombre = serializers.CharField(source='producto.nombre', read_only=True)
+    stock_actual = serializers.IntegerField(source='producto.stock_actual', read_only=True)
+    cantidad_sugerida = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = SugerenciaCompra
+        fields = [
+            'producto',
+            'codigo',
+            'nombre',
+            'stock_actual',
+            'demanda_diaria',
+            'desviacion_diaria',
+            'lead_time_dias',
+            'stock_seguridad',
+            'punto_reorden',
+            'nivel_objetivo',
+            'cantidad_sugerida',
+            'fecha_calculo',
         ]
@@ -0,0 +1,15 @@
+# bodega/signals.py
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from .models import Producto, ProductoEliminado, VersionCatalogo
+
+
+@receiver(pre_delete, sender=Producto)
+def registrar_producto_eliminado(sender, instance, **kwargs):
+    # Antes del DELETE: la versión se toma antes de bloquear la fila del producto.
+    # pre_delete corre dentro de la transacción del borrado, así que se revierte con él.
+    ProductoEliminado.objects.create(
+        producto_id=instance.pk,
+        codigo=instance.codigo,
+        version=VersionCatalogo.siguiente(),
+    )
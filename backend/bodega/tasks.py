@@ -0,0 +1,7 @@
+# bodega/tasks.py
+from bodega.pronostico import calcular_sugerencias
+
+
+def calcular_sugerencias_compra():
+    # Recalcula puntos de reorden y compras sugeridas desde el historial de salidas
+    return calcular_sugerencias()
@@ -1,3 +1,372 @@
-from django.test import TestCase
+import csv
+import io
+import tempfile
+import threading
+from unittest import skipUnless
+from datetime import timedelta
+from pathlib import Path
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.utils import timezone
+from openpyxl import Workbook, load_workbook
+from rest_framework.test import APITestCase
+
+from movimientos.models import Entrada, Salida
+from ordenes.models import OrdenesCompras, Proveedor
+from usuarios.models import Usuario
+from .busqueda import buscar_productos
+from movimientos.services import registrar_entradas, registrar_salidas
+from .models import Producto, SugerenciaCompra, VersionCatalogo
+from .pronostico import calcular_sugerencias
+from .indicadores import valorizacion_inventario
+
+
+class BusquedaProductosTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(Usuario.objects.create(username='bodega'))
+        datos = [
+            ('FIL-100', 'Filtro de aceite', 'Motor diesel'),
+            ('FIL', 'Filtro de aire', ''),
+            ('ACE-15W40', 'Aceite motor 15W40', 'Bidón 20 litros'),
+            ('PER-010', 'Perno hexagonal', 'Para filtro de aceite'),
+            ('GUA-001', 'Guante nitrilo', ''),
+        ]
+        for codigo, nombre, descripcion in datos:
+            Producto.objects.create(
+                codigo=codigo, nombre=nombre, descripcion=descripcion, categoria='repuestos',
+                precio_compra=1000, ubicacion='bodega'
+            )
+
+    def codigos(self, texto, **kwargs):
+        return [p.codigo for p in buscar_productos(Producto.objects.all(), texto, **kwargs)]
+
+    def test_codigo_exacto_y_prefijo_primero(self):
+        self.assertEqual(self.codigos('fil')[:2], ['FIL', 'FIL-100'])
+
+    def test_busca_en_descripcion(self):
+        self.assertIn('PER-010', self.codigos('aceite'))
+        self.assertNotIn('GUA-001', self.codigos('aceite'))
+
+    def test_limite(self):
+        self.assertEqual(len(self.codigos('e', limite=2)), 2)
+
+    def test_endpoint_usa_parametro_search(self):
+        response = self.client.get('/api/productos/', {'search': 'guante'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['codigo'] for p in response.data['results']], ['GUA-001'])
+        response = self.client.get('/api/productos/')
+        self.assertEqual(response.data['count'], 5)
+
+    def test_exportar_csv_y_xlsx(self):
+        response = self.client.get('/api/productos/exportar/', {'formato': 'csv', 'search': 'filtro'})
+        self.assertEqual(response.status_code, 200)
+        lineas = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(lineas[0].split(';')[0], 'Código')
+        self.assertEqual([linea.split(';')[0] for linea in lineas[1:]], ['FIL', 'FIL-100', 'PER-010'])
+
+        response = self.client.get('/api/productos/exportar/', {'formato': 'xlsx'})
+        hoja = load_workbook(io.BytesIO(b''.join(response.streaming_content))).active
+        filas = list(hoja.iter_rows(values_only=True))
+        self.assertEqual(len(filas), 6)
+        self.assertEqual(filas[1][0], 'ACE-15W40')
+        self.assertEqual(filas[1][-1], 0)
+
+        response = self.client.get('/api/productos/exportar/', {'formato': 'pdf'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_exportar_busqueda_sin_limite(self):
+        Producto.objects.bulk_create([
+            Producto(codigo=f'TOR-{i:03d}', nombre=f'Tornillo {i}', categoria='-', ubicacion='-', precio_compra=1)
+            for i in range(60)
+        ])
+        self.assertEqual(self.client.get('/api/productos/', {'search': 'tornillo'}).data['count'], 50)
+        response = self.client.get('/api/productos/exportar/', {'formato': 'csv', 'search': 'tornillo'})
+        lineas = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lineas), 1 + 60)
+
+
+class SincronizacionCatalogoTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(Usuario.objects.create(username='bodega'))
+        self.correa = Producto.objects.create(
+            codigo='C1', nombre='Correa', categoria='-', ubicacion='-', precio_compra=100
+        )
+        self.filtro = Producto.objects.create(
+            codigo='F1', nombre='Filtro', categoria='-', ubicacion='-', precio_compra=50
+        )
+
+    def cambios(self, desde):
+        response = self.client.get('/api/productos/cambios/', {'desde': desde})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_cambios_desde_version(self):
+        inicial = self.cambios(0)
+        self.assertEqual([p['codigo'] for p in inicial['cambios']], ['C1', 'F1'])
+        self.assertEqual(inicial['eliminados'], [])
+
+        self.correa.stock_minimo = 3
+        self.correa.save(update_fields=['stock_minimo'])
+        self.correa.refresh_from_db()
+        self.assertEqual(self.correa.version, VersionCatalogo.actual())
+
+        datos = self.cambios(inicial['version'])
+        self.assertEqual([p['codigo'] for p in datos['cambios']], ['C1'])
+        self.assertEqual(datos['version'], self.correa.version)
+        self.assertEqual(self.cambios(datos['version'])['cambios'], [])
+
+    def test_eliminados(self):
+        version = self.cambios(0)['version']
+        filtro_id = self.filtro.pk
+        self.filtro.delete()
+
+        datos = self.cambios(version)
+        self.assertEqual(datos['cambios'], [])
+        self.assertEqual(datos['eliminados'], [filtro_id])
+        self.assertGreater(datos['version'], version)
+        self.assertEqual(self.cambios(datos['version'])['eliminados'], [])
+
+    def test_desde_invalido(self):
+        response = self.client.get('/api/productos/cambios/', {'desde': 'ayer'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/productos/cambios/', {'desde': 0, 'page_size': 0})
+        self.assertEqual(response.status_code, 400)
+
+    def test_paginas_por_version(self):
+        # Un lote de importación: dos productos con la misma versión
+        version = VersionCatalogo.siguiente()
+        Producto.objects.bulk_create([
+            Producto(codigo=codigo, nombre='-', categoria='-', ubicacion='-', precio_compra=1, version=version)
+            for codigo in ('L1', 'L2')
+        ])
+        eliminado = self.correa.pk
+        self.correa.delete()
+
+        paginas = []
+        response = self.client.get('/api/productos/cambios/', {'desde': 0, 'page_size': 1})
+        while True:
+            paginas.append(response.data)
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual([[p['codigo'] for p in pagina['cambios']] for pagina in paginas], [['F1'], ['L1', 'L2'], []])
+        self.assertEqual([pagina['eliminados'] for pagina in paginas], [[], [], [eliminado]])
+        self.assertEqual(paginas[-1]['version'], VersionCatalogo.actual())
+        self.assertEqual(self.cambios(paginas[-1]['version'])['cambios'], [])
+
+
+class ImportarProductosTests(TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.archivo = Path(self.directorio.name) / 'inventario.xlsx'
+        libro = Workbook()
+        hoja = libro.active
+        filas = [
+            ('EXIST', 'Sello actualizado', 7, 'B2'),
+            ('NUEVO-1', 'Buje pasador', 1, 'A4'),
+            ('', 'Sin código', 1, 'A4'),
+            ('NUEVO-2', 'Válvula', 'dos', 'A4'),
+            ('NUEVO-1', 'Repetido', 2, 'A4'),
+            ('NUEVO-3', 'Intermitente', 3.0, 'A5'),
+        ]
+        for codigo, nombre, stock, ubicacion in filas:
+            hoja.append([None, None, None, codigo, nombre, stock, 'NO', ubicacion])
+        libro.save(self.archivo)
+        Producto.objects.create(
+            codigo='EXIST', nombre='Sello', categoria='hidraulica', precio_compra=2500,
+            stock_actual=1, ubicacion='A1'
+        )
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def importar(self, *args):
+        salida = io.StringIO()
+        call_command('importar_productos', str(self.archivo), '--lote', '2', *args, stdout=salida)
+        return salida.getvalue()
+
+    def test_importa_actualiza_y_rechaza(self):
+        salida = self.importar()
+        existente = Producto.objects.get(codigo='EXIST')
+        # El stock de un producto existente solo cambia con movimientos
+        self.assertEqual((existente.nombre, existente.stock_actual, existente.ubicacion), ('Sello actualizado', 1, 'B2'))
+        self.assertIn('1 productos existentes con stock distinto', salida)
+        self.assertEqual((existente.categoria, existente.precio_compra), ('hidraulica', 2500))
+        nuevo = Producto.objects.get(codigo='NUEVO-3')
+        self.assertEqual((nuevo.stock_actual, nuevo.categoria, nuevo.stock_minimo), (3, 'pieza-equipo', 3))
+        self.assertGreater(nuevo.version, 0)
+        self.assertEqual(Producto.objects.count(), 3)
+
+        with open(f"{self.archivo}.rechazados.csv", encoding='utf-8') as f:
+            rechazados = list(csv.DictReader(f))
+        self.assertEqual([r['fila'] for r in rechazados], ['3', '4', '5'])
+        self.assertEqual(rechazados[2]['error'], 'código repetido en la planilla')
+
+    def test_dry_run_no_escribe(self):
+        self.importar('--dry-run')
+        self.assertEqual(Producto.objects.count(), 1)
+        self.assertEqual(Producto.objects.get(codigo='EXIST').stock_actual, 1)
+
+
+class ValorizacionTests(APITestCase):
+    def setUp(self):
+        # La versión del catálogo se repite entre tests porque cada uno se revierte
+        cache.clear()
+        self.client.force_authenticate(Usuario.objects.create(username='contabilidad'))
+        datos = [
+            ('A', 'repuestos', 'A1', False, 10, 5, 1000),
+            ('B', 'repuestos', 'A1', False, 2, 5, 500),
+            ('C', 'repuestos', 'A1', True, 0, 1, 300),
+            ('D', 'lubricantes', 'B1', False, 4, 0, 2500),
+        ]
+        for codigo, categoria, ubicacion, consignacion, stock, minimo, precio in datos:
+            Producto.objects.create(
+                codigo=codigo, nombre=codigo, categoria=categoria, ubicacion=ubicacion,
+                consignacion=consignacion, stock_actual=stock, stock_minimo=minimo, precio_compra=precio
+            )
+
+    def test_totales_y_grupos(self):
+        response = self.client.get('/api/productos/valorizacion/')
+        self.assertEqual(response.status_code, 200)
+        totales = response.data['totales']
+        self.assertEqual(totales['valor'], 21000)
+        self.assertEqual((totales['productos'], totales['bajo_minimo'], totales['sin_stock']), (4, 2, 1))
+        grupo = next(g for g in response.data['grupos'] if g['categoria'] == 'repuestos' and not g['consignacion'])
+        self.assertEqual((grupo['valor'], grupo['bajo_minimo']), (11000, 1))
+
+    def test_cache_se_invalida_al_cambiar_stock(self):
+        valorizacion_inventario()
+        with self.assertNumQueries(1):
+            valorizacion_inventario()
+        producto = Producto.objects.get(codigo='D')
+        producto.stock_actual = 0
+        producto.save()
+        self.assertEqual(valorizacion_inventario()['totales']['valor'], 11000)
+
+
+class PronosticoTests(APITestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create(username='compras')
+        self.client.force_authenticate(self.usuario)
+        self.producto = Producto.objects.create(
+            codigo='R1', nombre='Rodamiento', categoria='-', ubicacion='-', precio_compra=100, stock_actual=10
+        )
+        self.sin_demanda = Producto.objects.create(
+            codigo='R2', nombre='Sin uso', categoria='-', ubicacion='-', precio_compra=100, stock_actual=0
+        )
+        ahora = timezone.now()
+        # 2 unidades diarias durante los últimos 10 días de la historia
+        for dias in range(1, 11):
+            salida = Salida.objects.create(usuario=self.usuario, producto=self.producto, cantidad=2, cargo='taller')
+            Salida.objects.filter(pk=salida.pk).update(fecha=ahora - timedelta(days=dias))
+        proveedor = Proveedor.objects.create(
+            nombre_proveedor='P', rut='1-9', domicilio='-', ubicacion='-', email='p@example.com', telefono='-'
+        )
+        orden = OrdenesCompras.objects.create(
+            numero_orden='1', empresa='-', proveedor=proveedor, cargo='-', forma_pago='-', plazo_entrega='-'
+        )
+        entrada = Entrada.objects.create(
+            usuario=self.usuario, producto=self.producto, cantidad=1, costo_unitario=100,
+            motivo='recepcion_oc', orden_compra=orden
+        )
+        OrdenesCompras.objects.filter(pk=orden.pk).update(fecha=ahora - timedelta(days=30))
+        Entrada.objects.filter(pk=entrada.pk).update(fecha=ahora - timedelta(days=20))
+
+    def test_calculo_y_endpoint(self):
+        self.assertEqual(calcular_sugerencias(dias=20), 1)
+        sugerencia = SugerenciaCompra.objects.get(producto=self.producto)
+        self.assertAlmostEqual(sugerencia.demanda_diaria, 1.0)
+        self.assertAlmostEqual(sugerencia.lead_time_dias, 10.0)
+        self.assertGreater(sugerencia.stock_seguridad, 0)
+        self.assertEqual(sugerencia.punto_reorden, 10 + sugerencia.stock_seguridad)
+        self.assertEqual(sugerencia.nivel_objetivo, sugerencia.punto_reorden + 30)
+
+        response = self.client.get('/api/productos/compras-sugeridas/')
+        self.assertEqual(response.status_code, 200)
+        fila = response.data['results'][0]
+        self.assertEqual((fila['codigo'], fila['cantidad_sugerida']), ('R1', sugerencia.nivel_objetivo - 10))
+        self.assertEqual(len(response.data['results']), 1)
+
+
+class CatalogoConcurrenciaTests(TransactionTestCase):
+    """Despachos, recepciones y ediciones simultáneas del mismo producto no se bloquean entre sí."""
+    VUELTAS = 20
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create(username='bodega')
+        self.producto = Producto.objects.create(
+            codigo='C1', nombre='Correa', categoria='-', ubicacion='-', precio_compra=100, stock_actual=1000
+        )
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_salida_entrada_y_edicion_simultaneas(self):
+        inicial = VersionCatalogo.actual()
+        errores = []
+        barrera = threading.Barrier(3)
+
+        def despachar():
+            registrar_salidas(self.usuario, '', [{'producto': self.producto.pk, 'cantidad': 1, 'cargo': 'taller'}])
+
+        def recibir():
+            producto = Producto.objects.get(pk=self.producto.pk)
+            registrar_entradas(self.usuario, 'compra', '', [
+                {'producto': producto, 'cantidad': 2, 'costo_unitario': 100, 'orden_compra': None},
+            ])
+
+        def editar():
+            producto = Producto.objects.get(pk=self.producto.pk)
+            producto.nombre = f"Correa {producto.version}"
+            producto.save(update_fields=['nombre'])
+
+        def trabajar(operacion):
+            try:
+                barrera.wait()
+                for _ in range(self.VUELTAS):
+                    operacion()
+            except Exception as e:
+                errores.append(e)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=trabajar, args=(operacion,)) for operacion in (despachar, recibir, editar)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock_actual, 1000 + self.VUELTAS)
+        # Una versión por cada operación
+        self.assertEqual(VersionCatalogo.actual(), inicial + 3 * self.VUELTAS)
+        self.assertEqual(self.producto.version, VersionCatalogo.actual())
+
+    @skipUnless(connection.vendor == 'postgresql', "versiones por secuencia solo en PostgreSQL")
+    def test_version_en_curso_retiene_la_actual(self):
+        tomada, terminar = threading.Event(), threading.Event()
+        pendiente = []
+
+        def editar_lento():
+            try:
+                with transaction.atomic():
+                    producto = Producto.objects.get(pk=self.producto.pk)
+                    producto.save(update_fields=['nombre'])
+                    pendiente.append(producto.version)
+                    tomada.set()
+                    terminar.wait(10)
+            finally:
+                connection.close()
+
+        hilo = threading.Thread(target=editar_lento)
+        hilo.start()
+        tomada.wait(10)
+        # Una escritura posterior se confirma antes que la que sigue en curso
+        otro = Producto.objects.create(codigo='C2', nombre='Polea', categoria='-', ubicacion='-', precio_compra=1)
+        self.assertGreater(otro.version, pendiente[0])
+        self.assertEqual(VersionCatalogo.actual(), pendiente[0] - 1)
+        terminar.set()
+        hilo.join()
+        self.assertEqual(VersionCatalogo.actual(), otro.version)
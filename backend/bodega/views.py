@@ -1,14 +1,152 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
-from .models import Producto
-from .serializers import ProductoSerializer
+from django.db.models import F, Q
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from SolDega.exportacion import FORMATOS, respuesta_exportacion
+from .busqueda import LIMITE_RESULTADOS, BusquedaProductoFilter
+from .indicadores import valorizacion_inventario
+from .models import Producto, ProductoEliminado, SugerenciaCompra, VersionCatalogo
+from .serializers import ProductoSerializer, SugerenciaCompraSerializer
+
+# Cambios por página en la sincronización del catálogo (ProductoViewSet.cambios)
+CAMBIOS_POR_PAGINA = 500
+CAMBIOS_POR_PAGINA_MAXIMO = 2000
+
+# Columnas de la exportación del inventario; la última se calcula
+CAMPOS_EXPORTACION = [
+    'codigo', 'nombre', 'descripcion', 'categoria', 'ubicacion',
+    'stock_actual', 'stock_minimo', 'precio_compra', 'consignacion',
+]
+COLUMNAS_EXPORTACION = [
+    'Código', 'Nombre', 'Descripción', 'Categoría', 'Ubicación',
+    'Stock Actual', 'Stock Mínimo', 'Precio Compra', 'Consignación', 'Valor Total',
+]
+
 
 class ProductoViewSet(viewsets.ModelViewSet):
     queryset = Producto.objects.all()  # Requerido para DRF router
     serializer_class = ProductoSerializer
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend, filters.OrderingFilter]
-    search_fields = ['nombre', 'codigo']
+    # La búsqueda va al final porque ordena por relevancia y limita los resultados
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, BusquedaProductoFilter]
     filterset_fields = ['nombre', 'codigo']
     ordering_fields = ['nombre', 'codigo']
     ordering = ['codigo']
+
+    @property
+    def limite_busqueda(self):
+        # La exportación entrega todas las coincidencias, no solo las más relevantes
+        return None if self.action == 'exportar' else LIMITE_RESULTADOS
+
+    @action(detail=False, methods=['get'])
+    def catalogo(self, request):
+        """
+        Catálogo completo con su versión. Se envía con ETag; si el cliente ya
+        tiene esa versión se responde 304 sin serializar nada.
+        """
+        version = VersionCatalogo.actual()
+        etag = quote_etag(f"catalogo-{version}")
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+        productos = Producto.objects.order_by('codigo')
+        response = Response({
+            'version': version,
+            'productos': self.get_serializer(productos, many=True).data,
+        })
+        response['ETag'] = etag
+        return response
+
+    @action(detail=False, methods=['get'])
+    def cambios(self, request):
+        """
+        Productos modificados y eliminados después de la versión `desde`, por
+        páginas de unos `page_size` cambios (máximo CAMBIOS_POR_PAGINA_MAXIMO).
+        Una página cubre versiones completas: termina en la versión de su
+        último cambio e incluye todos los de esa versión (una versión es una
+        transacción; a lo sumo un lote de importación). El cliente guarda la
+        `version` de la respuesta y la envía como `desde` en la siguiente
+        consulta; mientras `next` no sea nulo quedan cambios por traer.
+        """
+        try:
+            desde = int(request.query_params.get('desde', 0))
+        except ValueError:
+            return Response({"error": "desde debe ser un número"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            tamano = min(int(request.query_params.get('page_size', CAMBIOS_POR_PAGINA)), CAMBIOS_POR_PAGINA_MAXIMO)
+            if tamano < 1:
+                raise ValueError
+        except ValueError:
+            return Response({"error": "page_size inválido"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # La versión se lee antes que las filas: todo lo que tenga una versión
+        # menor o igual ya está confirmado y aparece en la consulta. Lo posterior
+        # puede tener huecos de transacciones en curso y llega en la próxima.
+        actual = VersionCatalogo.actual()
+        version = actual
+        for modelo in (Producto, ProductoEliminado):
+            # Versión del último cambio de una página llena, si la hay
+            ultima = modelo.objects.filter(version__gt=desde, version__lte=actual).order_by('version').values_list(
+                'version', flat=True
+            )[tamano - 1:tamano]
+            version = min([version, *ultima])
+        rango = {'version__gt': desde, 'version__lte': version}
+        productos = Producto.objects.filter(**rango).order_by('version', 'id')
+        eliminados = ProductoEliminado.objects.filter(**rango).order_by('version').values_list('producto_id', flat=True)
+
+        next_url = None
+        if version < actual:
+            parametros = request.query_params.copy()
+            parametros['desde'] = version
+            next_url = request.build_absolute_uri(f"{request.path}?{parametros.urlencode()}")
+        return Response({
+            'version': version,
+            'next': next_url,
+            'cambios': self.get_serializer(productos, many=True).data,
+            'eliminados': list(eliminados),
+        })
+
+    @action(detail=False, methods=['get'])
+    def valorizacion(self, request):
+        """
+        Valor del inventario (stock_actual * precio_compra) y cantidad de
+        productos bajo el mínimo y sin stock, por categoría, ubicación y
+        consignación, con los totales generales.
+        """
+        return Response(valorizacion_inventario())
+
+    @action(detail=False, methods=['get'], url_path='compras-sugeridas')
+    def compras_sugeridas(self, request):
+        """
+        Productos cuyo stock actual está en o bajo el punto de reorden
+        calculado por bodega.tasks.calcular_sugerencias_compra, con la
+        cantidad para volver al nivel objetivo.
+        """
+        queryset = (
+            SugerenciaCompra.objects.select_related('producto')
+            .filter(producto__stock_actual__lte=F('punto_reorden'), demanda_diaria__gt=0)
+            .annotate(cantidad_sugerida=F('nivel_objetivo') - F('producto__stock_actual'))
+            .order_by('-cantidad_sugerida', 'producto__codigo')
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = SugerenciaCompraSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """
+        Inventario en CSV o XLSX (parámetro formato), con los mismos filtros,
+        búsqueda y orden que el listado.
+        """
+        formato = request.query_params.get('formato', 'xlsx')
+        if formato not in FORMATOS:
+            return Response({"error": "Formato inválido. Use 'csv' o 'xlsx'"}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.filter_queryset(self.get_queryset()).values_list(*CAMPOS_EXPORTACION)
+        filas = (
+            list(fila) + [fila[5] * fila[7]]  # stock_actual * precio_compra
+            for fila in queryset.iterator(chunk_size=2000)
+        )
+        return respuesta_exportacion('inventario', formato, COLUMNAS_EXPORTACION, filas, 'Inventario')
@@ -1,6 +1,12 @@
 from django.contrib import admin
-from .models import Maquinaria
+from .models import Maquinaria, CostoMaquinaria
 
 admin.site.register(Maquinaria)
 
+
+@admin.register(CostoMaquinaria)
+class CostoMaquinariaAdmin(admin.ModelAdmin):
+    list_display = ('maquinaria', 'mes', 'cantidad', 'costo')
+    list_filter = ('mes',)
+
 # Register your models here.
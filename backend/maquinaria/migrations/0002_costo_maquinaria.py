@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-18 09:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maquinaria', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CostoMaquinaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField()),
+                ('cantidad', models.BigIntegerField(default=0)),
+                ('costo', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('maquinaria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='costos', to='maquinaria.maquinaria')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='costomaquinaria',
+            index=models.Index(fields=['mes'], name='costo_maquinaria_mes_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='costomaquinaria',
+            constraint=models.UniqueConstraint(fields=('maquinaria', 'mes'), name='costo_maquinaria_mes'),
+        ),
+    ]
@@ -14,3 +14,26 @@ class Maquinaria(models.Model):
 
     def __str__(self):
         return f"{self.nro_equipo} - {self.tipo} - {self.patente}"
+
+
+class CostoMaquinaria(models.Model):
+    """
+    Repuestos cargados a cada equipo por mes, mantenido en la misma
+    transacción que las salidas (ver movimientos.consumo).
+    """
+    maquinaria = models.ForeignKey(Maquinaria, on_delete=models.CASCADE, related_name='costos')
+    # Primer día del mes, en la zona horaria del proyecto
+    mes = models.DateField()
+    cantidad = models.BigIntegerField(default=0)
+    costo = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['maquinaria', 'mes'], name='costo_maquinaria_mes'),
+        ]
+        indexes = [
+            models.Index(fields=['mes'], name='costo_maquinaria_mes_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.maquinaria_id} {self.mes:%Y-%m}: {self.costo}"
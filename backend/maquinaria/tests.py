@@ -1,3 +1,75 @@
-from django.test import TestCase
+import io
 
-# Create your tests here.
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+
+from bodega.models import Producto
+from movimientos.models import Salida
+from movimientos.services import registrar_salidas
+from usuarios.models import Usuario
+from .models import CostoMaquinaria, Maquinaria
+
+
+class CostoMaquinariaTests(APITestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create(username='bodega')
+        self.client.force_authenticate(self.usuario)
+        self.producto = Producto.objects.create(
+            codigo='M1', nombre='Filtro aceite', categoria='-', ubicacion='-', precio_compra=500, stock_actual=50
+        )
+        self.camion = Maquinaria.objects.create(nro_equipo='C-01', tipo='camion', patente='AB1234')
+        self.batea = Maquinaria.objects.create(nro_equipo='B-01', tipo='batea', patente='CD5678')
+
+    def verificar(self):
+        call_command('reconstruir_consumo', '--verificar', stdout=io.StringIO())
+
+    def test_salidas_acumulan_costo_por_equipo(self):
+        registrar_salidas(self.usuario, '', [
+            {'producto': self.producto.pk, 'cantidad': 2, 'cargo': 'taller', 'maquinaria': self.camion},
+            {'producto': self.producto.pk, 'cantidad': 1, 'cargo': 'taller', 'maquinaria': self.camion},
+            {'producto': self.producto.pk, 'cantidad': 4, 'cargo': 'taller'},
+        ])
+        response = self.client.post('/api/movimientos/salidas/', {
+            'items': [{'producto': self.producto.pk, 'cantidad': 1, 'cargo': 'taller', 'maquinaria': self.batea.pk}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data[0]['maquinaria'], self.batea.pk)
+
+        costos = {c.maquinaria_id: c for c in CostoMaquinaria.objects.all()}
+        self.assertEqual((costos[self.camion.pk].cantidad, costos[self.camion.pk].costo), (3, 1500))
+        self.assertEqual(costos[self.batea.pk].costo, 500)
+        self.verificar()
+
+        response = self.client.get('/api/maquinaria/costos/', {'agrupar': 'total'})
+        self.assertEqual([(f['nro_equipo'], f['costo']) for f in response.data], [('C-01', 1500), ('B-01', 500)])
+        response = self.client.get('/api/maquinaria/costos/', {'maquinaria': self.camion.pk})
+        self.assertEqual([f['cantidad'] for f in response.data], [3])
+        self.assertEqual(self.client.get('/api/maquinaria/costos/', {'desde': '2024'}).status_code, 400)
+
+    def test_equipo_inexistente(self):
+        response = self.client.post('/api/movimientos/salidas/', {
+            'items': [{'producto': self.producto.pk, 'cantidad': 1, 'cargo': 'taller', 'maquinaria': 999}],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Salida.objects.exists())
+
+    def test_cambio_de_equipo_y_baja(self):
+        salida = Salida.objects.create(
+            usuario=self.usuario, producto=self.producto, cantidad=2, cargo='taller', maquinaria=self.camion
+        )
+        salida.maquinaria = self.batea
+        salida.save()
+        self.assertEqual(CostoMaquinaria.objects.get(maquinaria=self.camion).cantidad, 0)
+        self.assertEqual(CostoMaquinaria.objects.get(maquinaria=self.batea).cantidad, 2)
+        salida.delete()
+        self.assertEqual(CostoMaquinaria.objects.get(maquinaria=self.batea).costo, 0)
+        self.verificar()
+
+    def test_eliminar_producto_descuenta_el_costo_del_equipo(self):
+        registrar_salidas(self.usuario, '', [
+            {'producto': self.producto.pk, 'cantidad': 2, 'cargo': 'taller', 'maquinaria': self.camion},
+        ])
+        Producto.objects.get(pk=self.producto.pk).delete()
+        costo = CostoMaquinaria.objects.get(maquinaria=self.camion)
+        self.assertEqual((costo.cantidad, costo.costo), (0, 0))
+        self.verificar()
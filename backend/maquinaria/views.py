@@ -1,7 +1,63 @@
-from rest_framework import viewsets
-from .models import Maquinaria
+from datetime import datetime
+
+from django.db.models import Sum
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .models import Maquinaria, CostoMaquinaria
 from .serializers import MaquinariaSerializer
 
 class MaquinariaViewSet(viewsets.ModelViewSet):
     queryset = Maquinaria.objects.all().order_by('nro_equipo')
     serializer_class = MaquinariaSerializer
+
+    @action(detail=False, methods=['get'])
+    def costos(self, request):
+        """
+        Costo de repuestos por equipo desde el resumen mensual CostoMaquinaria.
+        Parámetros opcionales:
+          - desde / hasta: meses YYYY-MM (inclusivos)
+          - maquinaria: id del equipo
+          - agrupar: 'mes' (por equipo y mes, por defecto) o 'total' (por equipo en el período)
+        """
+        qs = CostoMaquinaria.objects.all()
+        for nombre, lookup in (('desde', 'mes__gte'), ('hasta', 'mes__lte')):
+            valor = request.query_params.get(nombre)
+            if valor:
+                try:
+                    qs = qs.filter(**{lookup: datetime.strptime(valor, '%Y-%m').date()})
+                except ValueError:
+                    return Response({"error": f"{nombre}: formato de mes inválido. Use YYYY-MM"}, status=status.HTTP_400_BAD_REQUEST)
+        maquinaria = request.query_params.get('maquinaria')
+        if maquinaria:
+            if not maquinaria.isdigit():
+                return Response({"error": "maquinaria debe ser un id"}, status=status.HTTP_400_BAD_REQUEST)
+            qs = qs.filter(maquinaria_id=maquinaria)
+
+        agrupar = request.query_params.get('agrupar', 'mes')
+        if agrupar == 'total':
+            filas = (
+                qs.values('maquinaria_id', 'maquinaria__nro_equipo', 'maquinaria__tipo')
+                .annotate(cantidad=Sum('cantidad'), costo=Sum('costo'))
+                .order_by('-costo')
+            )
+        elif agrupar == 'mes':
+            filas = (
+                qs.values('maquinaria_id', 'maquinaria__nro_equipo', 'maquinaria__tipo', 'mes', 'cantidad', 'costo')
+                .order_by('maquinaria__nro_equipo', 'mes')
+            )
+        else:
+            return Response({"error": "agrupar debe ser 'mes' o 'total'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response([
+            {
+                'maquinaria': fila['maquinaria_id'],
+                'nro_equipo': fila['maquinaria__nro_equipo'],
+                'tipo': fila['maquinaria__tipo'],
+                **({'mes': fila['mes']} if agrupar == 'mes' else {}),
+                'cantidad': fila['cantidad'],
+                'costo': fila['costo'],
+            }
+            for fila in filas
+        ])
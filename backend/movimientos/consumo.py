@@ -0,0 +1,189 @@
+# movimientos/consumo.py
+"""
+Mantenimiento de las tablas resumen ConsumoMensual (producto, cargo, mes) y
+maquinaria.CostoMaquinaria (equipo, mes).
+
+Los servicios de entradas y salidas llaman a `acumular` y
+`acumular_maquinaria` dentro de su transacción con los movimientos que
+acaban de crear; las altas, cambios y bajas individuales (admin, API de
+edición) pasan por las señales de movimientos.signals. Cada llamada hace un
+solo INSERT ... ON CONFLICT DO UPDATE que suma sobre los valores existentes,
+así dos transacciones concurrentes no se pisan.
+
+`calcular_desde_movimientos` y `calcular_costo_maquinaria` recalculan los
+resúmenes desde las tablas de movimientos; los usan las migraciones y el
+comando reconstruir_consumo.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import DateField, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+CAMPOS = ('entrada_cantidad', 'entrada_valor', 'salida_cantidad', 'salida_valor')
+
+
+def mes_de(fecha):
+    return timezone.localtime(fecha).date().replace(day=1)
+
+
+def _nuevo_total():
+    return {'entrada_cantidad': 0, 'entrada_valor': Decimal('0'), 'salida_cantidad': 0, 'salida_valor': Decimal('0')}
+
+
+def deltas_entradas(entradas, signo=1):
+    deltas = defaultdict(_nuevo_total)
+    for entrada in entradas:
+        total = deltas[(entrada.producto_id, '', mes_de(entrada.fecha))]
+        total['entrada_cantidad'] += signo * entrada.cantidad
+        total['entrada_valor'] += signo * entrada.cantidad * Decimal(entrada.costo_unitario)
+    return deltas
+
+
+def deltas_salidas(salidas, signo=1):
+    deltas = defaultdict(_nuevo_total)
+    for salida in salidas:
+        total = deltas[(salida.producto_id, salida.cargo, mes_de(salida.fecha))]
+        total['salida_cantidad'] += signo * salida.cantidad
+        total['salida_valor'] += signo * salida.cantidad * Decimal(salida.costo_unitario or 0)
+    return deltas
+
+
+def combinar(*grupos):
+    resultado = defaultdict(lambda: defaultdict(int))
+    for deltas in grupos:
+        for clave, total in deltas.items():
+            for campo, valor in total.items():
+                resultado[clave][campo] += valor
+    return resultado
+
+
+def deltas_maquinaria(salidas, signo=1):
+    deltas = defaultdict(lambda: {'cantidad': 0, 'costo': Decimal('0')})
+    for salida in salidas:
+        if salida.maquinaria_id is None:
+            continue
+        total = deltas[(salida.maquinaria_id, mes_de(salida.fecha))]
+        total['cantidad'] += signo * salida.cantidad
+        total['costo'] += signo * salida.cantidad * Decimal(salida.costo_unitario or 0)
+    return deltas
+
+
+def _sumar(modelo, claves, campos, deltas):
+    """
+    INSERT ... ON CONFLICT (claves) DO UPDATE sumando `campos`. Las claves de
+    `deltas` son tuplas en el orden de `claves`; las fechas y decimales se
+    adaptan según el tipo de cada columna.
+    """
+    if not deltas:
+        return
+    ops = connection.ops
+    tabla = ops.quote_name(modelo._meta.db_table)
+    columnas = [modelo._meta.get_field(nombre) for nombre in (*claves, *campos)]
+    asignaciones = ', '.join(f"{campo} = {tabla}.{campo} + excluded.{campo}" for campo in campos)
+    sql = (
+        f"INSERT INTO {tabla} ({', '.join(c.column for c in columnas)}) "
+        f"VALUES ({', '.join(['%s'] * len(columnas))}) "
+        f"ON CONFLICT ({', '.join(c.column for c in columnas[:len(claves)])}) DO UPDATE SET {asignaciones}"
+    )
+
+    def adaptar(columna, valor):
+        if isinstance(columna, DecimalField):
+            return ops.adapt_decimalfield_value(valor, columna.max_digits, columna.decimal_places)
+        if isinstance(columna, DateField):
+            return ops.adapt_datefield_value(valor)
+        return valor
+
+    filas = [
+        tuple(adaptar(columna, valor) for columna, valor in zip(columnas, (*clave, *(total[c] for c in campos))))
+        # Orden fijo para que transacciones concurrentes bloqueen las filas en el mismo orden
+        for clave, total in sorted(deltas.items())
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, filas)
+
+
+def acumular(deltas):
+    """Suma `deltas` {(producto_id, cargo, mes): {campo: valor}} en ConsumoMensual."""
+    from .models import ConsumoMensual
+    _sumar(ConsumoMensual, ('producto', 'cargo', 'mes'), CAMPOS, deltas)
+
+
+def acumular_maquinaria(deltas):
+    """Suma `deltas` {(maquinaria_id, mes): {'cantidad', 'costo'}} en CostoMaquinaria."""
+    from maquinaria.models import CostoMaquinaria
+    _sumar(CostoMaquinaria, ('maquinaria', 'mes'), ('cantidad', 'costo'), deltas)
+
+
+def calcular_desde_movimientos(Entrada, Salida):
+    """Resumen completo {(producto_id, cargo, mes): totales} a partir de los movimientos."""
+    resumen = defaultdict(_nuevo_total)
+    mes = TruncMonth('fecha', output_field=DateField())
+    valor = ExpressionWrapper(F('cantidad') * F('costo_unitario'), output_field=DecimalField(max_digits=16, decimal_places=2))
+
+    entradas = (
+        Entrada.objects.annotate(mes=mes).values('producto_id', 'mes')
+        .annotate(cantidad_total=Sum('cantidad'), valor_total=Sum(valor)).order_by()
+    )
+    for fila in entradas.iterator():
+        total = resumen[(fila['producto_id'], '', fila['mes'])]
+        total['entrada_cantidad'] = fila['cantidad_total']
+        total['entrada_valor'] = Decimal(str(fila['valor_total'] or 0)).quantize(Decimal('0.01'))
+
+    salidas = (
+        Salida.objects.annotate(mes=mes).values('producto_id', 'cargo', 'mes')
+        .annotate(cantidad_total=Sum('cantidad'), valor_total=Sum(valor)).order_by()
+    )
+    for fila in salidas.iterator():
+        total = resumen[(fila['producto_id'], fila['cargo'], fila['mes'])]
+        total['salida_cantidad'] = fila['cantidad_total']
+        total['salida_valor'] = Decimal(str(fila['valor_total'] or 0)).quantize(Decimal('0.01'))
+    return resumen
+
+
+def reconstruir(Entrada, Salida, ConsumoMensual):
+    """Reemplaza el contenido de ConsumoMensual; debe llamarse dentro de una transacción."""
+    resumen = calcular_desde_movimientos(Entrada, Salida)
+    ConsumoMensual.objects.all().delete()
+    ConsumoMensual.objects.bulk_create(
+        [
+            ConsumoMensual(producto_id=producto_id, cargo=cargo, mes=mes, **totales)
+            for (producto_id, cargo, mes), totales in resumen.items()
+        ],
+        batch_size=1000,
+    )
+    return len(resumen)
+
+
+def calcular_costo_maquinaria(Salida):
+    """Resumen completo {(maquinaria_id, mes): {'cantidad', 'costo'}} a partir de las salidas."""
+    valor = ExpressionWrapper(F('cantidad') * F('costo_unitario'), output_field=DecimalField(max_digits=16, decimal_places=2))
+    filas = (
+        Salida.objects.filter(maquinaria__isnull=False)
+        .annotate(mes=TruncMonth('fecha', output_field=DateField()))
+        .values('maquinaria_id', 'mes')
+        .annotate(cantidad_total=Sum('cantidad'), valor_total=Sum(valor)).order_by()
+    )
+    return {
+        (fila['maquinaria_id'], fila['mes']): {
+            'cantidad': fila['cantidad_total'],
+            'costo': Decimal(str(fila['valor_total'] or 0)).quantize(Decimal('0.01')),
+        }
+        for fila in filas.iterator()
+    }
+
+
+def reconstruir_costo_maquinaria(Salida, CostoMaquinaria):
+    """Reemplaza el contenido de CostoMaquinaria; debe llamarse dentro de una transacción."""
+    resumen = calcular_costo_maquinaria(Salida)
+    CostoMaquinaria.objects.all().delete()
+    CostoMaquinaria.objects.bulk_create(
+        [
+            CostoMaquinaria(maquinaria_id=maquinaria_id, mes=mes, **totales)
+            for (maquinaria_id, mes), totales in resumen.items()
+        ],
+        batch_size=1000,
+    )
+    return len(resumen)
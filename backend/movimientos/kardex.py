@@ -0,0 +1,185 @@
+# movimientos/kardex.py
+"""
+Kardex de un producto: sus entradas y salidas en orden cronológico con el
+saldo de stock y el costo promedio de las compras después de cada movimiento.
+
+Todo se calcula en una consulta sobre el índice (producto, fecha). Cada
+tabla aporta como máximo una página de filas posteriores al cursor y las
+funciones de ventana solo recorren esas filas. El punto de partida de la
+página sale de una sola agregación, sin ordenar: las sumas de los
+movimientos anteriores al cursor. El saldo parte del stock actual menos la
+suma de todos los movimientos, así cuadra aunque el stock inicial se haya
+cargado sin entradas (importación). `costo_promedio_compras` es el promedio
+ponderado de todas las entradas hasta el movimiento: las salidas no lo
+mueven ni descuentan unidades, así que no es el costo promedio ponderado
+móvil del stock (ese depende de la fila anterior y no se calcula con
+ventanas). La paginación es por llave (fecha, tipo, id), sin OFFSET.
+"""
+import base64
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Entrada, Salida
+
+TAMANO_PAGINA = 100
+TAMANO_PAGINA_MAXIMO = 500
+
+_ORDEN = "fecha, tipo, id"
+
+# Filas de una tabla posteriores al cursor, en orden y acotadas a una página
+_RAMA = """
+    SELECT * FROM (
+        SELECT '{tipo}' AS tipo, id, fecha, cantidad, {costo} AS costo_unitario, {detalle} AS detalle,
+               {signo}cantidad AS delta
+        FROM {tabla}
+        WHERE producto_id = %s AND {posteriores}
+        ORDER BY fecha, id
+        LIMIT %s
+    ) {tipo}s
+"""
+
+_SQL = f"""
+WITH pagina AS (
+    {_RAMA.format(tipo='entrada', costo='costo_unitario', detalle='motivo', signo='',
+                  tabla=Entrada._meta.db_table, posteriores='{posteriores_entrada}')}
+    UNION ALL
+    {_RAMA.format(tipo='salida', costo='NULL', detalle='cargo', signo='-',
+                  tabla=Salida._meta.db_table, posteriores='{posteriores_salida}')}
+),
+inicio AS (
+    SELECT
+        SUM(total) AS total, SUM(anterior) AS anterior,
+        SUM(valor_compras) AS valor_compras, SUM(unidades_compradas) AS unidades_compradas
+    FROM (
+        SELECT
+            SUM(cantidad) AS total,
+            SUM(CASE WHEN {{anteriores_entrada}} THEN cantidad END) AS anterior,
+            SUM(CASE WHEN {{anteriores_entrada}} THEN cantidad * costo_unitario END) AS valor_compras,
+            SUM(CASE WHEN {{anteriores_entrada}} THEN cantidad END) AS unidades_compradas
+        FROM {Entrada._meta.db_table}
+        WHERE producto_id = %s
+        UNION ALL
+        SELECT
+            -SUM(cantidad), -SUM(CASE WHEN {{anteriores_salida}} THEN cantidad END), NULL, NULL
+        FROM {Salida._meta.db_table}
+        WHERE producto_id = %s
+    ) sumas
+),
+kardex AS (
+    SELECT
+        tipo, id, fecha, cantidad, costo_unitario, detalle,
+        SUM(delta) OVER acumulado AS acumulado,
+        SUM(CASE WHEN tipo = 'entrada' THEN cantidad * costo_unitario END) OVER acumulado AS valor_compras,
+        SUM(CASE WHEN tipo = 'entrada' THEN cantidad END) OVER acumulado AS unidades_compradas
+    FROM pagina
+    WINDOW acumulado AS (ORDER BY {_ORDEN} ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)
+)
+SELECT
+    tipo, id, fecha, cantidad, costo_unitario, detalle,
+    %s - COALESCE(inicio.total, 0) + COALESCE(inicio.anterior, 0) + acumulado AS saldo,
+    (COALESCE(inicio.valor_compras, 0) + COALESCE(kardex.valor_compras, 0))
+        / NULLIF(COALESCE(inicio.unidades_compradas, 0) + COALESCE(kardex.unidades_compradas, 0), 0)
+        AS costo_promedio_compras
+FROM kardex CROSS JOIN inicio
+ORDER BY {_ORDEN}
+LIMIT %s
+"""
+
+
+def _condiciones(tipo_tabla, cursor):
+    """
+    Condiciones sobre (fecha, id) de una tabla equivalentes a
+    (fecha, tipo, id) > cursor y a su negación, escritas para que usen el
+    índice (producto, fecha). Devuelve ((sql, params), (sql, params)).
+    """
+    if cursor is None:
+        return ('1 = 1', []), ('1 = 0', [])
+    fecha, tipo, pk = cursor
+    fecha = connection.ops.adapt_datetimefield_value(fecha)
+    if tipo_tabla < tipo:
+        return ('fecha > %s', [fecha]), ('fecha <= %s', [fecha])
+    if tipo_tabla > tipo:
+        return ('fecha >= %s', [fecha]), ('fecha < %s', [fecha])
+    return (
+        ('fecha >= %s AND (fecha > %s OR id > %s)', [fecha, fecha, pk]),
+        ('fecha <= %s AND (fecha < %s OR id <= %s)', [fecha, fecha, pk]),
+    )
+
+
+CENTAVOS = Decimal('0.01')
+
+
+def codificar_cursor(fila):
+    valor = f"{fila['fecha'].isoformat()}|{fila['tipo']}|{fila['id']}"
+    return base64.urlsafe_b64encode(valor.encode()).decode()
+
+
+def decodificar_cursor(cursor):
+    """Devuelve (fecha, tipo, id); lanza ValueError si el cursor no es válido."""
+    try:
+        fecha, tipo, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        fecha = datetime.fromisoformat(fecha)
+        pk = int(pk)
+    except Exception:
+        raise ValueError("cursor inválido")
+    if tipo not in ('entrada', 'salida'):
+        raise ValueError("cursor inválido")
+    return fecha, tipo, pk
+
+
+def _fecha(valor):
+    # SQLite devuelve texto; PostgreSQL, datetime
+    if isinstance(valor, str):
+        valor = parse_datetime(valor)
+    if timezone.is_naive(valor):
+        valor = timezone.make_aware(valor, timezone.utc)
+    return valor
+
+
+def _decimal(valor):
+    if valor is None:
+        return None
+    return Decimal(str(valor)).quantize(CENTAVOS)
+
+
+def kardex_producto(producto, cursor=None, tamano=TAMANO_PAGINA):
+    """
+    Movimientos de `producto` posteriores a `cursor` (ver decodificar_cursor),
+    hasta `tamano` filas. Devuelve (filas, cursor_siguiente o None).
+    """
+    (posteriores_entrada, p_entrada), (anteriores_entrada, a_entrada) = _condiciones('entrada', cursor)
+    (posteriores_salida, p_salida), (anteriores_salida, a_salida) = _condiciones('salida', cursor)
+    sql = _SQL.format(
+        posteriores_entrada=posteriores_entrada, posteriores_salida=posteriores_salida,
+        anteriores_entrada=anteriores_entrada, anteriores_salida=anteriores_salida,
+    )
+    params = [
+        producto.pk, *p_entrada, tamano + 1,
+        producto.pk, *p_salida, tamano + 1,
+        # Las condiciones de anteriores aparecen tres veces en la rama de entradas
+        *a_entrada * 3, producto.pk,
+        *a_salida, producto.pk,
+        producto.stock_actual,
+        tamano + 1,
+    ]
+
+    with connection.cursor() as c:
+        c.execute(sql, params)
+        columnas = [col[0] for col in c.description]
+        filas = [dict(zip(columnas, fila)) for fila in c.fetchall()]
+
+    for fila in filas:
+        fila['fecha'] = _fecha(fila['fecha'])
+        fila['costo_unitario'] = _decimal(fila['costo_unitario'])
+        fila['costo_promedio_compras'] = _decimal(fila['costo_promedio_compras'])
+        fila['saldo'] = int(fila['saldo'])
+
+    siguiente = None
+    if len(filas) > tamano:
+        filas = filas[:tamano]
+        siguiente = codificar_cursor(filas[-1])
+    return filas, siguiente
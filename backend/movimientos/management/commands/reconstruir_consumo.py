@@ -0,0 +1,92 @@
+# movimientos/management/commands/reconstruir_consumo.py
+"""
+Recalcula las tablas resumen ConsumoMensual y CostoMaquinaria desde las
+entradas y salidas, o con --verificar solo las compara y lista las diferencias.
+
+Uso:
+    python manage.py reconstruir_consumo --verificar
+    python manage.py reconstruir_consumo
+"""
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from maquinaria.models import CostoMaquinaria
+from movimientos.consumo import (
+    CAMPOS, calcular_costo_maquinaria, calcular_desde_movimientos, reconstruir, reconstruir_costo_maquinaria,
+)
+from movimientos.models import ConsumoMensual, Entrada, Salida
+
+MAXIMO_DIFERENCIAS_MOSTRADAS = 50
+CAMPOS_MAQUINARIA = ('cantidad', 'costo')
+
+
+def _normalizar(totales, campos):
+    return tuple(Decimal(str(totales[campo])).quantize(Decimal('0.01')) for campo in campos)
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye ConsumoMensual y CostoMaquinaria desde los movimientos "
+        "o verifica que coincidan (--verificar)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verificar', action='store_true', help="Solo compara, sin modificar las tablas")
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        if not options['verificar']:
+            with transaction.atomic():
+                filas = reconstruir(Entrada, Salida, ConsumoMensual)
+                filas_maquinaria = reconstruir_costo_maquinaria(Salida, CostoMaquinaria)
+            self.stdout.write(self.style.SUCCESS(
+                f"ConsumoMensual reconstruido: {filas} filas; CostoMaquinaria: {filas_maquinaria} filas "
+                f"en {time.monotonic() - inicio:.1f}s"
+            ))
+            return
+
+        diferencias = self._comparar(
+            'ConsumoMensual',
+            calcular_desde_movimientos(Entrada, Salida),
+            {
+                (fila['producto_id'], fila['cargo'], fila['mes']): fila
+                for fila in ConsumoMensual.objects.values('producto_id', 'cargo', 'mes', *CAMPOS).iterator()
+            },
+            CAMPOS,
+            lambda clave: f"producto={clave[0]} cargo={clave[1] or '-'} mes={clave[2]:%Y-%m}",
+        )
+        diferencias += self._comparar(
+            'CostoMaquinaria',
+            calcular_costo_maquinaria(Salida),
+            {
+                (fila['maquinaria_id'], fila['mes']): fila
+                for fila in CostoMaquinaria.objects.values('maquinaria_id', 'mes', *CAMPOS_MAQUINARIA).iterator()
+            },
+            CAMPOS_MAQUINARIA,
+            lambda clave: f"maquinaria={clave[0]} mes={clave[1]:%Y-%m}",
+        )
+        if diferencias:
+            raise CommandError(
+                f"{diferencias} diferencias entre las tablas resumen y los movimientos; "
+                f"ejecute reconstruir_consumo sin --verificar"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Las tablas resumen coinciden con los movimientos ({time.monotonic() - inicio:.1f}s)"
+        ))
+
+    def _comparar(self, tabla, calculado, guardado, campos, describir):
+        """Lista las diferencias entre `calculado` y `guardado` y devuelve cuántas hay."""
+        esperado = {clave: _normalizar(totales, campos) for clave, totales in calculado.items()}
+        actual = {clave: _normalizar(totales, campos) for clave, totales in guardado.items()}
+        cero = _normalizar(dict.fromkeys(campos, 0), campos)
+        diferencias = [
+            (clave, esperado.get(clave, cero), actual.get(clave, cero))
+            for clave in sorted(set(esperado) | set(actual))
+            if esperado.get(clave, cero) != actual.get(clave, cero)
+        ]
+        for clave, valor_calculado, valor_guardado in diferencias[:MAXIMO_DIFERENCIAS_MOSTRADAS]:
+            self.stdout.write(f"{tabla} {describir(clave)}: calculado={valor_calculado} guardado={valor_guardado}")
+        return len(diferencias)
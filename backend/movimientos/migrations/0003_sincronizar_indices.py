@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 08:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movimientos', '0002_entrada_orden_compra'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='entrada',
+            name='fecha',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='entrada',
+            name='motivo',
+            field=models.CharField(choices=[('compra', 'Compra'), ('devolucion', 'Devolución'), ('recepcion_oc', 'Recepción de OC')], db_index=True, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='salida',
+            name='cargo',
+            field=models.CharField(choices=[('maquinaria', 'Maquinaria'), ('taller', 'Taller'), ('bodega', 'Bodega'), ('gerencia', 'Gerencia'), ('insumos', 'Insumos de Bodega'), ('otros', 'Otros')], db_index=True, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='salida',
+            name='fecha',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18 08:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movimientos', '0003_sincronizar_indices'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entrada',
+            index=models.Index(fields=['fecha', 'id'], name='entrada_fecha_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salida',
+            index=models.Index(fields=['fecha', 'id'], name='salida_fecha_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movimientos', '0004_indice_fecha_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entrada',
+            index=models.Index(fields=['producto', 'fecha'], name='entrada_producto_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salida',
+            index=models.Index(fields=['producto', 'fecha'], name='salida_producto_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-18 08:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bodega', '0005_indices_busqueda'),
+        ('movimientos', '0005_indices_kardex'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salida',
+            name='costo_unitario',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.CreateModel(
+            name='ConsumoMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cargo', models.CharField(blank=True, default='', max_length=20)),
+                ('mes', models.DateField()),
+                ('entrada_cantidad', models.BigIntegerField(default=0)),
+                ('entrada_valor', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('salida_cantidad', models.BigIntegerField(default=0)),
+                ('salida_valor', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='consumos', to='bodega.producto')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='consumomensual',
+            index=models.Index(fields=['mes', 'cargo'], name='consumo_mes_cargo_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='consumomensual',
+            constraint=models.UniqueConstraint(fields=('producto', 'cargo', 'mes'), name='consumo_producto_cargo_mes'),
+        ),
+    ]
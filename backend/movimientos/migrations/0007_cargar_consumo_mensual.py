@@ -0,0 +1,27 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def cargar(apps, schema_editor):
+    from movimientos.consumo import reconstruir
+
+    Producto = apps.get_model('bodega', 'Producto')
+    Entrada = apps.get_model('movimientos', 'Entrada')
+    Salida = apps.get_model('movimientos', 'Salida')
+    ConsumoMensual = apps.get_model('movimientos', 'ConsumoMensual')
+    # Las salidas anteriores no guardaban costo; se usa el precio de compra actual
+    Salida.objects.filter(costo_unitario__isnull=True).update(
+        costo_unitario=Subquery(Producto.objects.filter(pk=OuterRef('producto_id')).values('precio_compra')[:1])
+    )
+    reconstruir(Entrada, Salida, ConsumoMensual)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movimientos', '0006_consumo_mensual'),
+    ]
+
+    operations = [
+        migrations.RunPython(cargar, migrations.RunPython.noop),
+    ]
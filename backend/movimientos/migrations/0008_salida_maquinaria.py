@@ -0,0 +1,24 @@
+# Generated by Django 4.2 on 2026-10-18 09:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maquinaria', '0002_costo_maquinaria'),
+        ('movimientos', '0007_cargar_consumo_mensual'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salida',
+            name='maquinaria',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='salidas', to='maquinaria.maquinaria'),
+        ),
+        migrations.AddIndex(
+            model_name='salida',
+            index=models.Index(fields=['maquinaria', 'fecha'], name='salida_maquinaria_fecha_idx'),
+        ),
+    ]
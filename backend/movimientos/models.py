@@ -22,6 +22,14 @@ class Entrada(models.Model):
     motivo = models.CharField(max_length=20, choices=MOTIVO_CHOICES, db_index=True)
     comentario = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Paginación por cursor (fecha, id)
+            models.Index(fields=['fecha', 'id'], name='entrada_fecha_id_idx'),
+            # Kardex por producto
+            models.Index(fields=['producto', 'fecha'], name='entrada_producto_fecha_idx'),
+        ]
+
     def __str__(self):
         return f"Entrada: {self.producto.nombre} ({self.cantidad}) - {self.fecha}"
 
@@ -39,13 +47,64 @@ class Salida(models.Model):
     producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='salidas')
     cantidad = models.PositiveIntegerField()
     usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='salidas')
-    # Si el modelo Maquinaria existe, podrías descomentar la siguiente línea para indexarlo también
-    # maquinaria = models.ForeignKey(Maquinaria, on_delete=models.SET_NULL, null=True, blank=True)
+    # Equipo al que se cargan los repuestos (cargo 'maquinaria')
+    maquinaria = models.ForeignKey(
+        'maquinaria.Maquinaria', on_delete=models.SET_NULL, null=True, blank=True, related_name='salidas', db_index=False
+    )
     # Campo cargo indexado para filtrados rápidos (p.ej., para ver salidas por taller, maquinaria, etc.)
     cargo = models.CharField(max_length=20, choices=CARGO_CHOICES, db_index=True)
     comentario = models.TextField(blank=True, null=True)
     # Campo fecha indexado para búsquedas y ordenaciones
     fecha = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Precio de compra del producto al momento de la salida, para valorizar el consumo
+    costo_unitario = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Paginación por cursor (fecha, id)
+            models.Index(fields=['fecha', 'id'], name='salida_fecha_id_idx'),
+            # Kardex por producto
+            models.Index(fields=['producto', 'fecha'], name='salida_producto_fecha_idx'),
+            # Costos por equipo; también cubre las búsquedas por maquinaria sola
+            models.Index(fields=['maquinaria', 'fecha'], name='salida_maquinaria_fecha_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.costo_unitario is None:
+            self.costo_unitario = self.producto.precio_compra
+        super().save(*args, **kwargs)
+
+    @property
+    def valor_unitario(self):
+        """Costo con que se valoriza la salida; las registradas sin costo usan el precio actual."""
+        return self.costo_unitario if self.costo_unitario is not None else self.producto.precio_compra
 
     def __str__(self):
         return f"Salida: {self.producto.nombre} ({self.cantidad}) - {self.fecha}"
+
+
+class ConsumoMensual(models.Model):
+    """
+    Resumen de movimientos por producto, cargo y mes, mantenido en la misma
+    transacción que cada entrada o salida (ver movimientos.consumo). Las
+    entradas no tienen cargo y se acumulan con cargo ''.
+    """
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='consumos')
+    cargo = models.CharField(max_length=20, blank=True, default='')
+    # Primer día del mes, en la zona horaria del proyecto
+    mes = models.DateField()
+    entrada_cantidad = models.BigIntegerField(default=0)
+    entrada_valor = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    salida_cantidad = models.BigIntegerField(default=0)
+    salida_valor = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['producto', 'cargo', 'mes'], name='consumo_producto_cargo_mes'),
+        ]
+        indexes = [
+            models.Index(fields=['mes', 'cargo'], name='consumo_mes_cargo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.producto_id} {self.cargo or '-'} {self.mes:%Y-%m}"
@@ -0,0 +1,130 @@
+# movimientos/pdf.py
+"""
+Generación del informe de movimientos (entradas o salidas) en PDF.
+
+Las filas se leen con un iterador proyectado de la base de datos y se entregan
+a ReportLab en tandas de tablas del tamaño de una página a medida que se van
+dibujando, por lo que la memoria del worker no crece con el rango de fechas
+del informe.
+Importa ReportLab: las vistas y tareas lo cargan al generar el informe.
+"""
+from itertools import islice
+
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+from reportlab.lib.pagesizes import letter
+
+from reportes.estilos import ESTILO_AJUSTE, TABLAS
+from reportes.plantillas import titulo
+from .reportes import CHUNK_SIZE, movimientos_queryset
+
+# Filas de movimiento por tabla; cada tabla ocupa aproximadamente una página
+FILAS_POR_PAGINA = 40
+# Flowables que se leen del generador de una vez
+TABLAS_POR_TANDA = 2
+
+HEADER_ENTRADA = ['Cantidad', 'Código Producto', 'Nombre Producto', 'Motivo / Orden', 'Valor Producto', 'Total Producto']
+HEADER_SALIDA = ['Cantidad', 'Código Producto', 'Nombre Producto', 'Cargo', 'Valor Producto', 'Total Producto']
+COL_WIDTHS = [60, 80, 120, 100, 80, 80]
+
+
+def format_currency(value):
+    s = "{:,.2f}".format(value)
+    s = s.replace(",", "X").replace(".", ",").replace("X", ".")
+    return s
+
+
+def _filas_entrada(queryset, totales):
+    for entrada in queryset.iterator(chunk_size=CHUNK_SIZE):
+        cantidad = entrada.cantidad
+        if entrada.motivo == 'recepcion_oc' and entrada.orden_compra and entrada.orden_compra.numero_orden:
+            motivo_display = "OC " + entrada.orden_compra.numero_orden
+        else:
+            motivo_display = entrada.motivo
+        valor_producto = float(entrada.costo_unitario)
+        total_producto = cantidad * valor_producto
+        totales['cantidad'] += cantidad
+        totales['valor'] += total_producto
+        yield [
+            str(cantidad),
+            Paragraph(entrada.producto.codigo or "", ESTILO_AJUSTE),
+            Paragraph(entrada.producto.nombre or "", ESTILO_AJUSTE),
+            motivo_display,
+            f"${format_currency(valor_producto)}",
+            f"${format_currency(total_producto)}"
+        ]
+
+
+def _filas_salida(queryset, totales):
+    for salida in queryset.iterator(chunk_size=CHUNK_SIZE):
+        cantidad = salida.cantidad
+        valor_producto = float(salida.valor_unitario)
+        total_producto = cantidad * valor_producto
+        totales['cantidad'] += cantidad
+        totales['valor'] += total_producto
+        yield [
+            str(cantidad),
+            Paragraph(salida.producto.codigo or "", ESTILO_AJUSTE),
+            Paragraph(salida.producto.nombre or "", ESTILO_AJUSTE),
+            salida.cargo,
+            f"${format_currency(valor_producto)}",
+            f"${format_currency(total_producto)}"
+        ]
+
+
+def _tabla(data):
+    table = Table(data, colWidths=COL_WIDTHS, repeatRows=1)
+    table.setStyle(TABLAS['movimientos'])
+    return table
+
+
+def _flowables(tipo, queryset):
+    """Genera los elementos del documento, una tabla por página de filas."""
+    yield titulo("Informe de Movimiento")
+    yield Spacer(1, 40)
+
+    totales = {'cantidad': 0, 'valor': 0}
+    if tipo == 'entrada':
+        header, filas, etiqueta = HEADER_ENTRADA, _filas_entrada(queryset, totales), 'Total Entradas:'
+    else:
+        header, filas, etiqueta = HEADER_SALIDA, _filas_salida(queryset, totales), 'Total Salidas:'
+
+    bloque = []
+    for fila in filas:
+        bloque.append(fila)
+        if len(bloque) == FILAS_POR_PAGINA:
+            yield _tabla([header] + bloque)
+            bloque = []
+    bloque.append(['', '', '', etiqueta, str(totales['cantidad']), f"${format_currency(totales['valor'])}"])
+    yield _tabla([header] + bloque)
+
+
+class _DocumentoPorTandas(SimpleDocTemplate):
+    """
+    Dibuja flowables que vienen de un generador sin tenerlos todos en
+    memoria: `build` recibe una lista normal con la primera tanda y el hook
+    público `afterFlowable` la rellena con la tanda siguiente cuando se está
+    por vaciar. Se apoya solo en que `build` consume la lista que recibe
+    (la prueba del informe cuenta las filas del PDF por si eso cambia).
+    """
+    def __init__(self, destino, generador, tanda=TABLAS_POR_TANDA, **kwargs):
+        super().__init__(destino, **kwargs)
+        self._generador = generador
+        self._tanda = tanda
+        self._pendientes = []
+
+    def _rellenar(self):
+        if len(self._pendientes) < self._tanda:
+            self._pendientes.extend(islice(self._generador, self._tanda))
+
+    def afterFlowable(self, flowable):
+        self._rellenar()
+
+    def construir(self):
+        self._rellenar()
+        self.build(self._pendientes)
+
+
+def generar_reporte_movimientos(destino, tipo, start, end, solo_consignacion=False):
+    """Escribe el informe en `destino` (ruta o archivo binario abierto)."""
+    queryset = movimientos_queryset(tipo, start, end, solo_consignacion)
+    _DocumentoPorTandas(destino, _flowables(tipo, queryset), pagesize=letter).construir()
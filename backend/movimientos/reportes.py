@@ -0,0 +1,72 @@
+# movimientos/reportes.py
+"""
+Consultas y exportación del informe de movimientos (entradas o salidas).
+
+El PDF se dibuja en movimientos.pdf, que importa ReportLab y solo se carga al
+generar un informe; este módulo no depende de ReportLab, así importar las
+vistas no lo arrastra.
+"""
+from .models import Entrada, Salida
+
+# Filas que trae cada viaje a la base de datos
+CHUNK_SIZE = 500
+# Tamaño de los bloques que se envían al cliente
+TAMANO_BLOQUE = 64 * 1024
+
+
+def movimientos_queryset(tipo, start, end, solo_consignacion=False):
+    """
+    Queryset proyectado con las columnas que usa el informe.
+    `start` y `end` son fechas (date) inclusivas.
+    """
+    if tipo == 'entrada':
+        queryset = Entrada.objects.select_related('producto', 'orden_compra').only(
+            'fecha', 'cantidad', 'costo_unitario', 'motivo',
+            'producto__codigo', 'producto__nombre',
+            'orden_compra__numero_orden',
+        )
+    else:
+        queryset = Salida.objects.select_related('producto').only(
+            'fecha', 'cantidad', 'cargo', 'costo_unitario',
+            # precio_compra solo se usa en salidas sin costo registrado (Salida.valor_unitario)
+            'producto__codigo', 'producto__nombre', 'producto__precio_compra',
+        )
+    queryset = queryset.filter(fecha__date__gte=start, fecha__date__lte=end)
+    if solo_consignacion:
+        queryset = queryset.filter(producto__consignacion=True)
+    return queryset.order_by('fecha', 'id')
+
+
+# Columnas de la exportación a CSV/XLSX
+COLUMNAS_EXPORTACION_ENTRADA = ['Fecha', 'Cantidad', 'Código Producto', 'Nombre Producto', 'Motivo', 'Orden de Compra', 'Valor Producto', 'Total Producto']
+COLUMNAS_EXPORTACION_SALIDA = ['Fecha', 'Cantidad', 'Código Producto', 'Nombre Producto', 'Cargo', 'Valor Producto', 'Total Producto']
+
+
+def filas_exportacion(tipo, queryset):
+    """Filas con valores sin formato para CSV/XLSX, en el orden de COLUMNAS_EXPORTACION_*."""
+    if tipo == 'entrada':
+        for entrada in queryset.iterator(chunk_size=CHUNK_SIZE):
+            yield [
+                entrada.fecha, entrada.cantidad, entrada.producto.codigo, entrada.producto.nombre,
+                entrada.motivo, entrada.orden_compra.numero_orden if entrada.orden_compra else '',
+                entrada.costo_unitario, entrada.cantidad * entrada.costo_unitario,
+            ]
+    else:
+        for salida in queryset.iterator(chunk_size=CHUNK_SIZE):
+            yield [
+                salida.fecha, salida.cantidad, salida.producto.codigo, salida.producto.nombre,
+                salida.cargo, salida.valor_unitario, salida.cantidad * salida.valor_unitario,
+            ]
+
+
+def iterar_archivo(archivo, tamano=TAMANO_BLOQUE):
+    """Recorre un archivo desde el inicio en bloques y lo cierra al terminar."""
+    try:
+        archivo.seek(0)
+        while True:
+            bloque = archivo.read(tamano)
+            if not bloque:
+                break
+            yield bloque
+    finally:
+        archivo.close()
@@ -1,19 +1,18 @@
 from rest_framework import serializers
-from .models import Entrada, Salida
+from .models import Entrada, Salida, ConsumoMensual
 from bodega.models import Producto
+from maquinaria.models import Maquinaria
 from ordenes.models import OrdenesCompras
+from .services import registrar_entradas, registrar_salidas
 
 
 class EntradaItemSerializer(serializers.Serializer):
-    producto = serializers.PrimaryKeyRelatedField(queryset=Producto.objects.all())
-    cantidad = serializers.IntegerField()
+    # Los ids se resuelven en bloque en EntradaCreateSerializer.validate_items
+    producto = serializers.IntegerField()
+    cantidad = serializers.IntegerField(min_value=1)
     costo_unitario = serializers.DecimalField(max_digits=10, decimal_places=2)
     actualizar_precio = serializers.BooleanField(required=False, default=False)
-    orden_compra = serializers.PrimaryKeyRelatedField(
-        queryset=OrdenesCompras.objects.all(),
-        required=False,
-        allow_null=True
-    )
+    orden_compra = serializers.IntegerField(required=False, allow_null=True)
 
 
 class EntradaCreateSerializer(serializers.Serializer):
@@ -21,37 +20,34 @@ class EntradaCreateSerializer(serializers.Serializer):
     comentario = serializers.CharField(allow_blank=True)
     items = EntradaItemSerializer(many=True)
 
-    def create(self, validated_data):
-        usuario = self.context['request'].user
-        motivo = validated_data['motivo']
-        comentario = validated_data['comentario']
-        items = validated_data['items']
-        entradas = []
+    def validate_items(self, items):
+        productos = Producto.objects.in_bulk({item['producto'] for item in items})
+        ordenes = OrdenesCompras.objects.in_bulk(
+            {item['orden_compra'] for item in items if item.get('orden_compra')}
+        )
+        errores = []
+        for item in items:
+            error = {}
+            if item['producto'] not in productos:
+                error['producto'] = ["Producto no encontrado"]
+            if item.get('orden_compra') and item['orden_compra'] not in ordenes:
+                error['orden_compra'] = ["Orden no encontrada"]
+            errores.append(error)
+        if any(errores):
+            raise serializers.ValidationError(errores)
 
         for item in items:
-            producto = item['producto']
-            cantidad = item['cantidad']
-            costo_unitario = item['costo_unitario']
-            orden_compra = item.get('orden_compra', None)
-
-            entrada = Entrada.objects.create(
-                usuario=usuario,
-                motivo=motivo,
-                comentario=comentario,
-                producto=producto,
-                cantidad=cantidad,
-                costo_unitario=costo_unitario,
-                orden_compra=orden_compra
-            )
-
-            producto.stock_actual += cantidad
-            if item.get('actualizar_precio', False):
-                producto.precio_compra = costo_unitario
-            producto.save()
-
-            entradas.append(entrada)
-
-        return entradas
+            item['producto'] = productos[item['producto']]
+            item['orden_compra'] = ordenes.get(item.get('orden_compra'))
+        return items
+
+    def create(self, validated_data):
+        return registrar_entradas(
+            usuario=self.context['request'].user,
+            motivo=validated_data['motivo'],
+            comentario=validated_data['comentario'],
+            items=validated_data['items'],
+        )
     
 class EntradaSerializer(serializers.ModelSerializer):
     class Meta:
@@ -73,7 +69,40 @@ class EntradaReadSerializer(serializers.ModelSerializer):
         fields = ['id', 'producto', 'cantidad', 'costo_unitario', 'motivo', 'comentario', 'orden_compra', 'usuario', 'fecha']
 
 
-    
+
+
+class SalidaItemSerializer(serializers.Serializer):
+    producto = serializers.IntegerField()
+    cantidad = serializers.IntegerField(min_value=1)
+    cargo = serializers.ChoiceField(choices=Salida.CARGO_CHOICES)
+    # Se resuelve en bloque en SalidaCreateSerializer.validate_items
+    maquinaria = serializers.IntegerField(required=False, allow_null=True)
+
+
+class SalidaCreateSerializer(serializers.Serializer):
+    comentario = serializers.CharField(allow_blank=True, required=False, default='')
+    items = SalidaItemSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, items):
+        equipos = Maquinaria.objects.in_bulk({item['maquinaria'] for item in items if item.get('maquinaria')})
+        errores = [
+            {'maquinaria': ["Equipo no encontrado"]} if item.get('maquinaria') and item['maquinaria'] not in equipos else {}
+            for item in items
+        ]
+        if any(errores):
+            raise serializers.ValidationError(errores)
+        for item in items:
+            item['maquinaria'] = equipos.get(item.get('maquinaria'))
+        return items
+
+    def create(self, validated_data):
+        return registrar_salidas(
+            usuario=self.context['request'].user,
+            comentario=validated_data['comentario'],
+            items=validated_data['items'],
+        )
+
+
 class SalidaSerializer(serializers.ModelSerializer):
     producto_info = serializers.SerializerMethodField()
 
@@ -84,6 +113,7 @@ class SalidaSerializer(serializers.ModelSerializer):
             'producto_info',
             'cantidad',
             'cargo',
+            'maquinaria',
             'comentario',
             'usuario',
             'fecha'
@@ -94,3 +124,14 @@ class SalidaSerializer(serializers.ModelSerializer):
 
     def get_producto_info(self, obj):
         return f"{obj.producto.codigo} - {obj.producto.nombre}"
+
+
+class ConsumoMensualSerializer(serializers.ModelSerializer):
+    producto_codigo = serializers.CharField(source='producto.codigo', read_only=True)
+
+    class Meta:
+        model = ConsumoMensual
+        fields = [
+            'producto', 'producto_codigo', 'cargo', 'mes',
+            'entrada_cantidad', 'entrada_valor', 'salida_cantidad', 'salida_valor',
+        ]
@@ -0,0 +1,188 @@
+# movimientos/services.py
+"""
+Registro de movimientos de stock por lotes.
+
+Cada función procesa un documento completo (recepción o despacho) dentro de
+una sola transacción y con un número de consultas que no depende de la
+cantidad de líneas.
+"""
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, When, Value, F, Q, PositiveIntegerField, DecimalField
+from rest_framework import serializers
+
+from alertas import eventos
+from bodega.models import Producto, VersionCatalogo
+from ordenes.models import OrdenesCompras, OrdenCompraDetalle
+from . import consumo
+from .models import Entrada, Salida
+
+logger = logging.getLogger(__name__)
+
+
+def registrar_entradas(usuario, motivo, comentario, items):
+    """
+    Registra una recepción de mercadería.
+    `items` es una lista de dicts con `producto` (Producto), `cantidad`,
+    `costo_unitario`, `actualizar_precio` y `orden_compra` (OrdenesCompras o None).
+    Devuelve las entradas creadas, en el mismo orden de los items.
+    """
+    with transaction.atomic():
+        # Antes de tocar productos (ver VersionCatalogo): insertar entradas ya bloquea sus filas
+        version = VersionCatalogo.siguiente()
+        entradas = Entrada.objects.bulk_create([
+            Entrada(
+                usuario=usuario,
+                motivo=motivo,
+                comentario=comentario,
+                producto=item['producto'],
+                cantidad=item['cantidad'],
+                costo_unitario=item['costo_unitario'],
+                orden_compra=item.get('orden_compra'),
+            )
+            for item in items
+        ])
+
+        incrementos = defaultdict(int)
+        precios = {}
+        for item in items:
+            producto_id = item['producto'].pk
+            incrementos[producto_id] += item['cantidad']
+            if item.get('actualizar_precio', False):
+                precios[producto_id] = item['costo_unitario']
+        _incrementar_stock(incrementos, precios, version)
+
+        _aplicar_recepcion_oc(entradas)
+        consumo.acumular(consumo.deltas_entradas(entradas))
+        eventos.entradas_registradas(entradas)
+
+    return entradas
+
+
+def _incrementar_stock(incrementos, precios, version):
+    """Aplica todos los incrementos (y precios nuevos) en un solo UPDATE."""
+    if not incrementos:
+        return
+    cambios = {
+        'version': Value(version),
+        'stock_actual': Case(
+            *[When(pk=pk, then=F('stock_actual') + Value(cantidad)) for pk, cantidad in incrementos.items()],
+            output_field=PositiveIntegerField(),
+        )
+    }
+    if precios:
+        cambios['precio_compra'] = Case(
+            *[When(pk=pk, then=Value(precio)) for pk, precio in precios.items()],
+            default=F('precio_compra'),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        )
+    Producto.objects.filter(pk__in=incrementos.keys()).update(**cambios)
+
+
+def _aplicar_recepcion_oc(entradas):
+    """
+    Suma lo recibido a las líneas de OC que coinciden con el producto de cada
+    entrada y recalcula una sola vez el estado de cada OC tocada.
+    """
+    por_orden = defaultdict(list)
+    for entrada in entradas:
+        if entrada.orden_compra_id:
+            por_orden[entrada.orden_compra_id].append(entrada)
+    if not por_orden:
+        return
+
+    detalles_por_orden = defaultdict(list)
+    for detalle in OrdenCompraDetalle.objects.filter(orden_id__in=por_orden.keys()).order_by('id'):
+        detalles_por_orden[detalle.orden_id].append(detalle)
+
+    detalles_modificados = {}
+    ordenes_modificadas = []
+    for orden_id, entradas_orden in por_orden.items():
+        detalles = detalles_por_orden[orden_id]
+        for entrada in entradas_orden:
+            for detalle in detalles:
+                if detalle.coincide_con_producto(entrada.producto):
+                    detalle.cantidad_recibida += entrada.cantidad
+                    detalles_modificados[detalle.pk] = detalle
+        ordenes_modificadas.append(
+            OrdenesCompras(pk=orden_id, estado=OrdenesCompras.calcular_estado(detalles))
+        )
+
+    if detalles_modificados:
+        OrdenCompraDetalle.objects.bulk_update(detalles_modificados.values(), ['cantidad_recibida'])
+    OrdenesCompras.objects.bulk_update(ordenes_modificadas, ['estado'])
+    for orden in ordenes_modificadas:
+        logger.info(f"Estado actualizado de OC id={orden.pk}: {orden.estado}")
+
+
+def registrar_salidas(usuario, comentario, items):
+    """
+    Registra un despacho de bodega.
+    `items` es una lista de dicts con `producto` (id), `cantidad`, `cargo` y
+    opcionalmente `maquinaria` (Maquinaria o None).
+    Los productos se bloquean en orden de id y el descuento es condicional,
+    de modo que dos despachos simultáneos no pueden dejar stock negativo.
+    Devuelve las salidas creadas, con `producto` ya asignado.
+    """
+    requeridos = defaultdict(int)
+    for item in items:
+        requeridos[item['producto']] += item['cantidad']
+
+    with transaction.atomic():
+        # Antes de bloquear los productos, en el mismo orden que Producto.save (ver VersionCatalogo)
+        version = VersionCatalogo.siguiente()
+        productos = {
+            producto.pk: producto
+            for producto in Producto.objects.select_for_update().filter(pk__in=requeridos.keys()).order_by('pk')
+        }
+        errores = []
+        for item in items:
+            producto = productos.get(item['producto'])
+            if producto is None:
+                errores.append({'producto': ["Producto no encontrado"]})
+            elif producto.stock_actual < requeridos[producto.pk]:
+                errores.append({'cantidad': [
+                    f"Stock insuficiente para {producto.codigo}: disponible {producto.stock_actual}, "
+                    f"solicitado {requeridos[producto.pk]}"
+                ]})
+            else:
+                errores.append({})
+        if any(errores):
+            raise serializers.ValidationError({'items': errores})
+
+        condicion = Q()
+        for pk, cantidad in requeridos.items():
+            condicion |= Q(pk=pk, stock_actual__gte=cantidad)
+        actualizados = Producto.objects.filter(condicion).update(
+            version=Value(version),
+            stock_actual=Case(
+                *[When(pk=pk, then=F('stock_actual') - Value(cantidad)) for pk, cantidad in requeridos.items()],
+                output_field=PositiveIntegerField(),
+            )
+        )
+        if actualizados != len(requeridos):
+            # No debería ocurrir con las filas bloqueadas; se revierte todo el despacho
+            raise serializers.ValidationError({'items': ["Stock insuficiente; el despacho no se registró"]})
+
+        for pk, cantidad in requeridos.items():
+            productos[pk].stock_actual -= cantidad
+
+        salidas = Salida.objects.bulk_create([
+            Salida(
+                usuario=usuario,
+                producto=productos[item['producto']],
+                cantidad=item['cantidad'],
+                cargo=item['cargo'],
+                comentario=comentario,
+                costo_unitario=productos[item['producto']].precio_compra,
+                maquinaria=item.get('maquinaria'),
+            )
+            for item in items
+        ])
+        consumo.acumular(consumo.deltas_salidas(salidas))
+        consumo.acumular_maquinaria(consumo.deltas_maquinaria(salidas))
+        eventos.salidas_registradas(salidas)
+
+    return salidas
@@ -1,21 +1,24 @@
 # movimientos/signals.py
 import logging
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
-from .models import Entrada
+from bodega.models import Producto
+from .models import Entrada, Salida
+from . import consumo
 from ordenes.models import OrdenesCompras
 
 logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=Entrada)
 def actualizar_orden_compra(sender, instance, created, **kwargs):
+    # Las recepciones por lote (services.registrar_entradas) usan bulk_create,
+    # que no dispara esta señal, y actualizan las OC por su cuenta.
     # Procesa solo cuando se crea la entrada (evitando actualizaciones posteriores)
     if created and instance.orden_compra:
         oc = instance.orden_compra
         for detail in oc.detalles.all():
             # Comprueba si el detalle coincide con el producto de la entrada
-            if instance.producto.codigo.lower().strip() == detail.detalle.lower().strip() or \
-               (hasattr(instance.producto, 'nombre') and instance.producto.nombre.lower().strip() == detail.detalle.lower().strip()):
+            if detail.coincide_con_producto(instance.producto):
                 logger.info(
                     f"Antes de actualizar: Detalle {detail.detalle}: Ordenado {detail.cantidad}, Recibido {detail.cantidad_recibida}"
                 )
@@ -27,3 +30,41 @@ def actualizar_orden_compra(sender, instance, created, **kwargs):
                 )
         oc.actualizar_estado()
         logger.info(f"Estado actualizado de OC {oc.numero_orden}: {oc.estado}")
+
+
+# Resumen mensual para altas, cambios y bajas individuales. Los servicios
+# por lote usan bulk_create y llaman a consumo.acumular directamente.
+_DELTAS = {Entrada: consumo.deltas_entradas, Salida: consumo.deltas_salidas}
+
+
+@receiver(pre_save, sender=Entrada)
+@receiver(pre_save, sender=Salida)
+def guardar_movimiento_anterior(sender, instance, **kwargs):
+    instance._movimiento_anterior = sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Entrada)
+@receiver(post_save, sender=Salida)
+def acumular_consumo(sender, instance, **kwargs):
+    deltas = _DELTAS[sender]
+    anterior = getattr(instance, '_movimiento_anterior', None)
+    consumo.acumular(consumo.combinar(
+        deltas([anterior], signo=-1) if anterior else {},
+        deltas([instance]),
+    ))
+    if sender is Salida:
+        consumo.acumular_maquinaria(consumo.combinar(
+            consumo.deltas_maquinaria([anterior], signo=-1) if anterior else {},
+            consumo.deltas_maquinaria([instance]),
+        ))
+
+
+@receiver(post_delete, sender=Entrada)
+@receiver(post_delete, sender=Salida)
+def descontar_consumo(sender, instance, origin=None, **kwargs):
+    # Al eliminar un producto, su resumen se borra en cascada; el costo por
+    # equipo no depende del producto y se descuenta igual
+    if not (isinstance(origin, Producto) or getattr(origin, 'model', None) is Producto):
+        consumo.acumular(_DELTAS[sender]([instance], signo=-1))
+    if sender is Salida:
+        consumo.acumular_maquinaria(consumo.deltas_maquinaria([instance], signo=-1))
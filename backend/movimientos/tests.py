@@ -1,3 +1,281 @@
-from django.test import TestCase
+import io
+import re
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+from pypdf import PdfReader
+from rest_framework.test import APITestCase
+
+from bodega.models import Producto
+from ordenes.models import OrdenesCompras, OrdenCompraDetalle, Proveedor
+from usuarios.models import Usuario
+from .models import ConsumoMensual, Entrada, Salida
+from .pdf import FILAS_POR_PAGINA, TABLAS_POR_TANDA, generar_reporte_movimientos
+from .services import registrar_entradas, registrar_salidas
+
+
+class KardexTests(APITestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create(username='bodega')
+        self.client.force_authenticate(self.usuario)
+        # Stock inicial cargado sin entradas, como en la importación
+        self.producto = Producto.objects.create(
+            codigo='K1', nombre='Filtro', categoria='-', ubicacion='-', precio_compra=100, stock_actual=5
+        )
+        self.entrada(10, 100)
+        self.salida(3)
+        self.entrada(10, 200)
+        self.salida(4)
+
+    def entrada(self, cantidad, costo):
+        registrar_entradas(self.usuario, 'compra', '', [{
+            'producto': self.producto, 'cantidad': cantidad, 'costo_unitario': Decimal(costo), 'orden_compra': None,
+        }])
+
+    def salida(self, cantidad):
+        registrar_salidas(self.usuario, '', [{'producto': self.producto.pk, 'cantidad': cantidad, 'cargo': 'taller'}])
+
+    def test_saldos_y_costo_promedio_compras(self):
+        response = self.client.get('/api/movimientos/kardex/', {'producto': self.producto.pk})
+        self.assertEqual(response.status_code, 200)
+        filas = response.data['results']
+        self.assertEqual([f['tipo'] for f in filas], ['entrada', 'salida', 'entrada', 'salida'])
+        self.assertEqual([f['saldo'] for f in filas], [15, 12, 22, 18])
+        self.assertEqual([f['costo_promedio_compras'] for f in filas], [100, 100, 150, 150])
+        self.assertEqual(filas[-1]['saldo'], Producto.objects.get(pk=self.producto.pk).stock_actual)
+        self.assertIsNone(response.data['next'])
+
+    def test_paginacion_por_cursor(self):
+        response = self.client.get('/api/movimientos/kardex/', {'producto': self.producto.pk, 'page_size': 3})
+        self.assertEqual(len(response.data['results']), 3)
+        siguiente = self.client.get(response.data['next'])
+        self.assertEqual([f['saldo'] for f in siguiente.data['results']], [18])
+        self.assertIsNone(siguiente.data['next'])
+
+    def recorrer_de_a_uno(self):
+        filas = []
+        response = self.client.get('/api/movimientos/kardex/', {'producto': self.producto.pk, 'page_size': 1})
+        while True:
+            filas += response.data['results']
+            if not response.data['next']:
+                return filas
+            response = self.client.get(response.data['next'])
+
+    def test_paginas_siguientes_parten_de_los_movimientos_anteriores(self):
+        completo = self.client.get('/api/movimientos/kardex/', {'producto': self.producto.pk}).data['results']
+        self.assertEqual(self.recorrer_de_a_uno(), completo)
+
+        # Con la misma fecha el orden lo deciden tipo e id
+        fecha = timezone.now()
+        Entrada.objects.update(fecha=fecha)
+        Salida.objects.update(fecha=fecha)
+        filas = self.recorrer_de_a_uno()
+        self.assertEqual([f['tipo'] for f in filas], ['entrada', 'entrada', 'salida', 'salida'])
+        self.assertEqual([f['saldo'] for f in filas], [15, 25, 22, 18])
+        self.assertEqual([f['costo_promedio_compras'] for f in filas], [100, 150, 150, 150])
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get('/api/movimientos/kardex/').status_code, 400)
+        self.assertEqual(self.client.get('/api/movimientos/kardex/', {'producto': 999}).status_code, 404)
+        respuesta = self.client.get('/api/movimientos/kardex/', {'producto': self.producto.pk, 'cursor': 'x'})
+        self.assertEqual(respuesta.status_code, 400)
+
+
+class ConsumoMensualTests(APITestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create(username='bodega')
+        self.client.force_authenticate(self.usuario)
+        self.producto = Producto.objects.create(
+            codigo='C1', nombre='Aceite', categoria='-', ubicacion='-', precio_compra=1000, stock_actual=50
+        )
+
+    def verificar(self):
+        call_command('reconstruir_consumo', '--verificar', stdout=io.StringIO())
+
+    def test_servicios_acumulan_en_la_misma_transaccion(self):
+        registrar_entradas(self.usuario, 'compra', '', [
+            {'producto': self.producto, 'cantidad': 10, 'costo_unitario': Decimal('900'), 'orden_compra': None},
+            {'producto': self.producto, 'cantidad': 5, 'costo_unitario': Decimal('1100'), 'orden_compra': None},
+        ])
+        registrar_salidas(self.usuario, '', [
+            {'producto': self.producto.pk, 'cantidad': 3, 'cargo': 'taller'},
+            {'producto': self.producto.pk, 'cantidad': 2, 'cargo': 'maquinaria'},
+        ])
+        registrar_salidas(self.usuario, '', [{'producto': self.producto.pk, 'cantidad': 1, 'cargo': 'taller'}])
+
+        filas = {c.cargo: c for c in ConsumoMensual.objects.all()}
+        self.assertEqual((filas[''].entrada_cantidad, filas[''].entrada_valor), (15, 14500))
+        self.assertEqual((filas['taller'].salida_cantidad, filas['taller'].salida_valor), (4, 4000))
+        self.assertEqual(filas['maquinaria'].salida_cantidad, 2)
+        self.verificar()
+
+        response = self.client.get('/api/movimientos/consumo/', {'cargo': 'taller'})
+        self.assertEqual([f['salida_cantidad'] for f in response.data['results']], [4])
+
+    def test_cambios_individuales_y_verificacion(self):
+        salida = Salida.objects.create(usuario=self.usuario, producto=self.producto, cantidad=4, cargo='taller')
+        salida.cargo = 'bodega'
+        salida.save()
+        Salida.objects.create(usuario=self.usuario, producto=self.producto, cantidad=1, cargo='bodega').delete()
+        self.verificar()
+        self.assertEqual(ConsumoMensual.objects.get(cargo='bodega').salida_cantidad, 4)
+
+        ConsumoMensual.objects.update(salida_cantidad=99)
+        with self.assertRaises(CommandError):
+            self.verificar()
+        call_command('reconstruir_consumo', stdout=io.StringIO())
+        self.verificar()
+
+    def test_eliminar_producto(self):
+        Salida.objects.create(usuario=self.usuario, producto=self.producto, cantidad=1, cargo='taller')
+        self.producto.delete()
+        self.assertFalse(ConsumoMensual.objects.exists())
+
+    def test_informes_valorizan_con_el_costo_de_la_salida(self):
+        registrar_salidas(self.usuario, '', [{'producto': self.producto.pk, 'cantidad': 2, 'cargo': 'taller'}])
+        sin_costo = Salida.objects.create(usuario=self.usuario, producto=self.producto, cantidad=1, cargo='bodega')
+        Salida.objects.filter(pk=sin_costo.pk).update(costo_unitario=None)
+        self.producto.precio_compra = 2000
+        self.producto.save()
+
+        hoy = sin_costo.fecha.date().isoformat()
+        response = self.client.get('/api/movimientos/reporte/exportar/', {
+            'tipo': 'salida', 'start_date': hoy, 'end_date': hoy, 'formato': 'csv',
+        })
+        filas = [linea.split(';') for linea in b''.join(response.streaming_content).decode('utf-8-sig').splitlines()[1:]]
+        # Valor y total: el costo registrado en la salida, o el precio actual si no lo tiene
+        self.assertEqual([(fila[4], Decimal(fila[5]), Decimal(fila[6])) for fila in filas], [
+            ('taller', Decimal('1000'), Decimal('2000')),
+            ('bodega', Decimal('2000'), Decimal('2000')),
+        ])
+        self.assertEqual(ConsumoMensual.objects.get(cargo='taller').salida_valor, Decimal('2000'))
+
+
+class RegistroSalidasTests(APITestCase):
+    URL = '/api/movimientos/salidas/'
+
+    def setUp(self):
+        self.client.force_authenticate(Usuario.objects.create(username='bodega'))
+        self.correa = Producto.objects.create(
+            codigo='C1', nombre='Correa', categoria='-', ubicacion='-', precio_compra=100, stock_actual=10
+        )
+        self.filtro = Producto.objects.create(
+            codigo='F1', nombre='Filtro', categoria='-', ubicacion='-', precio_compra=50, stock_actual=2
+        )
+
+    def test_productos_repetidos_se_suman(self):
+        response = self.client.post(self.URL, {'comentario': '', 'items': [
+            {'producto': self.correa.pk, 'cantidad': 4, 'cargo': 'taller'},
+            {'producto': self.filtro.pk, 'cantidad': 2, 'cargo': 'taller'},
+            {'producto': self.correa.pk, 'cantidad': 6, 'cargo': 'bodega'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([s['cantidad'] for s in response.data], [4, 2, 6])
+        self.correa.refresh_from_db()
+        self.filtro.refresh_from_db()
+        self.assertEqual((self.correa.stock_actual, self.filtro.stock_actual), (0, 0))
+        self.assertEqual(ConsumoMensual.objects.get(cargo='bodega').salida_cantidad, 6)
+
+    def test_stock_insuficiente_no_registra_nada(self):
+        # Cada línea alcanza por sí sola, pero la suma de la correa (11) supera el stock (10)
+        response = self.client.post(self.URL, {'comentario': '', 'items': [
+            {'producto': self.correa.pk, 'cantidad': 6, 'cargo': 'taller'},
+            {'producto': self.filtro.pk, 'cantidad': 1, 'cargo': 'taller'},
+            {'producto': self.correa.pk, 'cantidad': 5, 'cargo': 'taller'},
+            {'producto': 999, 'cantidad': 1, 'cargo': 'taller'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        errores = response.data['items']
+        self.assertEqual(len(errores), 4)
+        self.assertIn('disponible 10, solicitado 11', str(errores[0]['cantidad'][0]))
+        self.assertEqual(errores[1], {})
+        self.assertIn('cantidad', errores[2])
+        self.assertIn('producto', errores[3])
+
+        self.assertFalse(Salida.objects.exists())
+        self.assertFalse(ConsumoMensual.objects.exists())
+        self.correa.refresh_from_db()
+        self.filtro.refresh_from_db()
+        self.assertEqual((self.correa.stock_actual, self.filtro.stock_actual), (10, 2))
+
+
+class RegistroEntradasTests(APITestCase):
+    URL = '/api/movimientos/entradas/'
+
+    def setUp(self):
+        self.client.force_authenticate(Usuario.objects.create(username='bodega'))
+        self.correa = Producto.objects.create(
+            codigo='C1', nombre='Correa', categoria='-', ubicacion='-', precio_compra=100, stock_actual=1
+        )
+        self.filtro = Producto.objects.create(
+            codigo='F1', nombre='Filtro', categoria='-', ubicacion='-', precio_compra=50
+        )
+        proveedor = Proveedor.objects.create(
+            nombre_proveedor='Proveedor', rut='1-9', domicilio='-', ubicacion='-',
+            email='p@example.com', telefono='-'
+        )
+        self.orden = OrdenesCompras.objects.create(
+            numero_orden='1', empresa='Maquinarias Imperia SPA', proveedor=proveedor,
+            cargo='-', forma_pago='-', plazo_entrega='-'
+        )
+        # Las líneas de la OC nombran el producto por código o por nombre
+        self.linea_correa = OrdenCompraDetalle.objects.create(orden=self.orden, cantidad=5, detalle='c1', precio_unitario=100)
+        self.linea_filtro = OrdenCompraDetalle.objects.create(orden=self.orden, cantidad=2, detalle='Filtro', precio_unitario=50)
+
+    def recibir(self, *items):
+        response = self.client.post(self.URL, {'motivo': 'compra', 'comentario': '', 'items': [
+            {'costo_unitario': '100', 'orden_compra': self.orden.pk, **item} for item in items
+        ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response
+
+    def test_recepcion_actualiza_la_oc(self):
+        self.recibir({'producto': self.correa.pk, 'cantidad': 2}, {'producto': self.correa.pk, 'cantidad': 1})
+        self.linea_correa.refresh_from_db()
+        self.orden.refresh_from_db()
+        self.assertEqual(self.linea_correa.cantidad_recibida, 3)
+        self.assertEqual(self.orden.estado, 'items pendientes')
+
+        self.recibir({'producto': self.correa.pk, 'cantidad': 2}, {'producto': self.filtro.pk, 'cantidad': 2})
+        self.linea_filtro.refresh_from_db()
+        self.orden.refresh_from_db()
+        self.assertEqual(self.linea_filtro.cantidad_recibida, 2)
+        self.assertEqual(self.orden.estado, 'completa')
+        self.assertEqual(Entrada.objects.filter(orden_compra=self.orden).count(), 4)
+        self.correa.refresh_from_db()
+        self.assertEqual(self.correa.stock_actual, 1 + 5)
+
+    def test_actualizar_precio(self):
+        self.recibir(
+            {'producto': self.correa.pk, 'cantidad': 1, 'costo_unitario': '120', 'actualizar_precio': True},
+            {'producto': self.filtro.pk, 'cantidad': 1, 'costo_unitario': '80'},
+        )
+        self.correa.refresh_from_db()
+        self.filtro.refresh_from_db()
+        self.assertEqual(self.correa.precio_compra, Decimal('120'))
+        self.assertEqual(self.filtro.precio_compra, Decimal('50'))
+        self.assertEqual(self.filtro.stock_actual, 1)
+
+
+class InformePDFTests(APITestCase):
+    def test_todas_las_filas_llegan_al_pdf(self):
+        usuario = Usuario.objects.create(username='bodega')
+        # Varias tandas de tablas, para que el documento se rellene más de una vez
+        cantidad = FILAS_POR_PAGINA * (TABLAS_POR_TANDA + 2) + 7
+        productos = Producto.objects.bulk_create([
+            Producto(codigo=f'P{i:04}', nombre='Perno', categoria='-', ubicacion='-', precio_compra=10, stock_actual=1)
+            for i in range(cantidad)
+        ])
+        Salida.objects.bulk_create([
+            Salida(producto=producto, cantidad=1, usuario=usuario, cargo='taller', costo_unitario=10)
+            for producto in productos
+        ])
+        hoy = timezone.localdate()
+        destino = io.BytesIO()
+        generar_reporte_movimientos(destino, 'salida', hoy, hoy)
+
+        texto = ''.join(pagina.extract_text() for pagina in PdfReader(destino).pages)
+        self.assertEqual(sorted(re.findall(r'P\d{4}', texto)), [p.codigo for p in productos])
+        self.assertIn('Total Salidas:', texto)
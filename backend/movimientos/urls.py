@@ -1,11 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import EntradaViewSet, SalidaViewSet, ReportePDFView
+from .views import EntradaViewSet, SalidaViewSet, ReportePDFView, KardexView, ConsumoMensualViewSet
 
 router = DefaultRouter()
 router.register(r'entradas', EntradaViewSet)
 router.register(r'salidas', SalidaViewSet)
 router.register(r'reporte', ReportePDFView, basename='reporte')
+router.register(r'kardex', KardexView, basename='kardex')
+router.register(r'consumo', ConsumoMensualViewSet, basename='consumo')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,23 +1,30 @@
 # movimientos/views.py
 from datetime import datetime
-import io
 import logging
 
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from django.utils.dateparse import parse_date
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Sum
 
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-
-from .models import Entrada, Salida
-from .serializers import EntradaSerializer, SalidaSerializer, EntradaCreateSerializer, EntradaReadSerializer
+from SolDega.exportacion import FORMATOS, respuesta_exportacion
+from SolDega.pagination import FechaCursorPagination
 from bodega.models import Producto
+from reportes.servicio import EspecificacionPDF, generar_archivo
+from .kardex import kardex_producto, decodificar_cursor, TAMANO_PAGINA, TAMANO_PAGINA_MAXIMO
+from .models import Entrada, Salida, ConsumoMensual
+from .reportes import (
+    iterar_archivo, movimientos_queryset, filas_exportacion,
+    COLUMNAS_EXPORTACION_ENTRADA, COLUMNAS_EXPORTACION_SALIDA,
+)
+from .serializers import (
+    EntradaSerializer, SalidaSerializer, EntradaCreateSerializer, EntradaReadSerializer, SalidaCreateSerializer,
+    ConsumoMensualSerializer,
+)
 from ordenes.models import OrdenesCompras, OrdenCompraDetalle
 
 logger = logging.getLogger(__name__)  # ✅ Bien definido aquí
@@ -25,6 +32,7 @@ logger = logging.getLogger(__name__)  # ✅ Bien definido aquí
 
 class EntradaViewSet(viewsets.ModelViewSet):
     queryset = Entrada.objects.all()
+    pagination_class = FechaCursorPagination
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -56,6 +64,7 @@ class EntradaViewSet(viewsets.ModelViewSet):
 class SalidaViewSet(viewsets.ModelViewSet):
     queryset = Salida.objects.all()
     serializer_class = SalidaSerializer
+    pagination_class = FechaCursorPagination
 
     def get_queryset(self):
         qs = Salida.objects.select_related('producto', 'usuario').order_by('-fecha')
@@ -63,43 +72,26 @@ class SalidaViewSet(viewsets.ModelViewSet):
         end_date = self.request.query_params.get('end_date')
         if start_date and end_date:
             qs = qs.filter(fecha__date__gte=start_date, fecha__date__lte=end_date)
+        maquinaria = self.request.query_params.get('maquinaria')
+        if maquinaria and maquinaria.isdigit():
+            qs = qs.filter(maquinaria_id=maquinaria)
         consignacion_param = self.request.query_params.get('consignacion')
         if consignacion_param and consignacion_param.lower() == "true":
             qs = qs.filter(producto__consignacion=True)
         return qs
 
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return SalidaCreateSerializer
+        return SalidaSerializer
+
     def create(self, request, *args, **kwargs):
-        data = request.data
-        items = data.get('items', [])
-        comentario = data.get('comentario', '')
-        created_items = []
-
-        for item in items:
-            item['comentario'] = comentario
-            serializer = self.get_serializer(data=item)
-            serializer.is_valid(raise_exception=True)
-            salida = serializer.save(usuario=request.user)
-            created_items.append(serializer.data)
-            try:
-                product = Producto.objects.get(id=item.get('producto'))
-                product.stock_actual -= int(item.get('cantidad'))
-                product.save()
-            except Producto.DoesNotExist:
-                pass
-
-        return Response(created_items, status=status.HTTP_201_CREATED)
-
-
-
-def format_currency(value):
-    s = "{:,.2f}".format(value)
-    s = s.replace(",", "X").replace(".", ",").replace("X", ".")
-    return s
-
-def format_currency(value):
-    s = "{:,.2f}".format(value)
-    s = s.replace(",", "X").replace(".", ",").replace("X", ".")
-    return s
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        salidas = serializer.save()
+        return Response(SalidaSerializer(salidas, many=True).data, status=status.HTTP_201_CREATED)
+
+
 
 class ReportePDFView(viewsets.ViewSet):
     """
@@ -108,9 +100,12 @@ class ReportePDFView(viewsets.ViewSet):
       - tipo: 'entrada' o 'salida'
       - start_date y end_date en formato YYYY-MM-DD
       - consignacion (opcional)
+    El PDF se construye en un worker de reportes.servicio sobre un archivo
+    temporal (503 si el servicio está saturado) y se envía por bloques.
+    `exportar` entrega los mismos movimientos en CSV o XLSX (parámetro formato).
     """
-    @action(detail=False, methods=['get'])
-    def generar_pdf(self, request):
+    def _parametros(self, request):
+        """Devuelve (tipo, start, end, solo_consignacion) o una Response de error."""
         tipo = request.query_params.get('tipo', 'entrada')
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
@@ -124,112 +119,113 @@ class ReportePDFView(viewsets.ViewSet):
         except ValueError:
             return Response({"error": "Formato de fecha inválido. Use YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
 
-        if tipo == 'entrada':
-            queryset = Entrada.objects.filter(
-                fecha__date__gte=start.date(), 
-                fecha__date__lte=end.date()
-            )
-            # Encabezado con dos columnas para producto: Código y Nombre
-            header = ['Cantidad', 'Código Producto', 'Nombre Producto', 'Motivo / Orden', 'Valor Producto', 'Total Producto']
-        else:
-            queryset = Salida.objects.filter(
-                fecha__date__gte=start.date(), 
-                fecha__date__lte=end.date()
-            )
-            header = ['Cantidad', 'Código Producto', 'Nombre Producto', 'Cargo', 'Valor Producto', 'Total Producto']
+        solo_consignacion = bool(consignacion_param and consignacion_param.lower() == "true")
+        return tipo, start.date(), end.date(), solo_consignacion
 
-        if consignacion_param and consignacion_param.lower() == "true":
-            queryset = queryset.filter(producto__consignacion=True)
-
-        total_movimientos = 0
-        total_valor = 0
-        data = [header]
-
-        # Definir un estilo de párrafo para permitir que el texto se ajuste (wrap) en la celda
-        stylesheet = getSampleStyleSheet()
-        wrapStyle = ParagraphStyle(
-            name='Wrap',
-            fontSize=10,
-            leading=12,
-            wordWrap='CJK'  # Puedes ajustar según tus necesidades
-        )
-
-        if tipo == 'entrada':
-            for entrada in queryset:
-                cantidad = entrada.cantidad
-                # Se espera que entrada.producto sea un objeto con atributos 'codigo' y 'nombre'
-                codigo = entrada.producto.codigo if hasattr(entrada.producto, 'codigo') else ""
-                nombre = entrada.producto.nombre if hasattr(entrada.producto, 'nombre') else ""
-                if entrada.motivo == 'recepcion_oc' and entrada.orden_compra and entrada.orden_compra.numero_orden:
-                    motivo_display = "OC " + entrada.orden_compra.numero_orden
-                else:
-                    motivo_display = entrada.motivo
-                valor_producto = float(entrada.costo_unitario)
-                total_producto = cantidad * valor_producto
-                total_movimientos += cantidad
-                total_valor += total_producto
-
-                # Convertir el código y nombre a Paragraph para que se ajusten en la celda
-                codigo_par = Paragraph(codigo, wrapStyle)
-                nombre_par = Paragraph(nombre, wrapStyle)
-                data.append([
-                    str(cantidad),
-                    codigo_par,
-                    nombre_par,
-                    motivo_display,
-                    f"${format_currency(valor_producto)}",
-                    f"${format_currency(total_producto)}"
-                ])
-            data.append(['', '', '', 'Total Entradas:', str(total_movimientos), f"${format_currency(total_valor)}"])
-        else:
-            for salida in queryset:
-                cantidad = salida.cantidad
-                codigo = salida.producto.codigo if hasattr(salida.producto, 'codigo') else ""
-                nombre = salida.producto.nombre if hasattr(salida.producto, 'nombre') else ""
-                cargo = salida.cargo
-                valor_producto = float(salida.producto.precio_compra)
-                total_producto = cantidad * valor_producto
-                total_movimientos += cantidad
-                total_valor += total_producto
-
-                codigo_par = Paragraph(codigo, wrapStyle)
-                nombre_par = Paragraph(nombre, wrapStyle)
-                data.append([
-                    str(cantidad),
-                    codigo_par,
-                    nombre_par,
-                    cargo,
-                    f"${format_currency(valor_producto)}",
-                    f"${format_currency(total_producto)}"
-                ])
-            data.append(['', '', '', 'Total Salidas:', str(total_movimientos), f"${format_currency(total_valor)}"])
-
-        # Inicializar el documento PDF
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-        title = Paragraph("Informe de Movimiento", stylesheet['Title'])
-        elements.append(title)
-        elements.append(Spacer(1, 40))
-
-        # Definir anchos de columnas (ajústalos según tus necesidades)
-        colWidths = [60, 80, 120, 100, 80, 80]
-        table = Table(data, colWidths=colWidths)
-        table_style = TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.gray),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.orange),
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0,0), (-1,0), 12),
-            ('GRID', (0,0), (-1,-1), 1, colors.black),
-        ])
-        table.setStyle(table_style)
-        elements.append(table)
-
-        doc.build(elements)
-        pdf = buffer.getvalue()
-        buffer.close()
-        response = HttpResponse(content_type='application/pdf')
+    @action(detail=False, methods=['get'])
+    def generar_pdf(self, request):
+        parametros = self._parametros(request)
+        if isinstance(parametros, Response):
+            return parametros
+        tipo, start, end, solo_consignacion = parametros
+        archivo, _ = generar_archivo(EspecificacionPDF('movimientos', {
+            'tipo': tipo,
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            'consignacion': solo_consignacion,
+        }))
+        response = StreamingHttpResponse(iterar_archivo(archivo), content_type='application/pdf')
         response['Content-Disposition'] = 'attachment; filename="informe_movimiento.pdf"'
-        response.write(pdf)
-        return response
\ No newline at end of file
+        return response
+
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        parametros = self._parametros(request)
+        if isinstance(parametros, Response):
+            return parametros
+        tipo, start, end, solo_consignacion = parametros
+        formato = request.query_params.get('formato', 'xlsx')
+        if formato not in FORMATOS:
+            return Response({"error": "Formato inválido. Use 'csv' o 'xlsx'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = movimientos_queryset(tipo, start, end, solo_consignacion)
+        columnas = COLUMNAS_EXPORTACION_ENTRADA if tipo == 'entrada' else COLUMNAS_EXPORTACION_SALIDA
+        titulo = 'Entradas' if tipo == 'entrada' else 'Salidas'
+        nombre = f"movimientos_{tipo}_{start.isoformat()}_{end.isoformat()}"
+        return respuesta_exportacion(nombre, formato, columnas, filas_exportacion(tipo, queryset), titulo)
+
+
+class KardexView(viewsets.ViewSet):
+    """
+    Kardex de un producto: entradas y salidas en orden cronológico con el
+    saldo de stock y `costo_promedio_compras` después de cada movimiento.
+    Es el promedio ponderado de todas las compras hasta ese movimiento (solo
+    entradas; las salidas no lo modifican), no el costo promedio ponderado
+    móvil del stock en bodega.
+    Parámetros:
+      - producto: id del producto (requerido)
+      - page_size (opcional, máximo 500)
+      - cursor: valor de `next` de la página anterior
+    """
+    def list(self, request):
+        try:
+            producto = Producto.objects.only('id', 'codigo', 'nombre', 'stock_actual').get(
+                pk=int(request.query_params.get('producto', ''))
+            )
+        except ValueError:
+            return Response({"error": "Se requiere producto"}, status=status.HTTP_400_BAD_REQUEST)
+        except Producto.DoesNotExist:
+            return Response({"error": "Producto no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            tamano = min(int(request.query_params.get('page_size', TAMANO_PAGINA)), TAMANO_PAGINA_MAXIMO)
+            if tamano < 1:
+                raise ValueError
+        except ValueError:
+            return Response({"error": "page_size inválido"}, status=status.HTTP_400_BAD_REQUEST)
+
+        cursor = request.query_params.get('cursor')
+        try:
+            cursor = decodificar_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        filas, siguiente = kardex_producto(producto, cursor, tamano)
+        next_url = None
+        if siguiente:
+            parametros = request.query_params.copy()
+            parametros['cursor'] = siguiente
+            next_url = request.build_absolute_uri(f"{request.path}?{parametros.urlencode()}")
+        return Response({
+            'producto': {
+                'id': producto.pk,
+                'codigo': producto.codigo,
+                'nombre': producto.nombre,
+                'stock_actual': producto.stock_actual,
+            },
+            'next': next_url,
+            'results': filas,
+        })
+
+
+class ConsumoMensualViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Consumo por producto, cargo y mes desde la tabla resumen.
+    Parámetros opcionales: producto, cargo, desde y hasta (YYYY-MM).
+    Las entradas aparecen con cargo vacío.
+    """
+    serializer_class = ConsumoMensualSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['producto', 'cargo']
+
+    def get_queryset(self):
+        qs = ConsumoMensual.objects.select_related('producto').order_by('-mes', 'producto_id', 'cargo')
+        params = self.request.query_params
+        for nombre, lookup in (('desde', 'mes__gte'), ('hasta', 'mes__lte')):
+            if params.get(nombre):
+                try:
+                    mes = datetime.strptime(params[nombre], '%Y-%m').date()
+                except ValueError:
+                    raise ValidationError({nombre: "Formato de mes inválido. Use YYYY-MM"})
+                qs = qs.filter(**{lookup: mes})
+        return qs
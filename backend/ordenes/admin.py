@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import OrdenesCompras, OrdenCompraDetalle, Proveedor, Solicitud, SolicitudDetalle
+from .models import OrdenesCompras, OrdenCompraDetalle, Proveedor, Solicitud, SolicitudDetalle, Correlativo
 
 # Inline para los detalles de Ordenes de Compra
 class OrdenCompraDetalleInline(admin.TabularInline):
@@ -48,3 +48,8 @@ class SolicitudAdmin(admin.ModelAdmin):
     ordering       = ('-fecha_creacion',)
     list_per_page  = 25
     inlines        = [SolicitudDetalleInline]
+
+@admin.register(Correlativo)
+class CorrelativoAdmin(admin.ModelAdmin):
+    list_display  = ('documento', 'empresa', 'numero_inicial', 'ultimo_numero', 'numeros_omitidos')
+    list_filter   = ('documento',)
@@ -1,6 +1,10 @@
+# ordenes/apps.py
 from django.apps import AppConfig
 
 
 class OrdenesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ordenes'
+
+    def ready(self):
+        import ordenes.signals
@@ -0,0 +1,122 @@
+# ordenes/cache_pdf.py
+"""
+Caché en memoria de los PDF de órdenes de compra.
+
+La clave es un hash del contenido que se imprime (fila de la orden, sus
+detalles y los datos del proveedor), por lo que una orden modificada nunca
+devuelve un PDF viejo aunque otro proceso no haya recibido la invalidación.
+El tamaño total está acotado y se expulsa primero lo menos usado (LRU).
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+# Se incrementa cuando cambia el diseño del PDF para no servir versiones antiguas
+VERSION_PLANTILLA = 2
+
+
+def huella_orden(orden):
+    """
+    Hash del contenido de la orden. Usa `orden.detalles.all()`, por lo que
+    conviene que la orden venga con `prefetch_related('detalles')`.
+    """
+    proveedor = orden.proveedor
+    contenido = {
+        'plantilla': VERSION_PLANTILLA,
+        'orden': [
+            orden.pk, orden.numero_orden, orden.nro_cotizacion, orden.mercaderia_puesta_en,
+            orden.fecha.isoformat() if orden.fecha else None, orden.empresa, orden.cargo,
+            orden.forma_pago, orden.plazo_entrega, orden.comentarios,
+        ],
+        'detalles': [
+            [d.pk, d.cantidad, d.detalle, str(d.precio_unitario), d.codigo_producto]
+            for d in sorted(orden.detalles.all(), key=lambda d: d.pk)
+        ],
+        'proveedor': [
+            proveedor.pk, proveedor.nombre_proveedor, proveedor.rut,
+            proveedor.domicilio, proveedor.ubicacion,
+        ] if proveedor else None,
+    }
+    data = json.dumps(contenido, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class CachePDF:
+    """LRU acotado por bytes, con índices por orden y proveedor para invalidar."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._datos = OrderedDict()   # clave -> (pdf, orden_id, proveedor_id)
+        self._bytes = 0
+        self._por_orden = {}          # orden_id -> set(claves)
+        self._por_proveedor = {}      # proveedor_id -> set(orden_id)
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            self._datos.move_to_end(clave)
+            return entrada[0]
+
+    def put(self, clave, pdf, orden_id, proveedor_id=None):
+        if len(pdf) > self.max_bytes:
+            return
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                return
+            self._datos[clave] = (pdf, orden_id, proveedor_id)
+            self._bytes += len(pdf)
+            self._por_orden.setdefault(orden_id, set()).add(clave)
+            if proveedor_id is not None:
+                self._por_proveedor.setdefault(proveedor_id, set()).add(orden_id)
+            while self._bytes > self.max_bytes:
+                antigua = next(iter(self._datos))
+                self._quitar(antigua)
+
+    def invalidar_orden(self, orden_id):
+        with self._lock:
+            for clave in list(self._por_orden.get(orden_id, ())):
+                self._quitar(clave)
+
+    def invalidar_proveedor(self, proveedor_id):
+        with self._lock:
+            for orden_id in list(self._por_proveedor.pop(proveedor_id, ())):
+                for clave in list(self._por_orden.get(orden_id, ())):
+                    self._quitar(clave)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self._por_orden.clear()
+            self._por_proveedor.clear()
+            self._bytes = 0
+
+    @property
+    def tamano(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._datos)
+
+    def _quitar(self, clave):
+        pdf, orden_id, proveedor_id = self._datos.pop(clave)
+        self._bytes -= len(pdf)
+        claves = self._por_orden.get(orden_id)
+        if claves is not None:
+            claves.discard(clave)
+            if not claves:
+                del self._por_orden[orden_id]
+                ordenes = self._por_proveedor.get(proveedor_id)
+                if ordenes is not None:
+                    ordenes.discard(orden_id)
+                    if not ordenes:
+                        del self._por_proveedor[proveedor_id]
+
+
+cache_ordenes = CachePDF(settings.OC_PDF_CACHE_MAX_BYTES)
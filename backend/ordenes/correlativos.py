@@ -0,0 +1,39 @@
+# ordenes/correlativos.py
+"""
+Asignación de números correlativos para OCs y solicitudes.
+
+Cada documento (y empresa) tiene una fila en `Correlativo` que se bloquea con
+`select_for_update` mientras se asigna el número, así dos creaciones
+simultáneas nunca obtienen el mismo número y no se recorre la tabla de
+documentos para buscar el máximo.
+"""
+from django.db import transaction
+
+from .models import Correlativo
+
+
+def siguiente_numero(documento, empresa=''):
+    """
+    Reserva y devuelve el siguiente número del correlativo, o None si no hay
+    correlativo configurado para ese documento/empresa. Si se llama dentro de
+    una transacción, el número se libera cuando ésta se revierte.
+    """
+    with transaction.atomic():
+        correlativo = Correlativo.objects.select_for_update().filter(
+            documento=documento, empresa__iexact=(empresa or '').strip()
+        ).first()
+        if correlativo is None:
+            return None
+        numero = max(correlativo.ultimo_numero + 1, correlativo.numero_inicial)
+        omitidos = set(correlativo.numeros_omitidos or [])
+        while numero in omitidos:
+            numero += 1
+        correlativo.ultimo_numero = numero
+        correlativo.save(update_fields=['ultimo_numero'])
+    return numero
+
+
+def empresas_configuradas(documento='orden_compra'):
+    return list(
+        Correlativo.objects.filter(documento=documento).order_by('id').values_list('empresa', flat=True)
+    )
@@ -0,0 +1,103 @@
+# Generated by Django 4.2 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordenes', '0006_ordencompradetalle_cantidad_recibida'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ordencompradetalle',
+            name='codigo_producto',
+            field=models.CharField(blank=True, db_index=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='nro_cotizacion',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True),
+        ),
+        migrations.AlterField(
+            model_name='ordencompradetalle',
+            name='detalle',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='ordenescompras',
+            name='empresa',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='ordenescompras',
+            name='estado',
+            field=models.CharField(db_index=True, default='pendiente', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='ordenescompras',
+            name='fecha',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='ordenescompras',
+            name='nro_cotizacion',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True),
+        ),
+        migrations.AlterField(
+            model_name='ordenescompras',
+            name='numero_orden',
+            field=models.CharField(db_index=True, max_length=20, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='proveedor',
+            name='nombre_proveedor',
+            field=models.CharField(db_index=True, max_length=100, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='proveedor',
+            name='rut',
+            field=models.CharField(db_index=True, max_length=20, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='proveedor',
+            name='ubicacion',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='solicitud',
+            name='estado',
+            field=models.CharField(choices=[('pendiente', 'Pendiente'), ('aprobada', 'Aprobada'), ('rechazada', 'Rechazada')], db_index=True, default='pendiente', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='solicitud',
+            name='fecha_creacion',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='solicitud',
+            name='folio',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True),
+        ),
+        migrations.AlterField(
+            model_name='solicitud',
+            name='nombre_solicitante',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='solicitud',
+            name='numero_solicitud',
+            field=models.CharField(db_index=True, max_length=20, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='solicituddetalle',
+            name='motivo',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='solicituddetalle',
+            name='producto',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordenes', '0007_sincronizar_indices_y_campos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Correlativo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('documento', models.CharField(choices=[('orden_compra', 'Orden de compra'), ('solicitud', 'Solicitud')], max_length=20)),
+                ('empresa', models.CharField(blank=True, default='', max_length=100)),
+                ('numero_inicial', models.PositiveBigIntegerField()),
+                ('ultimo_numero', models.PositiveBigIntegerField(default=0)),
+                ('numeros_omitidos', models.JSONField(blank=True, default=list)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='correlativo',
+            constraint=models.UniqueConstraint(fields=('documento', 'empresa'), name='ordenes_correlativo_documento_empresa_uniq'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2 on 2026-10-18 08:45
+
+from django.db import migrations
+
+# Números iniciales y saltos que antes estaban fijos en los serializers
+CORRELATIVOS = [
+    {'documento': 'orden_compra', 'empresa': 'Inversiones Imperia Spa', 'numero_inicial': 7788, 'numeros_omitidos': [7787]},
+    {'documento': 'orden_compra', 'empresa': 'Maquinarias Imperia SPA', 'numero_inicial': 265, 'numeros_omitidos': []},
+    {'documento': 'solicitud', 'empresa': '', 'numero_inicial': 3400, 'numeros_omitidos': []},
+]
+
+
+def _maximo_numerico(valores):
+    # Los números se guardan como texto; se comparan como enteros ("999" < "1000")
+    numeros = [int(v) for v in valores if v and str(v).strip().isdigit()]
+    return max(numeros) if numeros else 0
+
+
+def cargar_correlativos(apps, schema_editor):
+    Correlativo = apps.get_model('ordenes', 'Correlativo')
+    OrdenesCompras = apps.get_model('ordenes', 'OrdenesCompras')
+    Solicitud = apps.get_model('ordenes', 'Solicitud')
+    for datos in CORRELATIVOS:
+        if datos['documento'] == 'orden_compra':
+            existentes = OrdenesCompras.objects.filter(empresa__iexact=datos['empresa']).values_list('numero_orden', flat=True)
+        else:
+            existentes = Solicitud.objects.values_list('numero_solicitud', flat=True)
+        Correlativo.objects.update_or_create(
+            documento=datos['documento'],
+            empresa=datos['empresa'],
+            defaults={
+                'numero_inicial': datos['numero_inicial'],
+                'numeros_omitidos': datos['numeros_omitidos'],
+                'ultimo_numero': _maximo_numerico(existentes.iterator()),
+            },
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordenes', '0008_correlativo'),
+    ]
+
+    operations = [
+        migrations.RunPython(cargar_correlativos, migrations.RunPython.noop),
+    ]
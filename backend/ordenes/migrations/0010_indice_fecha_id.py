@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 08:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordenes', '0009_cargar_correlativos'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ordenescompras',
+            index=models.Index(fields=['fecha', 'id'], name='oc_fecha_id_idx'),
+        ),
+    ]
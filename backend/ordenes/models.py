@@ -1,8 +1,15 @@
+from datetime import timedelta
 from django.db import models
 from django.conf import settings
-from django.db.models import Sum
+from django.db.models import Sum, Case, When, Value, F
+from django.utils import timezone
 from bodega.models import Producto
 
+# Las OC que siguen en alguno de estos estados después de DIAS_EXPIRACION_OC
+# días pasan a 'inactiva' (ver ordenes.tasks.expirar_ordenes)
+DIAS_EXPIRACION_OC = 30
+ESTADOS_EXPIRABLES = ('pendiente', 'producto pendiente')
+
 class Proveedor(models.Model):
     nombre_proveedor = models.CharField(max_length=100, unique=True, db_index=True)
     rut = models.CharField(max_length=20, unique=True, db_index=True)
@@ -57,25 +64,49 @@ class OrdenesCompras(models.Model):
     comentarios = models.TextField(blank=True, null=True)
     estado = models.CharField(max_length=20, default='pendiente', db_index=True)  # 'pendiente', 'items pendientes', 'completa'
 
+    class Meta:
+        indexes = [
+            # Paginación por cursor (fecha, id)
+            models.Index(fields=['fecha', 'id'], name='oc_fecha_id_idx'),
+        ]
+
     def __str__(self):
         return f"Orden {self.numero_orden} - {self.estado}"
 
-    def actualizar_estado(self):
+    @staticmethod
+    def calcular_estado(detalles):
         all_zero = True
         all_complete = True
-        for detail in self.detalles.all():
+        for detail in detalles:
             if detail.cantidad_recibida > 0:
                 all_zero = False
             if detail.cantidad_recibida < detail.cantidad:
                 all_complete = False
         if all_complete:
-            self.estado = 'completa'
+            return 'completa'
         elif all_zero:
-            self.estado = 'pendiente'
-        else:
-            self.estado = 'items pendientes'
+            return 'pendiente'
+        return 'items pendientes'
+
+    def actualizar_estado(self):
+        self.estado = self.calcular_estado(self.detalles.all())
         self.save()
 
+def limite_expiracion_oc():
+    return timezone.now() - timedelta(days=DIAS_EXPIRACION_OC)
+
+
+def estado_efectivo_oc():
+    """
+    Expresión con el estado que tendría la OC si el barrido de expiración ya
+    se hubiera ejecutado; sirve para anotar listados sin escribir en GET.
+    """
+    return Case(
+        When(fecha__lt=limite_expiracion_oc(), estado__in=ESTADOS_EXPIRABLES, then=Value('inactiva')),
+        default=F('estado'),
+        output_field=models.CharField(),
+    )
+
 class OrdenCompraDetalle(models.Model):
     orden = models.ForeignKey(OrdenesCompras, on_delete=models.CASCADE, related_name="detalles", db_index=True)
     cantidad = models.PositiveIntegerField()
@@ -92,5 +123,35 @@ class OrdenCompraDetalle(models.Model):
     def cantidad_pendiente(self):
         return self.cantidad - self.cantidad_recibida
 
+    def coincide_con_producto(self, producto):
+        # El detalle guarda el código o el nombre del producto como texto libre
+        detalle = self.detalle.lower().strip()
+        return producto.codigo.lower().strip() == detalle or \
+            (producto.nombre or '').lower().strip() == detalle
+
     def __str__(self):
         return f"Detalle de {self.orden.numero_orden}"
+
+class Correlativo(models.Model):
+    """
+    Contador de numeración de documentos (OC por empresa, solicitudes).
+    El número inicial y los números que no deben usarse son datos, no código.
+    """
+    DOCUMENTO_CHOICES = (
+        ('orden_compra', 'Orden de compra'),
+        ('solicitud', 'Solicitud'),
+    )
+    documento = models.CharField(max_length=20, choices=DOCUMENTO_CHOICES)
+    # Nombre de la empresa tal como se muestra; vacío para documentos sin empresa
+    empresa = models.CharField(max_length=100, blank=True, default='')
+    numero_inicial = models.PositiveBigIntegerField()
+    ultimo_numero = models.PositiveBigIntegerField(default=0)
+    numeros_omitidos = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['documento', 'empresa'], name='ordenes_correlativo_documento_empresa_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.documento} {self.empresa} - {self.ultimo_numero}".strip()
@@ -0,0 +1,194 @@
+# ordenes/pdf.py
+"""
+Construcción de los PDF de órdenes de compra y solicitudes.
+Las funciones escriben el documento en `destino` (ruta o archivo binario
+abierto), de modo que sirven tanto para las vistas como para las tareas.
+Importa ReportLab: las vistas lo cargan dentro de la acción que genera el PDF.
+"""
+from decimal import Decimal
+
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+from reportlab.lib.pagesizes import letter
+
+from reportes.estilos import ESTILOS, TABLAS
+from reportes.plantillas import encabezado_orden, firmas, logo, titulo
+
+
+# Helper function para formatear números con separador de miles (punto) y decimal (coma)
+def format_currency(value):
+    # Ejemplo: 1111111.00 -> "1.111.111,00"
+    s = "{:,.2f}".format(value)  # Genera "1,111,111.00"
+    s = s.replace(",", "X").replace(".", ",").replace("X", ".")
+    return s
+
+
+def generar_pdf_solicitud(destino, solicitud):
+    """PDF de una Solicitud, incluyendo el campo "nro_cotizacion"."""
+    detalles = solicitud.detalles.all()
+    detalle_header = ["Item", "Cantidad", "Insumo/Material Solicitado", "Cargo", "Stock Bodega"]
+    if detalles.exists():
+        detalle_data = [detalle_header] + [
+            [
+                str(idx + 1),
+                str(det.cantidad),
+                det.producto,
+                det.motivo,
+                str(det.stock_bodega)
+            ] for idx, det in enumerate(detalles)
+        ]
+    else:
+        detalle_data = [detalle_header, ["-", "-", "-", "-", "-"]]
+
+    doc = SimpleDocTemplate(destino, pagesize=letter)
+    elements = []
+
+    header_data = [[
+        logo(100, 50, 'LEFT'),
+        Paragraph(f"<b style='font-size:18px;'>Folio: {solicitud.folio if solicitud.folio else 'n/a'}</b>", ESTILOS['Normal'])
+    ]]
+    header_table = Table(header_data, colWidths=[150, 350])
+    header_table.setStyle(TABLAS['solicitud_encabezado'])
+    elements.append(header_table)
+    elements.append(Spacer(1, 12))
+
+    # Información de la solicitud, incluyendo N° Cotización
+    info_data = [
+        ["Fecha:", solicitud.fecha_creacion.strftime("%d/%m/%Y")],
+        ["Solicitante:", solicitud.nombre_solicitante],
+        ["Usuario Creador:", solicitud.usuario_creador.username if solicitud.usuario_creador else "n/a"],
+        ["N° Cotización:", solicitud.nro_cotizacion if solicitud.nro_cotizacion else "n/a"]
+    ]
+    info_table = Table(info_data, colWidths=[120, 380])
+    info_table.setStyle(TABLAS['solicitud_info'])
+    elements.append(info_table)
+    elements.append(Spacer(1, 12))
+
+    elements.append(titulo("Solicitud de Compra de Materiales e Insumos"))
+    elements.append(Spacer(1, 12))
+
+    # Generación de la tabla de detalles con separación del código
+    detalle_table = Table(detalle_data, repeatRows=1, colWidths=[50, 80, 200, 100, 80])
+    detalle_table.setStyle(TABLAS['solicitud_detalle'])
+    elements.append(detalle_table)
+    elements.append(Spacer(1, 24))
+
+    elements.append(firmas('solicitud'))
+
+    doc.build(elements)
+
+def generar_pdf_orden(destino, orden):
+    """PDF de una orden de compra con sus detalles y totales."""
+    # Se obtienen los detalles asociados a la orden
+    detalles = orden.detalles.all()
+
+    # Se define el header de la tabla de detalles, incluyendo la columna "Código"
+    detalle_header = ["Cantidad", "Código", "Producto / Detalle", "Precio Unitario", "Total Producto"]
+    detalle_data = [detalle_header]
+
+    # Procesar cada detalle para extraer y separar el código si es necesario
+    if detalles:
+        for detalle in detalles:
+            cantidad = detalle.cantidad
+            # Si no hay 'codigo_producto' y en 'detalle' se encuentra ":", se separa en código y nombre
+            if not detalle.codigo_producto and ":" in detalle.detalle:
+                parts = detalle.detalle.split(":", 1)
+                codigo = parts[0].strip()
+                producto = parts[1].strip()
+            else:
+                codigo = detalle.codigo_producto if detalle.codigo_producto else "-"
+                producto = detalle.detalle
+            precio_unitario = float(detalle.precio_unitario)
+            total_producto = float(detalle.total_item)
+            detalle_data.append([
+                str(cantidad),
+                codigo,
+                producto,
+                f"${format_currency(precio_unitario)}",
+                f"${format_currency(total_producto)}"
+            ])
+    else:
+        detalle_data.append(["-", "-", "No hay detalles", "-", "-"])
+
+    # Cálculo de totales usando Decimal para evitar problemas de precisión
+    total_neto = sum([Decimal(detalle.cantidad) * detalle.precio_unitario for detalle in detalles])
+    iva = total_neto * Decimal('0.19')
+    total_orden = total_neto + iva
+
+    # Crea el documento sobre el destino indicado
+    doc = SimpleDocTemplate(destino, pagesize=letter)
+    elements = []
+
+    # Encabezado fijo: logo y datos de la empresa (ver reportes.plantillas)
+    header_table = encabezado_orden()
+    elements.append(header_table)
+    elements.append(Spacer(1, 12))
+
+
+    # Construcción de la tabla de información de la orden
+    # Se muestra N° Orden, Fecha, N° Cotización, Empresa, Merc. Puesta en, Proveedor, Rut, Domicilio, Folio y Ciudad
+    orden_data = []
+    orden_data.append([
+        "N° Orden:", orden.numero_orden,
+        "Fecha:", orden.fecha.strftime("%d/%m/%Y")
+    ])
+    orden_data.append([
+        "N° Cotización:", orden.nro_cotizacion if orden.nro_cotizacion else "n/a",
+        "Empresa:", orden.empresa
+    ])
+    orden_data.append([
+        "Merc. Puesta en:", orden.mercaderia_puesta_en if orden.mercaderia_puesta_en else "n/a",
+        "Proveedor:", orden.proveedor.nombre_proveedor if orden.proveedor else "n/a"
+    ])
+    orden_data.append([
+        "Rut:", orden.proveedor.rut if orden.proveedor else "n/a",
+        "Domicilio:", orden.proveedor.domicilio if orden.proveedor else "n/a"
+    ])
+    # Nueva fila que muestra "Folio" y "Cargo" en dos columnas
+    orden_data.append([
+        "Folio:", orden.folio if hasattr(orden, 'folio') and orden.folio else "n/a",
+        "Cargo:", orden.cargo if orden.cargo else "n/a"
+    ])
+    # Última fila para mostrar la Ciudad
+    orden_data.append([
+        "Ciudad:", orden.proveedor.ubicacion if orden.proveedor else "n/a",
+        "", ""
+    ])
+
+    header_table_order = Table(orden_data, colWidths=[100, 150, 100, 150])
+    header_table_order.setStyle(TABLAS['orden_info'])
+    elements.append(header_table_order)
+    elements.append(Spacer(1, 12))
+
+    # Tabla de detalles de la orden
+    detalle_table = Table(detalle_data, repeatRows=1)
+    detalle_table.setStyle(TABLAS['orden_detalle'])
+    elements.append(detalle_table)
+    elements.append(Spacer(1, 12))
+
+    # Tabla de totales
+    totales_data = [
+        ["Total Neto:", f"${format_currency(total_neto)}"],
+        ["IVA (19%):", f"${format_currency(iva)}"],
+        ["Total Orden:", f"${format_currency(total_orden)}"],
+    ]
+    totales_table = Table(totales_data, colWidths=[150, 100], hAlign='RIGHT')
+    totales_table.setStyle(TABLAS['orden_totales'])
+    elements.append(totales_table)
+    elements.append(Spacer(1, 12))
+
+    # Tabla de información adicional (Plazo, Forma de pago, Comentarios)
+    additional_data = [
+        ["Plazo de entrega:", orden.plazo_entrega],
+        ["Forma de pago:", orden.forma_pago],
+        ["Comentarios:", orden.comentarios or ""],
+    ]
+    additional_table = Table(additional_data, colWidths=[150, 300], hAlign='LEFT')
+    additional_table.setStyle(TABLAS['orden_adicional'])
+    elements.append(additional_table)
+    elements.append(Spacer(1, 24))
+
+    # Tabla de firmas
+    elements.append(firmas('orden'))
+
+    # Se construye el PDF, se obtiene el contenido y se retorna como respuesta HTTP
+    doc.build(elements)
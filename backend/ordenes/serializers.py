@@ -1,6 +1,7 @@
 from rest_framework import serializers
+from django.db import transaction
 from .models import Proveedor, Solicitud, OrdenesCompras, OrdenCompraDetalle, SolicitudDetalle
-from django.db.models import Max
+from .correlativos import siguiente_numero, empresas_configuradas
 
 class ProveedorSerializer(serializers.ModelSerializer):
     class Meta:
@@ -36,20 +37,22 @@ class SolicitudSerializer(serializers.ModelSerializer):
             'numero_solicitud': {'read_only': True},
         }
 
+    @classmethod
+    def preparar_queryset(cls, queryset):
+        """Carga las relaciones que se serializan para no consultar por cada solicitud."""
+        return queryset.select_related('usuario_creador').prefetch_related('detalles')
+
     def create(self, validated_data):
         detalles_data = validated_data.pop('detalles', [])
-        last_sol = Solicitud.objects.aggregate(max_num=Max('numero_solicitud'))['max_num']
-        if last_sol:
-            try:
-                new_num = int(last_sol) + 1
-            except ValueError:
-                new_num = 3400
-        else:
-            new_num = 3400
-        validated_data['numero_solicitud'] = str(new_num)
-        solicitud = Solicitud.objects.create(**validated_data)
-        for detalle in detalles_data:
-            SolicitudDetalle.objects.create(solicitud=solicitud, **detalle)
+        with transaction.atomic():
+            numero = siguiente_numero('solicitud')
+            if numero is None:
+                raise serializers.ValidationError("No hay correlativo configurado para solicitudes.")
+            validated_data['numero_solicitud'] = str(numero)
+            solicitud = Solicitud.objects.create(**validated_data)
+            SolicitudDetalle.objects.bulk_create([
+                SolicitudDetalle(solicitud=solicitud, **detalle) for detalle in detalles_data
+            ])
         return solicitud
 
 class OrdenCompraDetalleSerializer(serializers.ModelSerializer):
@@ -71,6 +74,8 @@ class OrdenesComprasSerializer(serializers.ModelSerializer):
     )
     proveedor = serializers.StringRelatedField(read_only=True)
     detalles = OrdenCompraDetalleSerializer(many=True, required=False)
+    # Estado considerando la expiración aún no aplicada por el barrido programado
+    estado_efectivo = serializers.SerializerMethodField()
 
     class Meta:
         model = OrdenesCompras
@@ -88,55 +93,42 @@ class OrdenesComprasSerializer(serializers.ModelSerializer):
             'plazo_entrega',
             'comentarios',
             'estado',
+            'estado_efectivo',
             'detalles',
         ]
         extra_kwargs = {
             'numero_orden': {'read_only': True},
         }
 
+    @classmethod
+    def preparar_queryset(cls, queryset):
+        """Carga las relaciones que se serializan para no consultar por cada orden."""
+        return queryset.select_related('proveedor').prefetch_related('detalles')
+
     def create(self, validated_data):
         detalles_data = validated_data.pop('detalles', [])
-        empresa = validated_data.get('empresa', '').strip().lower()
-
-        # Defino correlativos iniciales
-        if empresa == "inversiones imperia spa":
-            last_order = OrdenesCompras.objects.filter(
-                empresa__iexact="Inversiones Imperia Spa"
-            ).aggregate(max_num=Max('numero_orden'))['max_num']
-            start = 7788
-
-        elif empresa == "maquinarias imperia spa":
-            last_order = OrdenesCompras.objects.filter(
-                empresa__iexact="Maquinarias Imperia SPA"
-            ).aggregate(max_num=Max('numero_orden'))['max_num']
-            start = 265
-
-        else:
-            raise serializers.ValidationError(
-                "Empresa inválida. Opciones: 'Inversiones Imperia Spa' o 'Maquinarias Imperia SPA'."
-            )
-
-        if last_order:
-            try:
-                next_num = int(last_order) + 1
-            except (TypeError, ValueError):
-                next_num = start
-        else:
-            next_num = start
-
-        # Salto caso especial
-        if empresa == "inversiones imperia spa" and next_num == 7787:
-            next_num = 7788
-
-        validated_data['numero_orden'] = str(next_num)
-
-        # Creo la OC y sus detalles
-        orden = OrdenesCompras.objects.create(**validated_data)
-        for detalle in detalles_data:
-            det = detalle.copy()
-            if isinstance(det.get('detalle'), dict):
-                det['codigo_producto'] = det['detalle'].get('codigo', '')
-                det['detalle'] = det['detalle'].get('nombre', '')
-            OrdenCompraDetalle.objects.create(orden=orden, **det)
-
-        return orden
\ No newline at end of file
+        empresa = validated_data.get('empresa', '')
+
+        with transaction.atomic():
+            # El correlativo es independiente por empresa
+            numero = siguiente_numero('orden_compra', empresa)
+            if numero is None:
+                opciones = " o ".join(f"'{nombre}'" for nombre in empresas_configuradas('orden_compra'))
+                raise serializers.ValidationError(f"Empresa inválida. Opciones: {opciones}.")
+            validated_data['numero_orden'] = str(numero)
+
+            # Creo la OC y sus detalles
+            orden = OrdenesCompras.objects.create(**validated_data)
+            detalles = []
+            for detalle in detalles_data:
+                det = detalle.copy()
+                if isinstance(det.get('detalle'), dict):
+                    det['codigo_producto'] = det['detalle'].get('codigo', '')
+                    det['detalle'] = det['detalle'].get('nombre', '')
+                detalles.append(OrdenCompraDetalle(orden=orden, **det))
+            OrdenCompraDetalle.objects.bulk_create(detalles)
+
+        return orden
+
+    def get_estado_efectivo(self, obj):
+        return getattr(obj, 'estado_efectivo', obj.estado)
@@ -0,0 +1,20 @@
+# ordenes/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import OrdenesCompras, OrdenCompraDetalle, Proveedor
+from .cache_pdf import cache_ordenes
+
+
+@receiver([post_save, post_delete], sender=OrdenesCompras)
+def invalidar_pdf_orden(sender, instance, **kwargs):
+    cache_ordenes.invalidar_orden(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=OrdenCompraDetalle)
+def invalidar_pdf_detalle(sender, instance, **kwargs):
+    cache_ordenes.invalidar_orden(instance.orden_id)
+
+
+@receiver([post_save, post_delete], sender=Proveedor)
+def invalidar_pdf_proveedor(sender, instance, **kwargs):
+    cache_ordenes.invalidar_proveedor(instance.pk)
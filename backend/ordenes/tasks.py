@@ -0,0 +1,31 @@
+# ordenes/tasks.py
+import logging
+import time
+
+from ordenes.models import OrdenesCompras, ESTADOS_EXPIRABLES, limite_expiracion_oc
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 500
+
+
+def expirar_ordenes(tamano_lote=TAMANO_LOTE):
+    """
+    Marca como 'inactiva' las OC vencidas, por lotes de ids para no tomar
+    un bloqueo largo sobre toda la tabla. Devuelve la cantidad actualizada.
+    """
+    inicio = time.monotonic()
+    limite = limite_expiracion_oc()
+    vencidas = OrdenesCompras.objects.filter(fecha__lt=limite, estado__in=ESTADOS_EXPIRABLES)
+    total = 0
+    ultimo_id = 0
+    while True:
+        ids = list(
+            vencidas.filter(id__gt=ultimo_id).order_by('id').values_list('id', flat=True)[:tamano_lote]
+        )
+        if not ids:
+            break
+        total += vencidas.filter(id__in=ids).update(estado='inactiva')
+        ultimo_id = ids[-1]
+    logger.info(f"expirar_ordenes: {total} OC marcadas como inactivas en {time.monotonic() - inicio:.2f}s")
+    return total
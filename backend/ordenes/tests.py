@@ -1,3 +1,365 @@
-from django.test import TestCase
+import io
+import threading
+import zipfile
+from datetime import timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from pypdf import PdfReader
+
+from SolDega.pagination import _despues_de
+from reportes.servicio import RENDERIZADORES, servicio
+from usuarios.models import Usuario
+from .cache_pdf import cache_ordenes
+from .correlativos import siguiente_numero
+from .models import Correlativo, OrdenesCompras, OrdenCompraDetalle, Proveedor, Solicitud, SolicitudDetalle
+from .tasks import expirar_ordenes
+
+
+class CorrelativoTests(TestCase):
+    def test_numeros_iniciales_configurados(self):
+        self.assertEqual(siguiente_numero('orden_compra', 'Inversiones Imperia Spa'), 7788)
+        self.assertEqual(siguiente_numero('orden_compra', 'maquinarias imperia spa'), 265)
+        self.assertEqual(siguiente_numero('solicitud'), 3400)
+        self.assertEqual(siguiente_numero('solicitud'), 3401)
+
+    def test_empresa_sin_correlativo(self):
+        self.assertIsNone(siguiente_numero('orden_compra', 'Otra Empresa'))
+
+    def test_omite_numeros_configurados(self):
+        Correlativo.objects.filter(documento='solicitud').update(ultimo_numero=3409, numeros_omitidos=[3410, 3411])
+        self.assertEqual(siguiente_numero('solicitud'), 3412)
+
+    def test_orden_numerico_y_no_lexicografico(self):
+        Correlativo.objects.filter(documento='orden_compra', empresa='Maquinarias Imperia SPA').update(ultimo_numero=999)
+        self.assertEqual(siguiente_numero('orden_compra', 'Maquinarias Imperia SPA'), 1000)
+        self.assertEqual(siguiente_numero('orden_compra', 'Maquinarias Imperia SPA'), 1001)
+
+
+class CorrelativoConcurrenciaTests(TransactionTestCase):
+    HILOS = 16
+    NUMEROS_POR_HILO = 25
+
+    def setUp(self):
+        Correlativo.objects.update_or_create(
+            documento='solicitud', empresa='',
+            defaults={'numero_inicial': 3400, 'ultimo_numero': 0, 'numeros_omitidos': []},
+        )
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_hilos_concurrentes_no_repiten_numeros(self):
+        obtenidos = []
+        errores = []
+        lock = threading.Lock()
+        barrera = threading.Barrier(self.HILOS)
+
+        def trabajar():
+            try:
+                barrera.wait()
+                propios = [siguiente_numero('solicitud') for _ in range(self.NUMEROS_POR_HILO)]
+                with lock:
+                    obtenidos.extend(propios)
+            except Exception as e:
+                errores.append(e)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=trabajar) for _ in range(self.HILOS)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        total = self.HILOS * self.NUMEROS_POR_HILO
+        self.assertEqual(sorted(obtenidos), list(range(3400, 3400 + total)))
+
+
+class ExpiracionOrdenesTests(APITestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create(username='bodega')
+        self.client.force_authenticate(self.usuario)
+        proveedor = Proveedor.objects.create(
+            nombre_proveedor='Proveedor', rut='1-9', domicilio='-', ubicacion='-',
+            email='p@example.com', telefono='-'
+        )
+        for numero in range(5):
+            OrdenesCompras.objects.create(
+                numero_orden=str(numero), empresa='Maquinarias Imperia SPA', proveedor=proveedor,
+                cargo='-', forma_pago='-', plazo_entrega='-'
+            )
+        OrdenesCompras.objects.filter(numero_orden__in=['0', '1', '2']).update(
+            fecha=timezone.now() - timedelta(days=40)
+        )
+
+    def test_listado_no_escribe_y_muestra_estado_efectivo(self):
+        response = self.client.get('/api/ordenes/ordenes/')
+        self.assertEqual(response.status_code, 200)
+        efectivos = {o['numero_orden']: o['estado_efectivo'] for o in response.data['results']}
+        self.assertEqual(efectivos['0'], 'inactiva')
+        self.assertEqual(efectivos['4'], 'pendiente')
+        self.assertFalse(OrdenesCompras.objects.filter(estado='inactiva').exists())
+
+    def test_barrido_por_lotes(self):
+        self.assertEqual(expirar_ordenes(tamano_lote=2), 3)
+        self.assertEqual(OrdenesCompras.objects.filter(estado='inactiva').count(), 3)
+        self.assertEqual(expirar_ordenes(), 0)
+
+
+class ConsultasListadoTests(APITestCase):
+    """Los listados deben hacer las mismas consultas con 1 fila que con muchas."""
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create(username='compras')
+        self.client.force_authenticate(self.usuario)
+        self.proveedores = [
+            Proveedor.objects.create(
+                nombre_proveedor=f'Proveedor {i}', rut=f'{i}-9', domicilio='-', ubicacion='-',
+                email=f'p{i}@example.com', telefono='-'
+            )
+            for i in range(3)
+        ]
+
+    def crear_datos(self, cantidad):
+        inicio = OrdenesCompras.objects.count()
+        for i in range(inicio, inicio + cantidad):
+            orden = OrdenesCompras.objects.create(
+                numero_orden=str(i), empresa='Maquinarias Imperia SPA',
+                proveedor=self.proveedores[i % 3], cargo='-', forma_pago='-', plazo_entrega='-'
+            )
+            OrdenCompraDetalle.objects.bulk_create([
+                OrdenCompraDetalle(orden=orden, cantidad=2, detalle='item', precio_unitario=10)
+                for _ in range(3)
+            ])
+            solicitud = Solicitud.objects.create(
+                numero_solicitud=str(i), nombre_solicitante='-', usuario_creador=self.usuario
+            )
+            SolicitudDetalle.objects.create(solicitud=solicitud, producto='item', cantidad=1, motivo='-')
+
+    def consultas(self, url):
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(contexto.captured_queries)
+
+    def assertConsultasConstantes(self, url):
+        self.crear_datos(1)
+        pocas = self.consultas(url)
+        self.crear_datos(15)
+        self.assertEqual(self.consultas(url), pocas)
+
+    def test_listado_ordenes(self):
+        self.assertConsultasConstantes('/api/ordenes/ordenes/')
+
+    def test_ordenes_pendientes(self):
+        self.assertConsultasConstantes('/api/ordenes/ordenes/pendientes/')
+
+    def test_listado_solicitudes(self):
+        self.assertConsultasConstantes('/api/ordenes/solicitudes/')
+
+
+# Los workers del servicio de PDF no ven la base de pruebas en memoria
+@override_settings(PDF_PROCESOS=0)
+class CachePDFOrdenTests(APITestCase):
+    URL = '/api/ordenes/ordenes/reporte/generar_pdf/'
+
+    def setUp(self):
+        self.client.force_authenticate(Usuario.objects.create(username='compras'))
+        self.proveedor = Proveedor.objects.create(
+            nombre_proveedor='Proveedor', rut='1-9', domicilio='-', ubicacion='-',
+            email='p@example.com', telefono='-'
+        )
+        self.orden = OrdenesCompras.objects.create(
+            numero_orden='1', empresa='Maquinarias Imperia SPA', proveedor=self.proveedor,
+            cargo='-', forma_pago='-', plazo_entrega='-'
+        )
+        self.detalle = OrdenCompraDetalle.objects.create(orden=self.orden, cantidad=1, detalle='Item', precio_unitario=100)
+        cache_ordenes.limpiar()
+
+    def pdf(self, etag=None):
+        encabezados = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(self.URL, {'orden_id': self.orden.pk}, **encabezados)
+
+    def test_304_si_el_cliente_tiene_la_version(self):
+        response = self.pdf()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content.startswith(b'%PDF'))
+        etag = response['ETag']
+
+        response = self.pdf(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_cambia_al_editar_detalle_o_proveedor(self):
+        etags = [self.pdf()['ETag']]
+
+        self.detalle.cantidad = 3
+        self.detalle.save()
+        response = self.pdf(etags[-1])
+        self.assertEqual(response.status_code, 200)
+        etags.append(response['ETag'])
+
+        self.proveedor.domicilio = 'Bolivar 202'
+        self.proveedor.save()
+        response = self.pdf(etags[-1])
+        self.assertEqual(response.status_code, 200)
+        etags.append(response['ETag'])
+
+        self.assertEqual(len(set(etags)), 3)
+
+    def test_senales_invalidan_la_cache(self):
+        self.pdf()
+        self.assertEqual(len(cache_ordenes), 1)
+        self.detalle.save()
+        self.assertEqual(len(cache_ordenes), 0)
+
+        self.pdf()
+        self.proveedor.save()
+        self.assertEqual(len(cache_ordenes), 0)
+
+        self.pdf()
+        self.orden.comentarios = 'Urgente'
+        self.orden.save()
+        self.assertEqual(len(cache_ordenes), 0)
+
+
+class PaginacionCursorTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(Usuario.objects.create(username='compras'))
+        proveedor = Proveedor.objects.create(
+            nombre_proveedor='Proveedor', rut='1-9', domicilio='-', ubicacion='-',
+            email='p@example.com', telefono='-'
+        )
+        self.ordenes = [
+            OrdenesCompras.objects.create(
+                numero_orden=str(i), empresa='Maquinarias Imperia SPA', proveedor=proveedor,
+                cargo='-', forma_pago='-', plazo_entrega='-'
+            )
+            for i in range(5)
+        ]
+
+    def recorrer(self, parametros):
+        ids = []
+        response = self.client.get('/api/ordenes/ordenes/', parametros)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [orden['id'] for orden in response.data['results']]
+            if not response.data['next']:
+                return ids, response
+            response = self.client.get(response.data['next'])
+
+    def test_orden_y_empates_en_fecha(self):
+        ahora = timezone.now()
+        # Tres órdenes con la misma fecha: el id desempata y ninguna se repite ni se pierde
+        OrdenesCompras.objects.filter(pk__in=[o.pk for o in self.ordenes[1:4]]).update(fecha=ahora)
+        OrdenesCompras.objects.filter(pk=self.ordenes[0].pk).update(fecha=ahora + timedelta(days=1))
+        OrdenesCompras.objects.filter(pk=self.ordenes[4].pk).update(fecha=ahora - timedelta(days=1))
+
+        ids, _ = self.recorrer({'page_size': 2})
+        o = [orden.pk for orden in self.ordenes]
+        self.assertEqual(ids, [o[0], o[3], o[2], o[1], o[4]])
+
+        # previous vuelve a la página anterior
+        primera = self.client.get('/api/ordenes/ordenes/', {'page_size': 2})
+        segunda = self.client.get(primera.data['next'])
+        anterior = self.client.get(segunda.data['previous'])
+        self.assertEqual([r['id'] for r in anterior.data['results']], [o[0], o[3]])
+
+    def test_total_opcional(self):
+        response = self.client.get('/api/ordenes/ordenes/', {'page_size': 2})
+        self.assertNotIn('count', response.data)
+        _, ultima = self.recorrer({'page_size': 2, 'count': 'exacto'})
+        self.assertEqual(ultima.data['count'], 5)
+
+    def test_orden_ascendente_y_cursor_invalido(self):
+        ids, _ = self.recorrer({'page_size': 2, 'ordering': 'fecha'})
+        self.assertEqual(ids, [orden.pk for orden in self.ordenes])
+        response = self.client.get('/api/ordenes/ordenes/', {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cota_de_indice_sobre_la_fecha(self):
+        # Sin la cota AND sobre fecha, PostgreSQL no usa el índice (fecha, id) como rango
+        fecha = self.ordenes[2].fecha
+        for orden, cota in ((['-fecha', '-id'], '<='), (['fecha', 'id'], '>=')):
+            sql = str(OrdenesCompras.objects.filter(_despues_de(orden, [fecha, 3])).query)
+            self.assertRegex(sql, rf'"fecha" {cota} [^()]+ AND \(')
+
+
+class ExportacionLoteTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(Usuario.objects.create(username='contabilidad'))
+        proveedor = Proveedor.objects.create(
+            nombre_proveedor='Proveedor', rut='1-9', domicilio='-', ubicacion='-',
+            email='p@example.com', telefono='-'
+        )
+        for numero, empresa in (('10', 'Maquinarias Imperia SPA'), ('11', 'Maquinarias Imperia SPA'), ('12', 'Otra')):
+            orden = OrdenesCompras.objects.create(
+                numero_orden=numero, empresa=empresa, proveedor=proveedor,
+                cargo='-', forma_pago='-', plazo_entrega='-'
+            )
+            OrdenCompraDetalle.objects.create(orden=orden, cantidad=1, detalle=f'Item {numero}', precio_unitario=100)
+        self.hoy = timezone.localdate().isoformat()
+
+    @classmethod
+    def tearDownClass(cls):
+        servicio.descartar(esperar=True)
+        super().tearDownClass()
+
+    def lote(self, **parametros):
+        return self.client.get('/api/ordenes/ordenes/reporte/lote/', {'desde': self.hoy, 'hasta': self.hoy, **parametros})
+
+    def test_zip_en_pool_de_procesos(self):
+        response = self.lote(empresa='Maquinarias Imperia SPA')
+        self.assertEqual(response.status_code, 200)
+        archivo = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(archivo.namelist(), ['OC10.pdf', 'OC11.pdf'])
+        self.assertTrue(archivo.read('OC10.pdf').startswith(b'%PDF'))
+
+    @override_settings(PDF_PROCESOS=0)
+    def test_pdf_unido(self):
+        response = self.lote(formato='pdf')
+        self.assertEqual(response.status_code, 200)
+        lector = PdfReader(io.BytesIO(b''.join(response.streaming_content)), strict=True)
+        self.assertEqual(len(lector.pages), 3)
+        self.assertIn('Item 12', lector.pages[2].extract_text())
+
+    def fallar_oc11(self):
+        def renderizar(destino, orden):
+            if orden.numero_orden == '11':
+                raise RuntimeError("render fallido")
+            renderizar_orden(destino, orden)
+
+        renderizar_orden = RENDERIZADORES['orden']
+        return patch.dict(RENDERIZADORES, {'orden': renderizar})
+
+    @override_settings(PDF_PROCESOS=0)
+    def test_documento_fallido_en_zip(self):
+        with self.fallar_oc11():
+            response = self.lote()
+            archivo = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(archivo.namelist(), ['OC10.pdf', 'OC12.pdf', 'errores.txt'])
+        self.assertIn('OC11.pdf', archivo.read('errores.txt').decode())
+
+    @override_settings(PDF_PROCESOS=0)
+    def test_documento_fallido_en_pdf_unido(self):
+        with self.fallar_oc11():
+            response = self.lote(formato='pdf')
+            lector = PdfReader(io.BytesIO(b''.join(response.streaming_content)), strict=True)
+        # La página de error queda en el lugar del documento que falló
+        self.assertEqual(len(lector.pages), 3)
+        self.assertIn('Item 10', lector.pages[0].extract_text())
+        self.assertIn('No se pudo generar OC11.pdf', lector.pages[1].extract_text())
+        self.assertIn('Item 12', lector.pages[2].extract_text())
+
+    def test_parametros(self):
+        self.assertEqual(self.lote(formato='rar').status_code, 400)
+        self.assertEqual(self.client.get('/api/ordenes/ordenes/reporte/lote/').status_code, 400)
+        self.assertEqual(self.lote(estado='completa').status_code, 404)
+        with self.settings(PDF_LOTE_MAXIMO=2):
+            self.assertEqual(self.lote().status_code, 400)
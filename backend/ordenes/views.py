@@ -1,37 +1,25 @@
-import io
-from datetime import datetime, timedelta
-from decimal import Decimal
-from rest_framework import filters
+from datetime import datetime
+
+from django.conf import settings
 from rest_framework import filters
 from django_filters.rest_framework import DjangoFilterBackend
-from django.contrib.staticfiles import finders
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet , ParagraphStyle
-
 
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_LEFT
-
-from ordenes.models import OrdenesCompras, OrdenCompraDetalle, Solicitud, Proveedor
+from SolDega.pagination import FechaCursorPagination
+from ordenes.models import OrdenesCompras, OrdenCompraDetalle, Solicitud, Proveedor, estado_efectivo_oc
+from reportes.lotes import FORMATOS as FORMATOS_LOTE, respuesta_lote
+from reportes.servicio import generar_instancia
+from .cache_pdf import cache_ordenes, huella_orden
 from .serializers import (
     ProveedorSerializer,
     SolicitudSerializer,
     OrdenesComprasSerializer,
     OrdenCompraDetalleSerializer,
 )
-from django.db.models import Max
-
-# Helper function para formatear números con separador de miles (punto) y decimal (coma)
-def format_currency(value):
-    # Ejemplo: 1111111.00 -> "1.111.111,00"
-    s = "{:,.2f}".format(value)  # Genera "1,111,111.00"
-    s = s.replace(",", "X").replace(".", ",").replace("X", ".")
-    return s
 
 class ProveedorViewSet(viewsets.ModelViewSet):
     queryset = Proveedor.objects.all()
@@ -45,6 +33,9 @@ class SolicitudViewSet(viewsets.ModelViewSet):
     queryset = Solicitud.objects.all().order_by('-fecha_creacion')
     serializer_class = SolicitudSerializer
 
+    def get_queryset(self):
+        return SolicitudSerializer.preparar_queryset(super().get_queryset())
+
     def perform_create(self, serializer):
         serializer.save(usuario_creador=self.request.user)
 
@@ -66,10 +57,43 @@ class SolicitudViewSet(viewsets.ModelViewSet):
         solicitud.save()
         return Response({"status": "Solicitud rechazada"})
 
+def _parametros_lote(request, queryset, campo_fecha):
+    """
+    Filtra `queryset` con los parámetros de una exportación en lote:
+      - desde / hasta: fechas YYYY-MM-DD (inclusivas, requeridas)
+      - estado (opcional)
+      - formato: 'zip' (por defecto) o 'pdf' (un solo PDF unido)
+    Devuelve (queryset, formato) o una Response de error.
+    """
+    try:
+        desde = datetime.strptime(request.query_params.get('desde', ''), '%Y-%m-%d').date()
+        hasta = datetime.strptime(request.query_params.get('hasta', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return Response({"error": "Se requieren desde y hasta con formato YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+    formato = request.query_params.get('formato', 'zip')
+    if formato not in FORMATOS_LOTE:
+        return Response({"error": "formato debe ser 'zip' o 'pdf'"}, status=status.HTTP_400_BAD_REQUEST)
+
+    queryset = queryset.filter(**{f'{campo_fecha}__date__gte': desde, f'{campo_fecha}__date__lte': hasta})
+    estado = request.query_params.get('estado')
+    if estado:
+        queryset = queryset.filter(estado=estado)
+    cantidad = queryset.count()
+    if cantidad == 0:
+        return Response({"error": "No hay documentos para los filtros indicados"}, status=status.HTTP_404_NOT_FOUND)
+    if cantidad > settings.PDF_LOTE_MAXIMO:
+        return Response(
+            {"error": f"El lote tiene {cantidad} documentos; el máximo es {settings.PDF_LOTE_MAXIMO}. Acote las fechas."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return queryset.order_by(campo_fecha, 'id'), formato
+
+
 class SolicitudPDFView(viewsets.ViewSet):
     """
     Endpoint para generar el PDF de una Solicitud.
     Se ha añadido la visualización del campo "nro_cotizacion".
+    Los PDF se renderizan en reportes.servicio (503 si está saturado).
     """
     @action(detail=False, methods=['get'])
     def generar_pdf(self, request):
@@ -77,110 +101,41 @@ class SolicitudPDFView(viewsets.ViewSet):
         if not solicitud_id:
             return Response({"error": "Se requiere solicitud_id"}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            solicitud = Solicitud.objects.get(id=solicitud_id)
-        except Solicitud.DoesNotExist:
+            solicitud = Solicitud.objects.select_related('usuario_creador').prefetch_related('detalles').get(id=solicitud_id)
+        except (Solicitud.DoesNotExist, ValueError):
             return Response({"error": "Solicitud no encontrada"}, status=status.HTTP_404_NOT_FOUND)
-        
-        detalles = solicitud.detalles.all()
-        detalle_header = ["Item", "Cantidad", "Insumo/Material Solicitado", "Cargo", "Stock Bodega"]
-        if detalles.exists():
-            detalle_data = [detalle_header] + [
-                [
-                    str(idx + 1),
-                    str(det.cantidad),
-                    det.producto,
-                    det.motivo,
-                    str(det.stock_bodega)
-                ] for idx, det in enumerate(detalles)
-            ]
-        else:
-            detalle_data = [detalle_header, ["-", "-", "-", "-", "-"]]
-        
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        elements = []
-
-        logo_path = finders.find("images/logo.png")
-        logo_element = None
-        if logo_path:
-            try:
-                logo_element = Image(logo_path, width=100, height=50)
-                logo_element.hAlign = 'LEFT'
-            except Exception as e:
-                print("Error cargando el logo:", e)
-        header_data = [[
-            logo_element if logo_element else "",
-            Paragraph(f"<b style='font-size:18px;'>Folio: {solicitud.folio if solicitud.folio else 'n/a'}</b>", styles['Normal'])
-        ]]
-        header_table = Table(header_data, colWidths=[150, 350])
-        header_table.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('ALIGN', (1,0), (1,0), 'RIGHT'),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 12),
-        ]))
-        elements.append(header_table)
-        elements.append(Spacer(1, 12))
-        
-        # Información de la solicitud, incluyendo N° Cotización
-        info_data = [
-            ["Fecha:", solicitud.fecha_creacion.strftime("%d/%m/%Y")],
-            ["Solicitante:", solicitud.nombre_solicitante],
-            ["Usuario Creador:", solicitud.usuario_creador.username if solicitud.usuario_creador else "n/a"],
-            ["N° Cotización:", solicitud.nro_cotizacion if solicitud.nro_cotizacion else "n/a"]
-        ]
-        info_table = Table(info_data, colWidths=[120, 380])
-        info_table.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (0,-1), colors.lightgrey),
-            ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-        ]))
-        elements.append(info_table)
-        elements.append(Spacer(1, 12))
-        
-        elements.append(Paragraph("Solicitud de Compra de Materiales e Insumos", styles['Title']))
-        elements.append(Spacer(1, 12))
-        
-        # Generación de la tabla de detalles con separación del código
-        detalle_table = Table(detalle_data, repeatRows=1, colWidths=[50, 80, 200, 100, 80])
-        detalle_table.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.darkgray),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-            ('GRID', (0,0), (-1,-1), 0.5, colors.black),
-            ('FONTSIZE', (0,0), (-1,0), 10),
-            ('FONTSIZE', (0,1), (-1,-1), 9),
-        ]))
-        elements.append(detalle_table)
-        elements.append(Spacer(1, 24))
-
-        firmas_data = [
-            ["Firma Solicitante", "Firma Bodeguero", "Firma Jefe de Area", "Firma Gerente Faena"],
-            ["________________", "________________", "________________", "________________"],
-        ]
-        firmas_table = Table(firmas_data, colWidths=[120, 120, 120, 120], hAlign='CENTER')
-        firmas_table.setStyle(TableStyle([
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-            ('FONTSIZE', (0,0), (-1,0), 10),
-            ('FONTSIZE', (0,1), (-1,1), 10),
-            ('TOPPADDING', (0,1), (-1,1), 12),
-        ]))
-        elements.append(firmas_table)
 
-        doc.build(elements)
-        pdf = buffer.getvalue()
-        buffer.close()
+        pdf = generar_instancia('solicitud', solicitud)
         response = HttpResponse(content_type='application/pdf')
         response['Content-Disposition'] = 'attachment; filename="solicitud.pdf"'
         response.write(pdf)
         return response
 
+    @action(detail=False, methods=['get'])
+    def lote(self, request):
+        """PDF de todas las solicitudes del período en un ZIP o un PDF unido (ver _parametros_lote)."""
+        parametros = _parametros_lote(
+            request,
+            Solicitud.objects.select_related('usuario_creador').prefetch_related('detalles'),
+            'fecha_creacion',
+        )
+        if isinstance(parametros, Response):
+            return parametros
+        queryset, formato = parametros
+        return respuesta_lote(
+            'solicitud', queryset, 'solicitudes', formato,
+            nombre_archivo=lambda solicitud: f"solicitud_{solicitud.numero_solicitud}.pdf",
+            fecha=lambda solicitud: solicitud.fecha_creacion,
+        )
+
 class OrdenesComprasViewSet(viewsets.ModelViewSet):
     ...
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['numero_orden', 'estado']  # asegúrate que 'usuario' esté en el modelo o relación
     filterset_fields = ['fecha']  # o más si deseas
-    ordering_fields = ['fecha']
-    ordering = ['-fecha']
+    ordering_fields = ['fecha', 'id']
+    ordering = ['-fecha', '-id']
+    pagination_class = FechaCursorPagination
     """
     ViewSet para gestionar las órdenes de compra.
     Se asigna el correlativo de forma independiente según la empresa.
@@ -190,24 +145,27 @@ class OrdenesComprasViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], url_path='pendientes')
     def pendientes(self, request):
-        pendientes_oc = self.get_queryset().filter(estado__in=['pendiente', 'items pendientes'])
-        serializer = self.get_serializer(pendientes_oc, many=True)
-        return Response(serializer.data)
+        pendientes_oc = self.filter_queryset(self.get_queryset()).filter(estado__in=['pendiente', 'items pendientes'])
+        page = self.paginate_queryset(pendientes_oc)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
-    def list(self, request, *args, **kwargs):
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        orders_to_update = self.get_queryset().filter(
-            fecha__lt=thirty_days_ago,
-            estado__in=['pendiente', 'producto pendiente']
-        )
-        orders_to_update.update(estado='inactiva')
-        return super().list(request, *args, **kwargs)
+    def get_queryset(self):
+        # La expiración la hace la tarea ordenes.tasks.expirar_ordenes; aquí solo se calcula
+        queryset = super().get_queryset().annotate(estado_efectivo=estado_efectivo_oc())
+        return OrdenesComprasSerializer.preparar_queryset(queryset)
 
 class OrdenCompraDetalleViewSet(viewsets.ModelViewSet):
     queryset = OrdenCompraDetalle.objects.all()
     serializer_class = OrdenCompraDetalleSerializer
 
-class OrdenesPDFView(viewsets.ViewSet): 
+class OrdenesPDFView(viewsets.ViewSet):
+    """
+    Endpoint para generar el PDF de una orden de compra.
+    El PDF se guarda en caché por el hash de su contenido, que también se
+    envía como ETag; si el cliente ya lo tiene se responde 304 sin renderizar.
+    Los PDF se renderizan en reportes.servicio (503 si está saturado).
+    """
     @action(detail=False, methods=['get'])
     def generar_pdf(self, request):
         # Se obtiene el parámetro 'orden_id' de la query string
@@ -215,194 +173,45 @@ class OrdenesPDFView(viewsets.ViewSet):
         if not orden_id:
             return Response({"error": "Se requiere orden_id"}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            orden = OrdenesCompras.objects.get(id=orden_id)
-        except OrdenesCompras.DoesNotExist:
+            orden = OrdenesCompras.objects.select_related('proveedor').prefetch_related('detalles').get(id=orden_id)
+        except (OrdenesCompras.DoesNotExist, ValueError):
             return Response({"error": "Orden no encontrada"}, status=status.HTTP_404_NOT_FOUND)
-        
-        # Se obtienen los detalles asociados a la orden
-        detalles = orden.detalles.all()
-
-        # Se define el header de la tabla de detalles, incluyendo la columna "Código"
-        detalle_header = ["Cantidad", "Código", "Producto / Detalle", "Precio Unitario", "Total Producto"]
-        detalle_data = [detalle_header]
-
-        # Procesar cada detalle para extraer y separar el código si es necesario
-        if detalles:
-            for detalle in detalles:
-                cantidad = detalle.cantidad
-                # Si no hay 'codigo_producto' y en 'detalle' se encuentra ":", se separa en código y nombre
-                if not detalle.codigo_producto and ":" in detalle.detalle:
-                    parts = detalle.detalle.split(":", 1)
-                    codigo = parts[0].strip()
-                    producto = parts[1].strip()
-                else:
-                    codigo = detalle.codigo_producto if detalle.codigo_producto else "-"
-                    producto = detalle.detalle
-                precio_unitario = float(detalle.precio_unitario)
-                total_producto = float(detalle.total_item)
-                detalle_data.append([
-                    str(cantidad),
-                    codigo,
-                    producto,
-                    f"${format_currency(precio_unitario)}",
-                    f"${format_currency(total_producto)}"
-                ])
-        else:
-            detalle_data.append(["-", "-", "No hay detalles", "-", "-"])
-
-        # Cálculo de totales usando Decimal para evitar problemas de precisión
-        total_neto = sum([Decimal(detalle.cantidad) * detalle.precio_unitario for detalle in detalles])
-        iva = total_neto * Decimal('0.19')
-        total_orden = total_neto + iva
-
-        # Inicializa el buffer para el PDF y crea el documento
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        elements = []
-
-               # Cargar el logo
-        logo_path = finders.find("images/logo.png")
-        logo_element = None
-        if logo_path:
-            try:
-                logo_element = Image(logo_path, width=100, height=50)
-                logo_element.hAlign = 'CENTER'
-            except Exception as e:
-                print("Error cargando el logo:", e)
-        else:
-            print("Logo no encontrado en static/images/logo.png")
-
-        # Crear el texto de la dirección (uno abajo del otro)
-        styles = getSampleStyleSheet()
-        address_text = "52.001.387-3<br/>Bolivar #202<br/>Edificio Finanzas<br/>Oficina #511"
-        address_para = Paragraph(address_text, styles["Normal"])
-
-        # Crear una tabla de encabezado de dos columnas: 
-        # la primera con el logo y la segunda con la dirección
-        header_data = [[
-            logo_element if logo_element else "",
-            address_para
-        ]]
-        # Define los anchos de columna según lo que necesites, por ejemplo 200 y 300
-        header_table = Table(header_data, colWidths=[200, 300])
-        header_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (0, 0), (0, 0), 'CENTER'),
-            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ]))
-        elements.append(header_table)
-        elements.append(Spacer(1, 12))
-
 
-        # Construcción de la tabla de información de la orden
-        # Se muestra N° Orden, Fecha, N° Cotización, Empresa, Merc. Puesta en, Proveedor, Rut, Domicilio, Folio y Ciudad
-        orden_data = []
-        orden_data.append([
-            "N° Orden:", orden.numero_orden,
-            "Fecha:", orden.fecha.strftime("%d/%m/%Y")
-        ])
-        orden_data.append([
-            "N° Cotización:", orden.nro_cotizacion if orden.nro_cotizacion else "n/a",
-            "Empresa:", orden.empresa
-        ])
-        orden_data.append([
-            "Merc. Puesta en:", orden.mercaderia_puesta_en if orden.mercaderia_puesta_en else "n/a",
-            "Proveedor:", orden.proveedor.nombre_proveedor if orden.proveedor else "n/a"
-        ])
-        orden_data.append([
-            "Rut:", orden.proveedor.rut if orden.proveedor else "n/a",
-            "Domicilio:", orden.proveedor.domicilio if orden.proveedor else "n/a"
-        ])
-        # Nueva fila que muestra "Folio" y "Cargo" en dos columnas
-        orden_data.append([
-            "Folio:", orden.folio if hasattr(orden, 'folio') and orden.folio else "n/a",
-            "Cargo:", orden.cargo if orden.cargo else "n/a"
-        ])
-        # Última fila para mostrar la Ciudad
-        orden_data.append([
-            "Ciudad:", orden.proveedor.ubicacion if orden.proveedor else "n/a",
-            "", ""
-        ])
+        clave = huella_orden(orden)
+        etag = quote_etag(clave)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
 
-        header_table_order = Table(orden_data, colWidths=[100, 150, 100, 150])
-        header_style = TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            # Se aplican fondos a las etiquetas para mayor claridad
-            ('BACKGROUND', (0, 0), (0, 0), colors.whitesmoke),
-            ('BACKGROUND', (0, 1), (0, 1), colors.whitesmoke),
-            ('BACKGROUND', (0, 2), (0, 2), colors.whitesmoke),
-            ('BACKGROUND', (0, 3), (0, 3), colors.whitesmoke),
-            ('BACKGROUND', (0, 4), (0, 4), colors.whitesmoke),
-            ('BACKGROUND', (2, 0), (2, 0), colors.whitesmoke),
-            ('BACKGROUND', (2, 1), (2, 1), colors.whitesmoke),
-            ('BACKGROUND', (2, 2), (2, 2), colors.whitesmoke),
-            ('BACKGROUND', (2, 3), (2, 3), colors.whitesmoke),
-        ])
-        header_table_order.setStyle(header_style)
-        elements.append(header_table_order)
-        elements.append(Spacer(1, 12))
-
-        # Tabla de detalles de la orden
-        detalle_table = Table(detalle_data, repeatRows=1)
-        detalle_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ]))
-        elements.append(detalle_table)
-        elements.append(Spacer(1, 12))
-
-        # Tabla de totales
-        totales_data = [
-            ["Total Neto:", f"${format_currency(total_neto)}"],
-            ["IVA (19%):", f"${format_currency(iva)}"],
-            ["Total Orden:", f"${format_currency(total_orden)}"],
-        ]
-        totales_table = Table(totales_data, colWidths=[150, 100], hAlign='RIGHT')
-        totales_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ]))
-        elements.append(totales_table)
-        elements.append(Spacer(1, 12))
-
-        # Tabla de información adicional (Plazo, Forma de pago, Comentarios)
-        additional_data = [
-            ["Plazo de entrega:", orden.plazo_entrega],
-            ["Forma de pago:", orden.forma_pago],
-            ["Comentarios:", orden.comentarios or ""],
-        ]
-        additional_table = Table(additional_data, colWidths=[150, 300], hAlign='LEFT')
-        additional_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
-        elements.append(additional_table)
-        elements.append(Spacer(1, 24))
-
-        # Tabla de firmas
-        firmas_data = [
-            ["Jefe Faena", "Solicitante", "Contabilidad"],
-            ["________________________", "________________________", "________________________"],
-        ]
-        firmas_table = Table(firmas_data, colWidths=[150, 150, 150], hAlign='CENTER')
-        firmas_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('FONTSIZE', (0, 1), (-1, 1), 10),
-            ('TOPPADDING', (0, 1), (-1, 1), 12),
-        ]))
-        elements.append(firmas_table)
-
-        # Se construye el PDF, se obtiene el contenido y se retorna como respuesta HTTP
-        doc.build(elements)
-        pdf = buffer.getvalue()
-        buffer.close()
+        pdf = cache_ordenes.get(clave)
+        if pdf is None:
+            # Se dibuja la misma instancia con que se calculó la clave
+            pdf = generar_instancia('orden', orden)
+            cache_ordenes.put(clave, pdf, orden.pk, orden.proveedor_id)
 
         response = HttpResponse(pdf, content_type='application/pdf')
         response['Content-Disposition'] = f'attachment; filename="OC{orden.numero_orden}.pdf"'
-        return response
\ No newline at end of file
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def lote(self, request):
+        """
+        PDF de todas las órdenes del período en un ZIP o un PDF unido.
+        Además de los parámetros de _parametros_lote acepta empresa.
+        """
+        queryset = OrdenesCompras.objects.select_related('proveedor').prefetch_related('detalles')
+        empresa = request.query_params.get('empresa')
+        if empresa:
+            queryset = queryset.filter(empresa=empresa)
+        parametros = _parametros_lote(request, queryset, 'fecha')
+        if isinstance(parametros, Response):
+            return parametros
+        queryset, formato = parametros
+        return respuesta_lote(
+            'orden', queryset, 'ordenes_compra', formato,
+            nombre_archivo=lambda orden: f"OC{orden.numero_orden}.pdf",
+            fecha=lambda orden: orden.fecha,
+        )
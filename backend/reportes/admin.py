@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import ReportJob
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'tipo', 'estado', 'usuario', 'fecha_creacion', 'fecha_finalizacion')
+    list_filter = ('tipo', 'estado', 'fecha_creacion')
+    search_fields = ('clave', 'nombre_archivo', 'usuario__username')
+    readonly_fields = ('clave', 'parametros', 'error')
+    list_per_page = 25
@@ -0,0 +1,128 @@
+# reportes/documentos.py
+"""
+Registro de los documentos PDF que se pueden generar en segundo plano.
+Cada tipo sabe normalizar sus parámetros y renderizarse sobre un archivo.
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from django.utils import timezone
+from rest_framework import serializers
+
+
+def _fecha(parametros, nombre):
+    valor = parametros.get(nombre)
+    if not valor:
+        raise serializers.ValidationError({nombre: "Este parámetro es requerido."})
+    try:
+        return datetime.strptime(str(valor), '%Y-%m-%d').date()
+    except ValueError:
+        raise serializers.ValidationError({nombre: "Formato de fecha inválido. Use YYYY-MM-DD"})
+
+
+def _entero(parametros, nombre):
+    try:
+        return int(parametros.get(nombre))
+    except (TypeError, ValueError):
+        raise serializers.ValidationError({nombre: "Se requiere un id numérico."})
+
+
+def _normalizar_movimientos(parametros):
+    tipo = parametros.get('tipo', 'entrada')
+    if tipo not in ('entrada', 'salida'):
+        raise serializers.ValidationError({'tipo': "Use 'entrada' o 'salida'."})
+    start = _fecha(parametros, 'start_date')
+    end = _fecha(parametros, 'end_date')
+    consignacion = str(parametros.get('consignacion', '')).lower() == 'true'
+    return {
+        'tipo': tipo,
+        'start_date': start.isoformat(),
+        'end_date': end.isoformat(),
+        'consignacion': consignacion,
+    }
+
+
+def _renderizar_movimientos(destino, parametros):
+    from movimientos.pdf import generar_reporte_movimientos
+    generar_reporte_movimientos(
+        destino,
+        parametros['tipo'],
+        datetime.strptime(parametros['start_date'], '%Y-%m-%d').date(),
+        datetime.strptime(parametros['end_date'], '%Y-%m-%d').date(),
+        parametros['consignacion'],
+    )
+    return 'informe_movimiento.pdf'
+
+
+def _movimientos_cerrado(parametros):
+    # Un rango que termina antes de hoy ya no recibe movimientos nuevos
+    return parametros['end_date'] < timezone.localdate().isoformat()
+
+
+def _nunca(parametros):
+    return False
+
+
+def _normalizar_orden(parametros):
+    from ordenes.models import OrdenesCompras
+    orden_id = _entero(parametros, 'orden_id')
+    if not OrdenesCompras.objects.filter(pk=orden_id).exists():
+        raise serializers.ValidationError({'orden_id': "Orden no encontrada"})
+    return {'orden_id': orden_id}
+
+
+def _renderizar_orden(destino, parametros):
+    from ordenes.models import OrdenesCompras
+    from ordenes.pdf import generar_pdf_orden
+    orden = OrdenesCompras.objects.select_related('proveedor').get(pk=parametros['orden_id'])
+    generar_pdf_orden(destino, orden)
+    return f"OC{orden.numero_orden}.pdf"
+
+
+def _normalizar_solicitud(parametros):
+    from ordenes.models import Solicitud
+    solicitud_id = _entero(parametros, 'solicitud_id')
+    if not Solicitud.objects.filter(pk=solicitud_id).exists():
+        raise serializers.ValidationError({'solicitud_id': "Solicitud no encontrada"})
+    return {'solicitud_id': solicitud_id}
+
+
+def _renderizar_solicitud(destino, parametros):
+    from ordenes.models import Solicitud
+    from ordenes.pdf import generar_pdf_solicitud
+    solicitud = Solicitud.objects.select_related('usuario_creador').get(pk=parametros['solicitud_id'])
+    generar_pdf_solicitud(destino, solicitud)
+    return 'solicitud.pdf'
+
+
+# tipo -> (normalizar parámetros, renderizar sobre un archivo, ¿el contenido ya no cambia?)
+# Las OC y solicitudes se pueden editar, así que un PDF terminado nunca se da por definitivo.
+DOCUMENTOS = {
+    'movimientos': (_normalizar_movimientos, _renderizar_movimientos, _movimientos_cerrado),
+    'orden': (_normalizar_orden, _renderizar_orden, _nunca),
+    'solicitud': (_normalizar_solicitud, _renderizar_solicitud, _nunca),
+}
+
+
+def normalizar(tipo, parametros):
+    if parametros is None:
+        parametros = {}
+    if not isinstance(parametros, dict):
+        raise serializers.ValidationError({'parametros': "Debe ser un objeto JSON con los parámetros del documento."})
+    return DOCUMENTOS[tipo][0](parametros)
+
+
+def renderizar(tipo, parametros, destino):
+    """Escribe el documento en `destino` y devuelve el nombre de archivo sugerido."""
+    return DOCUMENTOS[tipo][1](destino, parametros)
+
+
+def cerrado(tipo, parametros):
+    """True si un documento ya generado con estos parámetros sigue vigente aunque pase el tiempo."""
+    return DOCUMENTOS[tipo][2](parametros)
+
+
+def calcular_clave(tipo, parametros):
+    contenido = json.dumps({'tipo': tipo, 'parametros': parametros}, sort_keys=True)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
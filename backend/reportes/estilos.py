@@ -0,0 +1,95 @@
+# reportes/estilos.py
+"""
+Registro de estilos compartidos por los PDF.
+
+Este módulo importa ReportLab, por eso solo lo importan los módulos de
+renderizado (movimientos.pdf, ordenes.pdf, reportes.plantillas), que a su
+vez las vistas y tareas cargan recién al generar un documento. Los estilos
+se construyen una vez por proceso al importar el módulo; ningún PDF vuelve a
+crear la hoja de estilos ni sus TableStyle.
+"""
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import TableStyle
+
+ESTILOS = getSampleStyleSheet()
+
+# Estilo de párrafo para permitir que el texto se ajuste (wrap) en la celda
+ESTILO_AJUSTE = ParagraphStyle(
+    name='Wrap',
+    fontSize=10,
+    leading=12,
+    wordWrap='CJK'
+)
+
+_FONDO_ETIQUETAS_ORDEN = [
+    ('BACKGROUND', (columna, fila), (columna, fila), colors.whitesmoke)
+    for columna, filas in ((0, range(5)), (2, range(4)))
+    for fila in filas
+]
+
+TABLAS = {
+    'movimientos': TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.gray),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.orange),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0,0), (-1,0), 12),
+        ('GRID', (0,0), (-1,-1), 1, colors.black),
+    ]),
+    'solicitud_encabezado': TableStyle([
+        ('VALIGN', (0,0), (-1,-1), 'TOP'),
+        ('ALIGN', (1,0), (1,0), 'RIGHT'),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 12),
+    ]),
+    'solicitud_info': TableStyle([
+        ('BACKGROUND', (0,0), (0,-1), colors.lightgrey),
+        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+    ]),
+    'solicitud_detalle': TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.darkgray),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('GRID', (0,0), (-1,-1), 0.5, colors.black),
+        ('FONTSIZE', (0,0), (-1,0), 10),
+        ('FONTSIZE', (0,1), (-1,-1), 9),
+    ]),
+    'solicitud_firmas': TableStyle([
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('FONTSIZE', (0,0), (-1,0), 10),
+        ('FONTSIZE', (0,1), (-1,1), 10),
+        ('TOPPADDING', (0,1), (-1,1), 12),
+    ]),
+    'orden_encabezado': TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (0, 0), (0, 0), 'CENTER'),
+        ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ]),
+    'orden_info': TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        # Se aplican fondos a las etiquetas para mayor claridad
+        *_FONDO_ETIQUETAS_ORDEN,
+    ]),
+    'orden_detalle': TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ]),
+    'orden_totales': TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ]),
+    'orden_adicional': TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]),
+    'orden_firmas': TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('FONTSIZE', (0, 1), (-1, 1), 10),
+        ('TOPPADDING', (0, 1), (-1, 1), 12),
+    ]),
+}
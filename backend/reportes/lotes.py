@@ -0,0 +1,253 @@
+# reportes/lotes.py
+"""
+Exportación de muchos PDF en una sola descarga (ZIP o un PDF unido).
+
+Los documentos se renderizan en paralelo en un pool de procesos y la
+respuesta se arma en el orden del queryset a medida que van terminando:
+  - ZIP: zipfile escribe sobre un destino sin seek (usa descriptores de
+    datos), así cada entrada sale apenas su PDF está listo.
+  - PDF unido: PDFUnido copia los objetos de cada documento con números
+    nuevos y los emite enseguida; el catálogo, el árbol de páginas y la
+    tabla xref se escriben al final.
+Un documento que no se pudo generar no se omite en silencio: el ZIP agrega
+errores.txt y el PDF unido una página que lo nombra, en su lugar.
+El proceso web lee los documentos de la base por tandas y envía a los
+workers de reportes.servicio las instancias ya cargadas (con sus
+relaciones), así los workers no abren conexiones a la base. Cada lote tiene a
+lo sumo EN_VUELO_POR_PROCESO renders pendientes por proceso, de modo que la
+memoria no crece con el tamaño del lote y queda lugar en la cola del
+servicio para los PDF individuales.
+"""
+import io
+import logging
+import zipfile
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .servicio import ServicioSaturado, esperar, renderizar_instancia, servicio
+
+logger = logging.getLogger(__name__)
+
+FORMATOS = {
+    'zip': 'application/zip',
+    'pdf': 'application/pdf',
+}
+
+# Documentos que lee cada viaje a la base de datos
+TAMANO_TANDA = 50
+EN_VUELO_POR_PROCESO = 2
+
+
+def renderizados(tipo, queryset):
+    """
+    Genera (instancia, pdf o None si falló) en el orden del queryset. El
+    queryset debe traer con select_related/prefetch_related todo lo que usa
+    el renderizador.
+    """
+    documentos = queryset.iterator(chunk_size=TAMANO_TANDA)
+    if settings.PDF_PROCESOS == 0:
+        for documento in documentos:
+            yield documento, _resultado(documento, lambda: renderizar_instancia(tipo, documento))
+        return
+
+    limite = settings.PDF_PROCESOS * EN_VUELO_POR_PROCESO
+    pendientes = deque()
+    try:
+        for documento in documentos:
+            # La descarga ya empezó: si la cola del servicio está llena se espera lugar
+            futuro = servicio.enviar(renderizar_instancia, tipo, documento, esperar=True)
+            pendientes.append((documento, futuro))
+            if len(pendientes) >= limite:
+                documento, futuro = pendientes.popleft()
+                yield documento, _resultado(documento, lambda: esperar(futuro))
+        while pendientes:
+            documento, futuro = pendientes.popleft()
+            yield documento, _resultado(documento, lambda: esperar(futuro))
+    finally:
+        # Si el cliente corta la descarga no se siguen renderizando los pendientes
+        for _, futuro in pendientes:
+            futuro.cancel()
+
+
+def _resultado(documento, obtener):
+    try:
+        return obtener()
+    except BrokenProcessPool:
+        raise
+    except Exception:
+        logger.exception(f"No se pudo generar el PDF de {documento!r}")
+        return None
+
+
+class _Tubo:
+    """Destino sin seek para zipfile: guarda lo escrito hasta que se vacía."""
+    def __init__(self):
+        self._partes = []
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes = []
+        return datos
+
+
+def contenido_zip(documentos, nombre_archivo, fecha):
+    """`documentos` es un iterable de (instancia, pdf o None)."""
+    tubo = _Tubo()
+    errores = []
+    with zipfile.ZipFile(tubo, 'w', compression=zipfile.ZIP_DEFLATED) as archivo:
+        for documento, pdf in documentos:
+            if pdf is None:
+                errores.append(nombre_archivo(documento))
+                continue
+            fecha_documento = timezone.localtime(fecha(documento))
+            archivo.writestr(zipfile.ZipInfo(nombre_archivo(documento), fecha_documento.timetuple()[:6]), pdf)
+            yield tubo.vaciar()
+        if errores:
+            archivo.writestr('errores.txt', "No se pudieron generar:\n" + "\n".join(errores) + "\n")
+    yield tubo.vaciar()
+
+
+class PDFUnido:
+    """
+    Une varios PDF en uno emitiendo bytes a medida que se agregan. El objeto
+    1 es el catálogo y el 2 el árbol de páginas; ambos se escriben en
+    `cerrar`, junto con la tabla xref, porque recién ahí se conocen todas
+    las páginas.
+    """
+    def __init__(self):
+        self._posicion = 0
+        self._desplazamientos = {}
+        self._siguiente = 3
+        self._paginas = []
+
+    def _emitir(self, datos):
+        self._posicion += len(datos)
+        return datos
+
+    def _objeto(self, numero, objeto):
+        salida = io.BytesIO()
+        salida.write(f"{numero} 0 obj\n".encode())
+        objeto.write_to_stream(salida)
+        salida.write(b"\nendobj\n")
+        self._desplazamientos[numero] = self._posicion
+        return self._emitir(salida.getvalue())
+
+    def iniciar(self):
+        return self._emitir(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    def agregar(self, pdf):
+        """Devuelve los bytes con los objetos de `pdf` renumerados."""
+        from pypdf import PdfReader
+        from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject
+
+        lector = PdfReader(io.BytesIO(pdf))
+        raiz = lector.trailer.raw_get('/Root')
+        arbol = raiz.get_object().raw_get('/Pages')
+        # El catálogo y el árbol de páginas de cada documento se reemplazan por los propios
+        numeros = {(raiz.idnum, raiz.generation): 1, (arbol.idnum, arbol.generation): 2}
+        pendientes = []
+
+        def renumerar(objeto):
+            if isinstance(objeto, IndirectObject):
+                clave = (objeto.idnum, objeto.generation)
+                if clave not in numeros:
+                    numeros[clave] = self._siguiente
+                    self._siguiente += 1
+                    pendientes.append(objeto)
+                return IndirectObject(numeros[clave], 0, None)
+            # El lector se descarta después, así que los objetos se reescriben en el lugar
+            if isinstance(objeto, DictionaryObject):
+                for clave in list(objeto.keys()):
+                    objeto[clave] = renumerar(objeto.raw_get(clave))
+            elif isinstance(objeto, ArrayObject):
+                for indice, valor in enumerate(objeto):
+                    objeto[indice] = renumerar(valor)
+            return objeto
+
+        # pypdf ya copió en cada página los atributos heredados del árbol (MediaBox, Resources)
+        for pagina in lector.pages:
+            self._paginas.append(renumerar(pagina.indirect_reference).idnum)
+        partes = []
+        while pendientes:
+            referencia = pendientes.pop()
+            numero = numeros[(referencia.idnum, referencia.generation)]
+            partes.append(self._objeto(numero, renumerar(referencia.get_object())))
+        return b''.join(partes)
+
+    def cerrar(self):
+        from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject
+
+        partes = [
+            self._objeto(1, DictionaryObject({
+                NameObject('/Type'): NameObject('/Catalog'),
+                NameObject('/Pages'): IndirectObject(2, 0, None),
+            })),
+            self._objeto(2, DictionaryObject({
+                NameObject('/Type'): NameObject('/Pages'),
+                NameObject('/Kids'): ArrayObject(IndirectObject(numero, 0, None) for numero in self._paginas),
+                NameObject('/Count'): NumberObject(len(self._paginas)),
+            })),
+        ]
+        inicio_xref = self._posicion
+        lineas = [f"xref\n0 {self._siguiente}\n", "0000000000 65535 f \n"]
+        lineas += [f"{self._desplazamientos[numero]:010d} 00000 n \n" for numero in range(1, self._siguiente)]
+        lineas.append(f"trailer\n<< /Size {self._siguiente} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n")
+        partes.append(self._emitir(''.join(lineas).encode()))
+        return b''.join(partes)
+
+
+def pagina_error(nombre):
+    """PDF de una página que reemplaza en el PDF unido a un documento que falló."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    destino = io.BytesIO()
+    hoja = canvas.Canvas(destino, pagesize=letter)
+    _, alto = letter
+    hoja.setFont('Helvetica-Bold', 14)
+    hoja.drawString(72, alto - 72, f"No se pudo generar {nombre}")
+    hoja.setFont('Helvetica', 10)
+    hoja.drawString(72, alto - 92, "Descárguelo individualmente o intente nuevamente en unos minutos.")
+    hoja.showPage()
+    hoja.save()
+    return destino.getvalue()
+
+
+def contenido_pdf(documentos, nombre_archivo):
+    """`documentos` es un iterable de (instancia, pdf o None)."""
+    unido = PDFUnido()
+    yield unido.iniciar()
+    for documento, pdf in documentos:
+        yield unido.agregar(pdf if pdf is not None else pagina_error(nombre_archivo(documento)))
+    yield unido.cerrar()
+
+
+def respuesta_lote(tipo, queryset, nombre, formato, nombre_archivo, fecha):
+    """
+    StreamingHttpResponse con los PDF de `queryset`. `nombre_archivo(instancia)`
+    y `fecha(instancia)` dan el nombre y la fecha de cada entrada del ZIP
+    (el nombre también identifica en el PDF unido a los que fallaron).
+    Si el servicio de renderizado está saturado lanza ServicioSaturado (503)
+    antes de empezar la descarga.
+    """
+    if servicio.saturado():
+        raise ServicioSaturado()
+    documentos = renderizados(tipo, queryset)
+    if formato == 'zip':
+        contenido = contenido_zip(documentos, nombre_archivo, fecha)
+    else:
+        contenido = contenido_pdf(documentos, nombre_archivo)
+    response = StreamingHttpResponse(contenido, content_type=FORMATOS[formato])
+    response['Content-Disposition'] = f'attachment; filename="{nombre}.{formato}"'
+    return response
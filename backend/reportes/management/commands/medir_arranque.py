@@ -0,0 +1,121 @@
+# reportes/management/commands/medir_arranque.py
+"""
+Mide el tiempo de arranque de un proceso del proyecto (django.setup() más la
+importación de ROOT_URLCONF, lo mismo que paga cada worker) y lo reparte por
+aplicación con `python -X importtime`.
+
+Cada módulo se atribuye a la aplicación más cercana que lo importó por
+primera vez, así una librería pesada aparece en la aplicación que la carga
+(p. ej. ReportLab en ordenes antes de separar ordenes.pdf). Cada medición
+corre en un proceso nuevo; se informa la mediana de las repeticiones.
+
+Uso:
+    python manage.py medir_arranque
+    python manage.py medir_arranque --repeticiones 5 --salida arranque.json
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+OTROS = '(django y librerías)'
+
+_PROGRAMA = (
+    "import sys, time\n"
+    "inicio = time.perf_counter()\n"
+    "import django\n"
+    "django.setup()\n"
+    "from django.conf import settings\n"
+    "__import__(settings.ROOT_URLCONF)\n"
+    "print(time.perf_counter() - inicio)\n"
+    "print(int('reportlab' in sys.modules))\n"
+)
+
+_LINEA = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$')
+
+
+def _aplicaciones():
+    """Paquetes propios del proyecto: las apps locales y el paquete de configuración."""
+    raiz = str(settings.BASE_DIR)
+    nombres = {settings.ROOT_URLCONF.split('.')[0]}
+    for app in settings.INSTALLED_APPS:
+        paquete = app.split('.')[0]
+        if os.path.isdir(os.path.join(raiz, paquete)):
+            nombres.add(paquete)
+    return nombres
+
+
+def _repartir(lineas, aplicaciones):
+    """{aplicación: segundos} a partir de la salida de -X importtime."""
+    tiempos = {}
+    pila = []
+    # importtime escribe cada módulo después de sus dependencias; al recorrer
+    # al revés cada módulo aparece antes que los que importó
+    for linea in reversed(lineas):
+        coincidencia = _LINEA.match(linea)
+        if not coincidencia:
+            continue
+        propio, _, sangria, modulo = coincidencia.groups()
+        nivel = len(sangria) // 2
+        del pila[nivel:]
+        pila.append(modulo.split('.')[0])
+        duena = next((paquete for paquete in reversed(pila) if paquete in aplicaciones), OTROS)
+        tiempos[duena] = tiempos.get(duena, 0) + int(propio) / 1_000_000
+    return tiempos
+
+
+class Command(BaseCommand):
+    help = "Mide el tiempo de importación por aplicación al iniciar un proceso"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=3, help="Procesos a medir (se usa la mediana)")
+        parser.add_argument('--salida', help="Guarda el resultado en este archivo JSON")
+        parser.add_argument('--json', action='store_true', help="Escribe el resultado como JSON")
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] < 1:
+            raise CommandError("--repeticiones debe ser al menos 1")
+        aplicaciones = _aplicaciones()
+        entorno = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'SolDega.settings')}
+
+        totales, por_aplicacion, reportlab = [], {}, False
+        for _ in range(options['repeticiones']):
+            proceso = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', _PROGRAMA],
+                cwd=str(settings.BASE_DIR), env=entorno, capture_output=True, text=True,
+            )
+            if proceso.returncode != 0:
+                raise CommandError(f"El proceso de medición falló:\n{proceso.stderr[-2000:]}")
+            total, cargado = proceso.stdout.split()[-2:]
+            totales.append(float(total))
+            reportlab = reportlab or cargado == '1'
+            for app, segundos in _repartir(proceso.stderr.splitlines(), aplicaciones).items():
+                por_aplicacion.setdefault(app, []).append(segundos)
+
+        medianas = {
+            app: statistics.median(valores + [0] * (len(totales) - len(valores)))
+            for app, valores in por_aplicacion.items()
+        }
+        resultado = {
+            'total_segundos': round(statistics.median(totales), 4),
+            'reportlab_cargado': reportlab,
+            'aplicaciones': {app: round(medianas[app], 4) for app in sorted(medianas, key=medianas.get, reverse=True)},
+        }
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultado, ensure_ascii=False))
+            return
+        for app, segundos in resultado['aplicaciones'].items():
+            self.stdout.write(f"{app:<30} {segundos * 1000:9.1f} ms")
+        self.stdout.write(self.style.SUCCESS(
+            f"Arranque: {resultado['total_segundos'] * 1000:.1f} ms (mediana de {len(totales)}); "
+            f"ReportLab cargado: {'sí' if reportlab else 'no'}"
+        ))
@@ -0,0 +1,70 @@
+# reportes/management/commands/medir_pdf.py
+"""
+Micro-benchmark del renderizado de un PDF registrado en reportes.documentos.
+
+Mide el primer render con las plantillas vacías (frío: construye logo,
+encabezados y firmas) y luego `--repeticiones` renders reutilizándolas
+(caliente). Con --frio vacía las plantillas antes de cada render, que es lo
+que pagaba cada documento antes de reportes.plantillas.
+
+Uso:
+    python manage.py medir_pdf orden orden_id=12
+    python manage.py medir_pdf solicitud solicitud_id=3 --repeticiones 50
+    python manage.py medir_pdf movimientos tipo=salida start_date=2025-01-01 end_date=2025-01-31
+"""
+import io
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import serializers
+
+from reportes import documentos
+
+
+class Command(BaseCommand):
+    help = "Mide la latencia de renderizado de un PDF en frío y reutilizando las plantillas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('tipo', choices=sorted(documentos.DOCUMENTOS))
+        parser.add_argument('parametros', nargs='*', help="Parámetros del documento como clave=valor")
+        parser.add_argument('--repeticiones', type=int, default=20)
+        parser.add_argument('--frio', action='store_true', help="Vacía las plantillas antes de cada render")
+
+    def handle(self, *args, **options):
+        from reportes import plantillas
+
+        if options['repeticiones'] < 1:
+            raise CommandError("--repeticiones debe ser al menos 1")
+        try:
+            parametros = dict(parametro.split('=', 1) for parametro in options['parametros'])
+        except ValueError:
+            raise CommandError("Los parámetros deben tener la forma clave=valor")
+        try:
+            parametros = documentos.normalizar(options['tipo'], parametros)
+        except serializers.ValidationError as e:
+            raise CommandError(f"Parámetros inválidos: {e.detail}")
+
+        def medir():
+            destino = io.BytesIO()
+            inicio = time.perf_counter()
+            documentos.renderizar(options['tipo'], parametros, destino)
+            return (time.perf_counter() - inicio) * 1000, destino.tell()
+
+        plantillas.limpiar()
+        primero, tamano = medir()
+        tiempos = []
+        for _ in range(options['repeticiones']):
+            if options['frio']:
+                plantillas.limpiar()
+            tiempos.append(medir()[0])
+        tiempos.sort()
+
+        modo = 'frío' if options['frio'] else 'caliente'
+        self.stdout.write(f"Documento: {options['tipo']} ({tamano / 1024:.1f} KB)")
+        self.stdout.write(f"Primer render (frío): {primero:.1f} ms")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(tiempos)} renders ({modo}): mediana {statistics.median(tiempos):.1f} ms, "
+            f"p95 {tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))]:.1f} ms, "
+            f"mínimo {tiempos[0]:.1f} ms"
+        ))
@@ -0,0 +1,43 @@
+# reportes/models.py
+from django.db import models
+from django.conf import settings
+
+
+class ReportJob(models.Model):
+    """
+    Generación diferida de un PDF. El render se ejecuta en el cluster de
+    django_q y el archivo resultante queda en el almacenamiento local.
+    """
+    TIPO_CHOICES = (
+        ('movimientos', 'Informe de movimientos'),
+        ('orden', 'Orden de compra'),
+        ('solicitud', 'Solicitud'),
+    )
+    ESTADO_CHOICES = (
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('completado', 'Completado'),
+        ('error', 'Error'),
+    )
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES, db_index=True)
+    # Parámetros normalizados del documento (fechas, ids, filtros)
+    parametros = models.JSONField(default=dict)
+    # Hash de tipo + parámetros; trabajos con la misma clave se reutilizan
+    clave = models.CharField(max_length=64, db_index=True)
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente', db_index=True)
+    archivo = models.FileField(upload_to='reportes/%Y/%m/', blank=True, null=True)
+    nombre_archivo = models.CharField(max_length=100, blank=True)
+    error = models.TextField(blank=True, null=True)
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='reportes')
+    fecha_creacion = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Cuándo empezó el render; un trabajo 'procesando' más viejo que REPORTES_TIMEOUT murió con su worker
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_finalizacion = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['clave', 'estado'], name='reportes_clave_estado_idx'),
+        ]
+
+    def __str__(self):
+        return f"Reporte {self.tipo} #{self.pk} - {self.estado}"
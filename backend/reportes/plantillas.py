@@ -0,0 +1,116 @@
+# reportes/plantillas.py
+"""
+Bloques que se repiten en los PDF: logo, encabezado de la OC, firmas y
+títulos.
+
+El logo original (static/images/logo.png) mide 7937x3969 px y se dibuja a
+100x50 pt; incrustarlo tal cual obligaba a ReportLab a decodificar,
+comprimir y codificar unos 30 millones de píxeles en cada documento. Aquí
+se reduce una sola vez por proceso a RESOLUCION_LOGO_DPI del tamaño en que
+se dibuja.
+
+Cada bloque se construye la primera vez que se pide y después se entrega una
+copia superficial por documento: la copia comparte celdas, estilos e imagen
+ya decodificada, y el cálculo de tamaños de cada documento queda en la copia.
+`limpiar` descarta todo lo construido (el benchmark medir_pdf la usa para
+medir en frío).
+"""
+import copy
+import functools
+import io
+import logging
+
+from django.contrib.staticfiles import finders
+from PIL import Image as ImagenPIL
+from reportlab.platypus import Image, Paragraph, Table
+
+from .estilos import ESTILOS, TABLAS
+
+logger = logging.getLogger(__name__)
+
+RUTA_LOGO = "images/logo.png"
+# Resolución con que se incrusta el logo respecto del tamaño en que se dibuja
+RESOLUCION_LOGO_DPI = 300
+
+DIRECCION_EMPRESA = "52.001.387-3<br/>Bolivar #202<br/>Edificio Finanzas<br/>Oficina #511"
+
+# documento -> (títulos, línea de firma, ancho de columna, estilo de TABLAS)
+FIRMAS = {
+    'orden': (["Jefe Faena", "Solicitante", "Contabilidad"], "________________________", 150, 'orden_firmas'),
+    'solicitud': (
+        ["Firma Solicitante", "Firma Bodeguero", "Firma Jefe de Area", "Firma Gerente Faena"],
+        "________________", 120, 'solicitud_firmas',
+    ),
+}
+
+_CONSTRUIDOS = []
+
+
+def _bloque(constructor):
+    """Construye el bloque una vez por argumentos y entrega una copia en cada llamada."""
+    construir = functools.lru_cache(maxsize=None)(constructor)
+    _CONSTRUIDOS.append(construir)
+
+    @functools.wraps(constructor)
+    def bloque(*args):
+        return copy.copy(construir(*args))
+    return bloque
+
+
+@functools.lru_cache(maxsize=None)
+def _png_logo(width, height):
+    """PNG del logo reducido para dibujarse en `width` x `height` puntos, o None si no está."""
+    ruta = finders.find(RUTA_LOGO)
+    if not ruta:
+        logger.warning(f"Logo no encontrado en static/{RUTA_LOGO}")
+        return None
+    limite = (round(width * RESOLUCION_LOGO_DPI / 72), round(height * RESOLUCION_LOGO_DPI / 72))
+    try:
+        with ImagenPIL.open(ruta) as imagen:
+            imagen.thumbnail(limite, ImagenPIL.LANCZOS)
+            salida = io.BytesIO()
+            imagen.save(salida, format='PNG', optimize=True)
+    except Exception as e:
+        logger.warning(f"Error cargando el logo: {e}")
+        return None
+    return salida.getvalue()
+
+
+_CONSTRUIDOS.append(_png_logo)
+
+
+@_bloque
+def logo(width, height, alineacion):
+    """Flowable con el logo o '' si no está disponible."""
+    datos = _png_logo(width, height)
+    if datos is None:
+        return ""
+    imagen = Image(io.BytesIO(datos), width=width, height=height)
+    imagen.hAlign = alineacion
+    return imagen
+
+
+@_bloque
+def encabezado_orden():
+    """Logo y datos de la empresa en dos columnas, igual en todas las OC."""
+    tabla = Table([[logo(100, 50, 'CENTER'), Paragraph(DIRECCION_EMPRESA, ESTILOS['Normal'])]], colWidths=[200, 300])
+    tabla.setStyle(TABLAS['orden_encabezado'])
+    return tabla
+
+
+@_bloque
+def firmas(documento):
+    titulos, linea, ancho, estilo = FIRMAS[documento]
+    tabla = Table([titulos, [linea] * len(titulos)], colWidths=[ancho] * len(titulos), hAlign='CENTER')
+    tabla.setStyle(TABLAS[estilo])
+    return tabla
+
+
+@_bloque
+def titulo(texto):
+    return Paragraph(texto, ESTILOS['Title'])
+
+
+def limpiar():
+    for construir in _CONSTRUIDOS:
+        construir.cache_clear()
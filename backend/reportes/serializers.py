@@ -0,0 +1,40 @@
+# reportes/serializers.py
+from rest_framework import serializers
+from .models import ReportJob
+from . import documentos
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    usuario = serializers.StringRelatedField(read_only=True)
+    descarga = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id',
+            'tipo',
+            'parametros',
+            'estado',
+            'error',
+            'nombre_archivo',
+            'usuario',
+            'fecha_creacion',
+            'fecha_inicio',
+            'fecha_finalizacion',
+            'descarga',
+        ]
+        read_only_fields = [
+            'estado', 'error', 'nombre_archivo', 'fecha_creacion', 'fecha_inicio', 'fecha_finalizacion',
+        ]
+
+    def validate(self, attrs):
+        attrs['parametros'] = documentos.normalizar(attrs['tipo'], attrs.get('parametros'))
+        attrs['clave'] = documentos.calcular_clave(attrs['tipo'], attrs['parametros'])
+        return attrs
+
+    def get_descarga(self, obj):
+        if obj.estado != 'completado':
+            return None
+        request = self.context.get('request')
+        path = f"/api/reportes/{obj.pk}/descargar/"
+        return request.build_absolute_uri(path) if request else path
@@ -0,0 +1,243 @@
+# reportes/servicio.py
+"""
+Servicio de renderizado de PDF en un pool de procesos.
+
+ReportLab es CPU puro y retiene el GIL mientras dibuja, así que un
+`doc.build` grande dentro del proceso web frena todas las demás peticiones
+que atiende. Las vistas mandan a un worker del pool lo que hay que dibujar
+y el proceso web solo espera el resultado:
+  - `generar_instancia`: una OC o solicitud ya leída por la vista, con sus
+    relaciones; el worker dibuja exactamente esos datos (los mismos con que
+    la vista calculó el ETag) sin volver a la base.
+  - `generar` / `generar_archivo`: una EspecificacionPDF (tipo y parámetros
+    normalizados de reportes.documentos, serializable con pickle) que el
+    worker resuelve leyendo la base; la usa el informe de movimientos, que
+    recorre las filas por tandas.
+
+La cantidad de trabajos pendientes (en cola o dibujándose) está acotada por
+PDF_COLA_MAXIMA: si se alcanza, `enviar` lanza ServicioSaturado y DRF
+responde 503 con Retry-After de inmediato, en vez de acumular peticiones
+esperando. Ninguna petición espera un PDF más de PDF_TIMEOUT segundos (cola
+más render): al vencer se responde 503 (TiempoAgotado). Un render que ya
+empezó no se puede interrumpir, así que su worker sigue ocupado hasta que
+termina. Con PDF_PROCESOS = 0 todo se dibuja en el mismo proceso.
+
+Los workers se crean con spawn (no heredan hilos ni conexiones del proceso
+web) y abren su propia conexión a la base al leer los datos del documento.
+"""
+import io
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as EsperaAgotada
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+# Segundos que se sugiere esperar al cliente cuando el servicio está saturado
+REINTENTAR_EN = 5
+
+
+class ServicioSaturado(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Hay demasiados documentos generándose; intente nuevamente en unos segundos."
+    default_code = 'servicio_saturado'
+    # DRF lo envía como encabezado Retry-After
+    wait = REINTENTAR_EN
+
+
+class TiempoAgotado(ServicioSaturado):
+    default_detail = "El documento tardó demasiado en generarse; intente nuevamente en unos segundos."
+    default_code = 'tiempo_agotado'
+
+
+@dataclass(frozen=True)
+class EspecificacionPDF:
+    """Documento a dibujar: `tipo` es una clave de reportes.documentos.DOCUMENTOS."""
+    tipo: str
+    parametros: dict = field(default_factory=dict)
+
+    @classmethod
+    def crear(cls, tipo, parametros):
+        """Valida y normaliza los parámetros (lanza ValidationError si no sirven)."""
+        from . import documentos
+        return cls(tipo, documentos.normalizar(tipo, parametros))
+
+
+def _iniciar_worker():
+    import django
+    django.setup()
+
+
+def _renderizar_orden(destino, orden):
+    from ordenes.pdf import generar_pdf_orden
+    generar_pdf_orden(destino, orden)
+
+
+def _renderizar_solicitud(destino, solicitud):
+    from ordenes.pdf import generar_pdf_solicitud
+    generar_pdf_solicitud(destino, solicitud)
+
+
+# tipo -> renderizador de una instancia con sus relaciones ya cargadas
+RENDERIZADORES = {
+    'orden': _renderizar_orden,
+    'solicitud': _renderizar_solicitud,
+}
+
+
+def renderizar_instancia(tipo, instancia):
+    """Se ejecuta en el worker: devuelve los bytes del PDF de `instancia`."""
+    destino = io.BytesIO()
+    RENDERIZADORES[tipo](destino, instancia)
+    return destino.getvalue()
+
+
+def _renderizar(especificacion, destino):
+    from django.db import close_old_connections
+    from . import documentos
+
+    try:
+        return documentos.renderizar(especificacion.tipo, especificacion.parametros, destino)
+    finally:
+        # El worker vive mucho; respeta CONN_MAX_AGE como lo haría una petición
+        close_old_connections()
+
+
+def renderizar_bytes(especificacion):
+    """Se ejecuta en el worker. Devuelve (pdf, nombre de archivo sugerido)."""
+    destino = io.BytesIO()
+    nombre = _renderizar(especificacion, destino)
+    return destino.getvalue(), nombre
+
+
+def renderizar_archivo(especificacion):
+    """
+    Se ejecuta en el worker. Escribe el PDF en un archivo temporal y devuelve
+    (ruta, nombre de archivo sugerido); así los informes grandes no viajan
+    por el pipe del pool.
+    """
+    descriptor, ruta = tempfile.mkstemp(suffix='.pdf')
+    try:
+        with os.fdopen(descriptor, 'wb') as destino:
+            nombre = _renderizar(especificacion, destino)
+    except BaseException:
+        os.unlink(ruta)
+        raise
+    return ruta, nombre
+
+
+class _Servicio:
+    def __init__(self):
+        self._candado = threading.Condition()
+        self._pool = None
+        self._pendientes = 0
+
+    def _ejecutor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_PROCESOS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_iniciar_worker,
+            )
+        return self._pool
+
+    def _terminado(self, futuro):
+        with self._candado:
+            self._pendientes -= 1
+            self._candado.notify()
+        if not futuro.cancelled() and isinstance(futuro.exception(), BrokenProcessPool):
+            logger.error("Un worker de PDF terminó inesperadamente; se recrea el pool")
+            self.descartar()
+
+    def saturado(self):
+        return settings.PDF_PROCESOS > 0 and self._pendientes >= settings.PDF_COLA_MAXIMA
+
+    def enviar(self, funcion, *args, esperar=False):
+        """
+        Ejecuta `funcion(*args)` en el pool y devuelve un Future. Si la cola
+        está llena lanza ServicioSaturado, o con `esperar` bloquea hasta que
+        haya lugar. `funcion` y los argumentos deben poder serializarse con pickle.
+        """
+        if settings.PDF_PROCESOS == 0:
+            futuro = Future()
+            try:
+                futuro.set_result(funcion(*args))
+            except Exception as e:
+                futuro.set_exception(e)
+            return futuro
+
+        with self._candado:
+            while self.saturado():
+                if not esperar:
+                    raise ServicioSaturado()
+                self._candado.wait()
+            futuro = self._ejecutor().submit(funcion, *args)
+            self._pendientes += 1
+        futuro.add_done_callback(self._terminado)
+        return futuro
+
+    def descartar(self, esperar=False):
+        """Cierra el pool; el próximo envío crea uno nuevo (se usa si un worker murió)."""
+        with self._candado:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=esperar, cancel_futures=True)
+
+
+servicio = _Servicio()
+
+
+def esperar(futuro, al_abandonar=None):
+    """
+    Resultado de `futuro`, o TiempoAgotado si no llega en PDF_TIMEOUT segundos.
+    Si el render ya había empezado, `al_abandonar(futuro)` se llama cuando
+    termine (para liberar lo que haya producido).
+    """
+    try:
+        return futuro.result(timeout=settings.PDF_TIMEOUT)
+    except EsperaAgotada:
+        if not futuro.cancel():
+            logger.error(f"Un PDF superó PDF_TIMEOUT ({settings.PDF_TIMEOUT} s); su worker sigue ocupado")
+            if al_abandonar is not None:
+                futuro.add_done_callback(al_abandonar)
+        raise TiempoAgotado()
+
+
+def _borrar_temporal(futuro):
+    if not futuro.cancelled() and futuro.exception() is None:
+        os.unlink(futuro.result()[0])
+
+
+def generar_instancia(tipo, instancia):
+    """
+    Dibuja en el pool el PDF de `instancia` ('orden' o 'solicitud') y devuelve
+    los bytes. La instancia debe traer con select_related/prefetch_related
+    todo lo que usa el renderizador.
+    """
+    return esperar(servicio.enviar(renderizar_instancia, tipo, instancia))
+
+
+def generar(especificacion):
+    """Dibuja el documento en el pool y devuelve (pdf, nombre de archivo)."""
+    return esperar(servicio.enviar(renderizar_bytes, especificacion))
+
+
+def generar_archivo(especificacion):
+    """
+    Como `generar`, pero devuelve (archivo abierto, nombre de archivo); el
+    temporal ya está borrado del disco y desaparece al cerrar el archivo.
+    """
+    ruta, nombre = esperar(servicio.enviar(renderizar_archivo, especificacion), _borrar_temporal)
+    try:
+        archivo = open(ruta, 'rb')
+    finally:
+        os.unlink(ruta)
+    return archivo, nombre
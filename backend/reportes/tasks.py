@@ -0,0 +1,67 @@
+# reportes/tasks.py
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from reportes import documentos
+from reportes.models import ReportJob
+
+logger = logging.getLogger(__name__)
+
+ERROR_TIEMPO_AGOTADO = "El render superó REPORTES_TIMEOUT y se canceló"
+
+
+def limite_render():
+    """Inicio mínimo de un render que todavía puede estar en curso."""
+    return timezone.now() - timedelta(seconds=settings.REPORTES_TIMEOUT)
+
+
+def marcar_vencidos():
+    """
+    Pasa a 'error' los trabajos que llevan más de REPORTES_TIMEOUT en
+    'procesando': el cluster ya mató a su worker y nadie los va a terminar.
+    """
+    return ReportJob.objects.filter(estado='procesando', fecha_inicio__lt=limite_render()).update(
+        estado='error', error=ERROR_TIEMPO_AGOTADO, fecha_finalizacion=timezone.now()
+    )
+
+
+def generar_reporte(job_id):
+    """Renderiza el documento de un ReportJob y guarda el archivo resultante."""
+    try:
+        job = ReportJob.objects.get(pk=job_id)
+    except ReportJob.DoesNotExist:
+        logger.warning(f"ReportJob {job_id} no existe; se omite")
+        return
+    if job.estado != 'pendiente':
+        # 'procesando' aquí es una entrega repetida de una tarea cuyo worker murió
+        # (p. ej. por el timeout del cluster): no se vuelve a intentar
+        if job.estado == 'procesando':
+            ReportJob.objects.filter(pk=job.pk, estado='procesando').update(
+                estado='error', error=ERROR_TIEMPO_AGOTADO, fecha_finalizacion=timezone.now()
+            )
+        return
+
+    job.fecha_inicio = timezone.now()
+    if not ReportJob.objects.filter(pk=job.pk, estado='pendiente').update(
+        estado='procesando', fecha_inicio=job.fecha_inicio
+    ):
+        return
+    try:
+        with tempfile.TemporaryFile() as archivo:
+            nombre = documentos.renderizar(job.tipo, job.parametros, archivo)
+            archivo.seek(0)
+            job.archivo.save(f"{job.pk}_{nombre}", File(archivo), save=False)
+        job.nombre_archivo = nombre
+        job.estado = 'completado'
+        job.error = None
+    except Exception as e:
+        logger.exception(f"Error generando ReportJob {job.pk}")
+        job.estado = 'error'
+        job.error = f"{type(e).__name__}: {e}"
+    job.fecha_finalizacion = timezone.now()
+    job.save(update_fields=['archivo', 'nombre_archivo', 'estado', 'error', 'fecha_finalizacion'])
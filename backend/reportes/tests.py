@@ -0,0 +1,273 @@
+import io
+import json
+import pickle
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from pypdf import PdfReader
+from rest_framework import serializers
+from rest_framework.test import APITestCase
+
+from bodega.models import Producto
+from movimientos.services import registrar_salidas
+from ordenes.cache_pdf import cache_ordenes
+from ordenes.models import OrdenesCompras, OrdenCompraDetalle, Proveedor
+from usuarios.models import Usuario
+from . import plantillas
+from .models import ReportJob
+from .servicio import EspecificacionPDF, servicio
+from .tasks import ERROR_TIEMPO_AGOTADO, generar_reporte
+
+
+class ArranqueTests(SimpleTestCase):
+    def test_importar_urls_no_carga_reportlab(self):
+        salida = io.StringIO()
+        call_command('medir_arranque', '--repeticiones', '1', '--json', stdout=salida)
+        resultado = json.loads(salida.getvalue())
+        self.assertFalse(resultado['reportlab_cargado'])
+        self.assertIn('movimientos', resultado['aplicaciones'])
+
+
+# Los workers del servicio no ven la base de pruebas en memoria: se renderiza en el proceso
+@override_settings(PDF_PROCESOS=0)
+class RenderizadoPDFTests(APITestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create(username='bodega')
+        self.client.force_authenticate(self.usuario)
+
+    def test_orden_y_movimientos(self):
+        proveedor = Proveedor.objects.create(
+            nombre_proveedor='Proveedor', rut='1-9', domicilio='-', ubicacion='-',
+            email='p@example.com', telefono='-'
+        )
+        orden = OrdenesCompras.objects.create(
+            numero_orden='1', empresa='Maquinarias Imperia SPA', proveedor=proveedor,
+            cargo='-', forma_pago='-', plazo_entrega='-'
+        )
+        response = self.client.get('/api/ordenes/ordenes/reporte/generar_pdf/', {'orden_id': orden.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content.startswith(b'%PDF'))
+
+        producto = Producto.objects.create(
+            codigo='R1', nombre='Correa', categoria='-', ubicacion='-', precio_compra=100, stock_actual=5
+        )
+        registrar_salidas(self.usuario, '', [{'producto': producto.pk, 'cantidad': 1, 'cargo': 'taller'}])
+        hoy = orden.fecha.date().isoformat()
+        response = self.client.get('/api/movimientos/reporte/generar_pdf/', {
+            'tipo': 'salida', 'start_date': hoy, 'end_date': hoy,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_medir_pdf(self):
+        proveedor = Proveedor.objects.create(
+            nombre_proveedor='Proveedor', rut='1-9', domicilio='-', ubicacion='-',
+            email='p@example.com', telefono='-'
+        )
+        orden = OrdenesCompras.objects.create(
+            numero_orden='1', empresa='Maquinarias Imperia SPA', proveedor=proveedor,
+            cargo='-', forma_pago='-', plazo_entrega='-'
+        )
+        salida = io.StringIO()
+        call_command('medir_pdf', 'orden', f'orden_id={orden.pk}', '--repeticiones', '2', stdout=salida)
+        self.assertIn('2 renders (caliente)', salida.getvalue())
+
+
+class ReportJobTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(Usuario.objects.create(username='bodega'))
+
+    def pedir(self, end_date):
+        return self.client.post('/api/reportes/', {
+            'tipo': 'movimientos',
+            'parametros': {'tipo': 'salida', 'start_date': '2025-01-01', 'end_date': end_date.isoformat()},
+        }, format='json')
+
+    def test_reutiliza_trabajos_en_curso(self):
+        hoy = timezone.localdate()
+        primero = self.pedir(hoy)
+        self.assertEqual(primero.status_code, 202)
+        segundo = self.pedir(hoy)
+        self.assertEqual(segundo.status_code, 200)
+        self.assertEqual(segundo.data['id'], primero.data['id'])
+
+    def test_completado_solo_si_el_rango_ya_cerro(self):
+        hoy = timezone.localdate()
+        abierto = self.pedir(hoy)
+        ReportJob.objects.filter(pk=abierto.data['id']).update(estado='completado')
+        # El rango incluye hoy: el archivo terminado puede no tener los últimos movimientos
+        self.assertEqual(self.pedir(hoy).status_code, 202)
+
+        ayer = hoy - timedelta(days=1)
+        cerrado = self.pedir(ayer)
+        ReportJob.objects.filter(pk=cerrado.data['id']).update(estado='completado')
+        response = self.pedir(ayer)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], cerrado.data['id'])
+
+    def test_procesando_vencido_pasa_a_error_y_no_se_reutiliza(self):
+        hoy = timezone.localdate()
+        vivo = self.pedir(hoy)
+        ReportJob.objects.filter(pk=vivo.data['id']).update(estado='procesando', fecha_inicio=timezone.now())
+        self.assertEqual(self.pedir(hoy).data['id'], vivo.data['id'])
+
+        # El cluster mató al worker: nadie lo va a terminar
+        ReportJob.objects.filter(pk=vivo.data['id']).update(fecha_inicio=timezone.now() - timedelta(seconds=61))
+        with self.settings(REPORTES_TIMEOUT=60):
+            nuevo = self.pedir(hoy)
+        self.assertEqual(nuevo.status_code, 202)
+        vencido = ReportJob.objects.get(pk=vivo.data['id'])
+        self.assertEqual(vencido.estado, 'error')
+        self.assertEqual(vencido.error, ERROR_TIEMPO_AGOTADO)
+
+    def test_tarea_entregada_de_nuevo_no_renderiza(self):
+        job = ReportJob.objects.get(pk=self.pedir(timezone.localdate()).data['id'])
+        ReportJob.objects.filter(pk=job.pk).update(estado='procesando', fecha_inicio=timezone.now())
+        generar_reporte(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.estado, 'error')
+        self.assertFalse(job.archivo)
+
+    def test_parametros_no_objeto(self):
+        for parametros in (['2025-01-01'], 'salida', 3):
+            response = self.client.post('/api/reportes/', {'tipo': 'movimientos', 'parametros': parametros}, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('parametros', response.data)
+
+
+class GeneracionReporteTests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Los archivos generados van a un directorio temporal
+        media = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media)
+        ajuste = override_settings(MEDIA_ROOT=media)
+        ajuste.enable()
+        cls.addClassCleanup(ajuste.disable)
+
+    def setUp(self):
+        self.client.force_authenticate(Usuario.objects.create(username='bodega'))
+
+    def test_tarea_completa_y_descarga(self):
+        response = self.client.post('/api/reportes/', {
+            'tipo': 'movimientos',
+            'parametros': {'tipo': 'salida', 'start_date': '2025-01-01', 'end_date': '2025-01-31'},
+        }, format='json')
+        descarga = f"/api/reportes/{response.data['id']}/descargar/"
+        self.assertEqual(self.client.get(descarga).status_code, 409)
+
+        generar_reporte(response.data['id'])
+        job = ReportJob.objects.get(pk=response.data['id'])
+        self.assertEqual(job.estado, 'completado')
+        self.assertTrue(job.archivo)
+        self.assertIsNotNone(job.fecha_inicio)
+        response = self.client.get(descarga)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_render_fallido_termina_en_error(self):
+        # La orden no existe: el render falla dentro de la tarea
+        job = ReportJob.objects.create(tipo='orden', parametros={'orden_id': 999}, clave='x')
+        generar_reporte(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.estado, 'error')
+        self.assertIn('DoesNotExist', job.error)
+        self.assertIsNotNone(job.fecha_finalizacion)
+        self.assertEqual(self.client.get(f'/api/reportes/{job.pk}/descargar/').status_code, 409)
+
+
+class ServicioPDFTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(Usuario.objects.create(username='bodega'))
+        # Que la OC no salga de la caché de PDF de otra prueba
+        cache_ordenes.limpiar()
+
+    def tearDown(self):
+        servicio.descartar(esperar=True)
+
+    def test_especificacion(self):
+        especificacion = EspecificacionPDF.crear('movimientos', {
+            'tipo': 'salida', 'start_date': '2025-01-01', 'end_date': '2025-01-31',
+        })
+        self.assertEqual(pickle.loads(pickle.dumps(especificacion)), especificacion)
+        self.assertFalse(especificacion.parametros['consignacion'])
+        with self.assertRaises(serializers.ValidationError):
+            EspecificacionPDF.crear('orden', {'orden_id': 999})
+
+    @override_settings(PDF_PROCESOS=1, PDF_COLA_MAXIMA=1)
+    def test_cola_llena_responde_503(self):
+        ocupado = servicio.enviar(time.sleep, 0.5)
+        response = self.client.get('/api/movimientos/reporte/generar_pdf/', {
+            'tipo': 'salida', 'start_date': '2025-01-01', 'end_date': '2025-01-31',
+        })
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+        proveedor = Proveedor.objects.create(
+            nombre_proveedor='Proveedor', rut='1-9', domicilio='-', ubicacion='-',
+            email='p@example.com', telefono='-'
+        )
+        orden = OrdenesCompras.objects.create(
+            numero_orden='1', empresa='Maquinarias Imperia SPA', proveedor=proveedor,
+            cargo='-', forma_pago='-', plazo_entrega='-'
+        )
+        hoy = orden.fecha.date().isoformat()
+        response = self.client.get('/api/ordenes/ordenes/reporte/lote/', {'desde': hoy, 'hasta': hoy})
+        self.assertEqual(response.status_code, 503)
+
+        # Al terminar el trabajo se libera el lugar en la cola
+        ocupado.result(timeout=60)
+        self.assertFalse(servicio.saturado())
+
+    def crear_orden(self):
+        proveedor = Proveedor.objects.create(
+            nombre_proveedor='Proveedor', rut='1-9', domicilio='-', ubicacion='-',
+            email='p@example.com', telefono='-'
+        )
+        orden = OrdenesCompras.objects.create(
+            numero_orden='7', empresa='Maquinarias Imperia SPA', proveedor=proveedor,
+            cargo='-', forma_pago='-', plazo_entrega='-'
+        )
+        OrdenCompraDetalle.objects.create(orden=orden, cantidad=1, detalle='Rodamiento', precio_unitario=100)
+        return orden
+
+    @override_settings(PDF_PROCESOS=1)
+    def test_orden_se_dibuja_en_el_worker_con_la_instancia_de_la_vista(self):
+        # El worker no ve la base de pruebas: solo funciona si recibe la orden ya cargada
+        orden = self.crear_orden()
+        response = self.client.get('/api/ordenes/ordenes/reporte/generar_pdf/', {'orden_id': orden.pk})
+        self.assertEqual(response.status_code, 200)
+        texto = PdfReader(io.BytesIO(response.content)).pages[0].extract_text()
+        self.assertIn('Rodamiento', texto)
+
+    @override_settings(PDF_PROCESOS=1, PDF_COLA_MAXIMA=4, PDF_TIMEOUT=0.5)
+    def test_tiempo_agotado_responde_503(self):
+        orden = self.crear_orden()
+        ocupado = servicio.enviar(time.sleep, 3)
+        response = self.client.get('/api/ordenes/ordenes/reporte/generar_pdf/', {'orden_id': orden.pk})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data['detail'].code, 'tiempo_agotado')
+        self.assertEqual(response['Retry-After'], '5')
+        ocupado.result(timeout=60)
+
+
+class PlantillasTests(SimpleTestCase):
+    def test_logo_reducido_una_vez(self):
+        plantillas.limpiar()
+        datos = plantillas._png_logo(100, 50)
+        with Image.open(io.BytesIO(datos)) as imagen:
+            self.assertLessEqual(imagen.width, 100 * plantillas.RESOLUCION_LOGO_DPI / 72 + 1)
+        self.assertIs(plantillas._png_logo(100, 50), datos)
+
+    def test_bloques_se_construyen_una_vez_y_se_copian(self):
+        primero, segundo = plantillas.firmas('orden'), plantillas.firmas('orden')
+        self.assertIsNot(primero, segundo)
+        self.assertIs(primero._cellvalues, segundo._cellvalues)
+        self.assertIs(plantillas.encabezado_orden()._cellvalues, plantillas.encabezado_orden()._cellvalues)
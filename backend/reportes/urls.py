@@ -0,0 +1,11 @@
+# reportes/urls.py
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import ReportJobViewSet
+
+router = DefaultRouter()
+router.register(r'', ReportJobViewSet, basename='reportes')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
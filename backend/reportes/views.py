@@ -0,0 +1,76 @@
+# reportes/views.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.http import FileResponse
+from django.utils import timezone
+from django_q.tasks import async_task
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from . import documentos
+from .models import ReportJob
+from .serializers import ReportJobSerializer
+from .tasks import limite_render, marcar_vencidos
+
+
+class ReportJobViewSet(mixins.CreateModelMixin,
+                       mixins.RetrieveModelMixin,
+                       mixins.ListModelMixin,
+                       viewsets.GenericViewSet):
+    """
+    Cola de PDFs generados en el cluster de django_q.
+      - POST   /api/reportes/                   {tipo, parametros} -> encola (202) o reutiliza (200)
+      - GET    /api/reportes/{id}/              estado del trabajo
+      - GET    /api/reportes/{id}/descargar/    archivo terminado
+    """
+    queryset = ReportJob.objects.select_related('usuario').order_by('-fecha_creacion')
+    serializer_class = ReportJobSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Un trabajo en curso con los mismos parámetros se reutiliza tal cual (si su
+        # render no superó REPORTES_TIMEOUT); uno terminado solo si su contenido ya
+        # no puede cambiar (p. ej. un rango pasado)
+        datos = serializer.validated_data
+        marcar_vencidos()
+        reutilizables = Q(estado='pendiente') | Q(estado='procesando', fecha_inicio__gte=limite_render())
+        if documentos.cerrado(datos['tipo'], datos['parametros']):
+            reutilizables |= Q(estado='completado')
+        vigencia = timezone.now() - timedelta(seconds=settings.REPORTES_VIGENCIA)
+        existente = ReportJob.objects.filter(
+            reutilizables,
+            clave=datos['clave'],
+            fecha_creacion__gte=vigencia,
+        ).order_by('-fecha_creacion').first()
+        if existente:
+            return Response(self.get_serializer(existente).data, status=status.HTTP_200_OK)
+
+        usuario = request.user if request.user.is_authenticated else None
+        job = serializer.save(usuario=usuario)
+        # Los errores del render quedan en el trabajo: la tarea no se reintenta
+        transaction.on_commit(lambda: async_task(
+            'reportes.tasks.generar_reporte', job.pk,
+            timeout=settings.REPORTES_TIMEOUT, ack_failure=True,
+        ))
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def descargar(self, request, pk=None):
+        job = self.get_object()
+        if job.estado != 'completado' or not job.archivo:
+            return Response(
+                {"error": "El reporte aún no está disponible", "estado": job.estado},
+                status=status.HTTP_409_CONFLICT
+            )
+        return FileResponse(
+            job.archivo.open('rb'),
+            as_attachment=True,
+            filename=job.nombre_archivo,
+            content_type='application/pdf'
+        )
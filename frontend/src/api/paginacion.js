@@ -0,0 +1,16 @@
+import axiosInstance from './axiosInstance';
+
+// Tamaño de página máximo que aceptan los listados paginados por cursor
+const TAMANO_PAGINA = 500;
+
+// Recorre un listado paginado por cursor siguiendo los enlaces `next`
+// y devuelve todos los resultados en el orden del backend.
+export async function obtenerTodos(url, params = {}) {
+  let response = await axiosInstance.get(url, { params: { page_size: TAMANO_PAGINA, ...params } });
+  let resultados = [...response.data.results];
+  while (response.data.next) {
+    response = await axiosInstance.get(response.data.next);
+    resultados = [...resultados, ...response.data.results];
+  }
+  return resultados;
+}
@@ -13,7 +13,7 @@ import {
   Box,
   Typography
 } from '@mui/material';
-import axiosInstance from '../api/axiosInstance';
+import { obtenerTodos } from '../api/paginacion';
 
 function OrdenesModal({ open, onClose, onSelect }) {
   const [ordenes, setOrdenes] = useState([]);
@@ -22,9 +22,8 @@ function OrdenesModal({ open, onClose, onSelect }) {
   const fetchOrdenesPendientes = async () => {
     setLoading(true);
     try {
-      // Usamos el endpoint creado para obtener órdenes pendientes
-      const response = await axiosInstance.get('ordenes/pendientes/');
-      setOrdenes(response.data);
+      // Usamos el endpoint creado para obtener órdenes pendientes (paginado por cursor)
+      setOrdenes(await obtenerTodos('ordenes/pendientes/'));
     } catch (error) {
       console.error("Error al cargar órdenes pendientes:", error);
     } finally {
@@ -21,6 +21,7 @@ import {
 } from '@mui/material';
 import { DatePicker } from '@mui/x-date-pickers/DatePicker';
 import axiosInstance from '../api/axiosInstance';
+import { obtenerTodos } from '../api/paginacion';
 import { AuthContext } from '../contexts/AuthContext';
 
 function AlertasPage() {
@@ -34,17 +35,11 @@ function AlertasPage() {
   const fetchAlertas = async () => {
     setLoading(true);
     try {
-      let url = 'alertas/';
-      const params = [];
-      if (startDate) params.push(`start_date=${startDate.format('YYYY-MM-DD')}`);
-      if (endDate) params.push(`end_date=${endDate.format('YYYY-MM-DD')}`);
-      if (params.length) url += '?' + params.join('&');
-      const response = await axiosInstance.get(url);
-      // Ordenar alertas por fecha_creacion descendente
-      const sortedAlertas = response.data.sort(
-        (a, b) => new Date(b.fecha_creacion) - new Date(a.fecha_creacion)
-      );
-      setAlertas(sortedAlertas);
+      const params = {};
+      if (startDate) params.start_date = startDate.format('YYYY-MM-DD');
+      if (endDate) params.end_date = endDate.format('YYYY-MM-DD');
+      // El listado viene paginado por cursor y ya ordenado por fecha_creacion descendente
+      setAlertas(await obtenerTodos('alertas/', params));
     } catch (error) {
       console.error("Error al cargar alertas:", error);
     }
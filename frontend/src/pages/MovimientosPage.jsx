@@ -24,6 +24,7 @@ import {
 } from '@mui/material';
 import { DatePicker } from '@mui/x-date-pickers/DatePicker';
 import axiosInstance from '../api/axiosInstance';
+import { obtenerTodos } from '../api/paginacion';
 import { PieChart, Pie, Cell, Tooltip, Legend } from 'recharts';
 
 function MovimientosPage() {
@@ -75,14 +76,14 @@ function MovimientosPage() {
     }
     setLoading(true);
     try {
-      const [resEntradas, resSalidas] = await Promise.all([
-        axiosInstance.get('movimientos/entradas/', { params }),
-        axiosInstance.get('movimientos/salidas/', { params }),
+      const [listaEntradas, listaSalidas] = await Promise.all([
+        obtenerTodos('movimientos/entradas/', params),
+        obtenerTodos('movimientos/salidas/', params),
       ]);
-      setEntradas(resEntradas.data);
-      setSalidas(resSalidas.data);
-      const totalEntradas = resEntradas.data.reduce((acc, item) => acc + item.cantidad, 0);
-      const totalSalidas = resSalidas.data.reduce((acc, item) => acc + item.cantidad, 0);
+      setEntradas(listaEntradas);
+      setSalidas(listaSalidas);
+      const totalEntradas = listaEntradas.reduce((acc, item) => acc + item.cantidad, 0);
+      const totalSalidas = listaSalidas.reduce((acc, item) => acc + item.cantidad, 0);
       setTotales({ entradas: totalEntradas, salidas: totalSalidas });
     } catch (error) {
       console.error('Error al cargar movimientos:', error);
@@ -30,6 +30,9 @@ function Ordenes() {
   const [searchTerm, setSearchTerm] = useState('');
   const [fechaFiltro, setFechaFiltro] = useState(null);
   const [page, setPage] = useState(0);
+  // Enlace de cursor de la página mostrada (null: primera página) y enlaces vecinos
+  const [urlPagina, setUrlPagina] = useState(null);
+  const [enlaces, setEnlaces] = useState({ next: null, previous: null });
   const [rowsPerPage, setRowsPerPage] = useState(5);
   const [openCrearOC, setOpenCrearOC] = useState(false);
   const [openDetalle, setOpenDetalle] = useState(false);
@@ -40,16 +43,20 @@ function Ordenes() {
   const fetchOrdenes = async () => {
     setLoading(true);
     try {
-      const response = await axiosInstance.get('ordenes/ordenes/', {
-        params: {
-          page: page + 1,
-          page_size: rowsPerPage,
-          search: searchTerm || undefined,
-          fecha: fechaFiltro ? fechaFiltro.toISOString().split('T')[0] : undefined,
-        },
-      });
+      // Los enlaces next/previous ya incluyen los filtros, page_size y count
+      const response = urlPagina
+        ? await axiosInstance.get(urlPagina)
+        : await axiosInstance.get('ordenes/ordenes/', {
+            params: {
+              page_size: rowsPerPage,
+              count: 'exacto',
+              search: searchTerm || undefined,
+              fecha: fechaFiltro ? fechaFiltro.toISOString().split('T')[0] : undefined,
+            },
+          });
       setOrdenes(response.data.results);
       setTotalOrdenes(response.data.count);
+      setEnlaces({ next: response.data.next, previous: response.data.previous });
     } catch (error) {
       console.error('Error al cargar órdenes:', error);
     } finally {
@@ -83,15 +90,22 @@ function Ordenes() {
     fetchOrdenes();
     fetchProveedores();
     fetchProductos();
-  }, [page, rowsPerPage, searchTerm, fechaFiltro]);
+  }, [urlPagina, rowsPerPage, searchTerm, fechaFiltro]);
+
+  const irAPrimeraPagina = () => {
+    setUrlPagina(null);
+    setPage(0);
+  };
 
   const handleChangePage = (event, newPage) => {
+    // La paginación por cursor solo avanza o retrocede una página
+    setUrlPagina(newPage > page ? enlaces.next : enlaces.previous);
     setPage(newPage);
   };
 
   const handleChangeRowsPerPage = (event) => {
     setRowsPerPage(parseInt(event.target.value, 10));
-    setPage(0);
+    irAPrimeraPagina();
   };
 
   const handleSearchChange = (e) => {
@@ -101,13 +115,13 @@ function Ordenes() {
   const handleKeyPress = (e) => {
     if (e.key === 'Enter') {
       setSearchTerm(searchInput);
-      setPage(0);
+      irAPrimeraPagina();
     }
   };
 
   const handleFechaChange = (newDate) => {
     setFechaFiltro(newDate);
-    setPage(0);
+    irAPrimeraPagina();
   };
 
   const handleCrearOrden = async (payload) => {
@@ -172,7 +186,7 @@ function Ordenes() {
         />
         <Button variant="contained" onClick={() => {
           setSearchTerm(searchInput);
-          setPage(0);
+          irAPrimeraPagina();
         }}>
           Buscar
         </Button>